@@ -0,0 +1,159 @@
+"""Many residents registering for one capped event at the same moment.
+
+Worker processes share a scratch SQLite file, wait on a common start signal and
+then POST to the real register_event route through the test client, each
+registrant submitting twice as a double click would. A share of them cancel
+straight after, which exercises waitlist promotion. Afterwards the event's
+counters are checked against the registration rows: no seat beyond capacity, no
+duplicate registration, and nobody left waiting while a seat is free. Results
+are printed as JSON:
+
+    python benchmarks/event_contention.py --workers 8 --registrants 2000 --capacity 150
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def make_app(db_uri):
+    os.environ['FLASK_SQLALCHEMY_DATABASE_URI'] = json.dumps(db_uri)
+    sys.path.insert(0, ROOT)
+    from umiam import create_app
+    return create_app({'WTF_CSRF_ENABLED': False, 'REQUEST_METRICS_ENABLED': False, 'JOB_WORKERS': 0})
+
+def setup(db_uri, registrants, capacity):
+    from datetime import datetime, timedelta
+
+    app = make_app(db_uri)
+    from umiam.extensions import db
+    from umiam.migrations import migrate_db
+    from umiam.models import Event, User
+
+    with app.app_context():
+        migrate_db()
+        db.session.execute(db.insert(User), [
+            {'username': f'resident{i}', 'email': f'resident{i}@iitg.ac.in', 'password_hash': '-',
+             'role': 'Student', 'name': f'Resident {i}', 'roll_number': str(200101000 + i),
+             'room_number': 'A-101', 'studying_year': '1st Year', 'Branch': 'CSE'}
+            for i in range(registrants)
+        ])
+        start = datetime.utcnow() + timedelta(days=7)
+        event = Event(title='Contention test', description='Benchmark event', location='Auditorium',
+                      start_datetime=start, end_datetime=start + timedelta(hours=2), capacity=capacity)
+        db.session.add(event)
+        db.session.commit()
+        return event.id, [user_id for (user_id,) in db.session.query(User.id).order_by(User.id)]
+
+def worker(db_uri, event_id, user_ids, cancel_every, ready, results):
+    from sqlalchemy.exc import OperationalError
+
+    app = make_app(db_uri)
+    url = f'/event/register/{event_id}'
+    clients = []
+    for user_id in user_ids:
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = str(user_id)
+            session['_fresh'] = True
+        clients.append(client)
+
+    latencies = []
+    errors = 0
+    ready.wait()  # every worker has its clients built; go together
+    started = time.perf_counter()
+    for index, client in enumerate(clients):
+        actions = ['register', 'register']
+        if cancel_every and index % cancel_every == 0:
+            actions.append('cancel')
+        for action in actions:
+            request_started = time.perf_counter()
+            try:
+                response = client.post(url, data={'action': action})
+                if response.status_code != 302:
+                    errors += 1
+            except OperationalError:
+                errors += 1
+            latencies.append(time.perf_counter() - request_started)
+    results.put({'latencies': latencies, 'errors': errors, 'seconds': time.perf_counter() - started})
+
+def check(db_uri, event_id):
+    app = make_app(db_uri)
+    from umiam.extensions import db
+    from umiam.models import Event, EventRegistration
+
+    with app.app_context():
+        event = db.session.get(Event, event_id)
+        counts = dict(db.session.query(EventRegistration.status, db.func.count())
+                      .filter_by(event_id=event_id).group_by(EventRegistration.status))
+        duplicates = (db.session.query(EventRegistration.user_id).filter_by(event_id=event_id)
+                      .group_by(EventRegistration.user_id).having(db.func.count() > 1).count())
+        registered, waitlisted = counts.get('registered', 0), counts.get('waitlisted', 0)
+        return {
+            'capacity': event.capacity,
+            'registered': registered,
+            'waitlisted': waitlisted,
+            'seats_taken_counter': event.seats_taken,
+            'waitlist_size_counter': event.waitlist_size,
+            'duplicates': duplicates,
+            'overbooked': registered > event.capacity,
+            'counters_match': (event.seats_taken, event.waitlist_size) == (registered, waitlisted),
+            'idle_seats_with_waitlist': waitlisted > 0 and registered < event.capacity,
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--registrants', type=int, default=2000)
+    parser.add_argument('--capacity', type=int, default=150)
+    parser.add_argument('--cancel-every', type=int, default=10, metavar='N',
+                        help='every Nth registrant cancels right after registering (0 for none)')
+    args = parser.parse_args()
+    multiprocessing.set_start_method('spawn')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_uri = 'sqlite:///' + os.path.join(tmp, 'contention.db')
+        with multiprocessing.Pool(1) as pool:
+            event_id, user_ids = pool.apply(setup, (db_uri, args.registrants, args.capacity))
+
+        ready = multiprocessing.Barrier(args.workers)
+        results = multiprocessing.Queue()
+        procs = [
+            multiprocessing.Process(target=worker, args=(db_uri, event_id, user_ids[i::args.workers],
+                                                         args.cancel_every, ready, results))
+            for i in range(args.workers)
+        ]
+        for proc in procs:
+            proc.start()
+        collected = [results.get() for _ in procs]
+        for proc in procs:
+            proc.join()
+
+        with multiprocessing.Pool(1) as pool:
+            outcome = pool.apply(check, (db_uri, event_id))
+
+    latencies = sorted(l for r in collected for l in r['latencies'])
+    wall = max(r['seconds'] for r in collected)
+
+    def pct(p):
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000, 3)
+    print(json.dumps({
+        'workers': args.workers,
+        'registrants': args.registrants,
+        'requests': len(latencies),
+        'errors': sum(r['errors'] for r in collected),
+        'requests_per_s': round(len(latencies) / wall, 1),
+        'p50_ms': pct(0.50),
+        'p99_ms': pct(0.99),
+        **outcome,
+    }))
+    if outcome['overbooked'] or outcome['duplicates'] or not outcome['counters_match'] \
+            or outcome['idle_seats_with_waitlist']:
+        sys.exit('Registration invariants violated.')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""Measure page latency while the login form is flooded with wrong passwords.
+
+Serves the app from a threaded WSGI server (comparable to one gunicorn gthread
+worker) against a scratch database, and for each configuration times a page
+with no load, then again while --attackers threads post wrong passwords for a
+real account as fast as the server answers them. The configurations are the
+old behaviour (hashing on the request thread, no throttling), the hashing pool
+alone (what a flood spread over many IPs still meets), and the defaults.
+Results are printed as JSON:
+
+    python benchmarks/login_flood.py --attackers 16
+"""
+import argparse
+import http.client
+import json
+import logging
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+EMAIL = 'flood@iitg.ac.in'
+
+SCENARIOS = {
+    'inline_unthrottled': {'PASSWORD_HASH_WORKERS': 0, 'RATE_LIMIT_ENABLED': False},
+    'pool_unthrottled': {'RATE_LIMIT_ENABLED': False},
+    'defaults': {},
+}
+
+def page_latencies(port, path, count):
+    latencies = []
+    for _ in range(count):
+        conn = http.client.HTTPConnection('127.0.0.1', port)
+        started = time.perf_counter()
+        conn.request('GET', path)
+        conn.getresponse().read()
+        latencies.append((time.perf_counter() - started) * 1000)
+        conn.close()
+    latencies.sort()
+    return {'p50_ms': round(statistics.median(latencies), 3),
+            'p95_ms': round(latencies[int(len(latencies) * 0.95) - 1], 3)}
+
+def attacker(port, statuses, lock, stop):
+    body = urllib.parse.urlencode({'email': EMAIL, 'password': 'wrong-password'})
+    headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+    while not stop.is_set():
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        conn.request('POST', '/login', body, headers)
+        response = conn.getresponse()
+        response.read()
+        with lock:
+            statuses[response.status] = statuses.get(response.status, 0) + 1
+        conn.close()
+
+def flood(port, attackers, statuses, stop):
+    # Runs in its own process so the attacking clients do not compete with the
+    # server for the GIL, only for CPU, as they would from another machine.
+    lock = threading.Lock()
+    threads = [threading.Thread(target=attacker, args=(port, statuses, lock, stop), daemon=True)
+               for _ in range(attackers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+def run_scenario(create_app, overrides, database, args):
+    from werkzeug.serving import make_server
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': database, 'WTF_CSRF_ENABLED': False, 'JOB_WORKERS': 0,
+                      **overrides})
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    port = server.server_port
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    idle = page_latencies(port, args.path, args.requests)
+
+    manager = multiprocessing.Manager()
+    statuses = manager.dict()
+    stop = manager.Event()
+    flooder = multiprocessing.Process(target=flood, args=(port, args.attackers, statuses, stop))
+    flooder.start()
+    time.sleep(1)
+    before = sum(statuses.values())
+    started = time.perf_counter()
+    flooded = page_latencies(port, args.path, args.requests)
+    attempts = sum(statuses.values()) - before
+    elapsed = time.perf_counter() - started
+    stop.set()
+    flooder.join()
+    server.shutdown()
+    statuses = dict(statuses)
+    manager.shutdown()
+
+    hashing = app.extensions['password_hasher'].stats()
+    return {
+        'page_latency_idle': idle,
+        'page_latency_flooded': flooded,
+        'login_responses': {str(status): count for status, count in sorted(statuses.items())},
+        'login_attempts_per_s': round(attempts / elapsed, 1),
+        'hash_queue_wait_avg_ms': (round(hashing['queue_seconds'] / hashing['completed'] * 1000, 3)
+                                   if hashing['completed'] else None),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--attackers', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--path', default='/facilities')
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    database = 'sqlite:///' + os.path.join(tmp, 'bench.db')
+    sys.path.insert(0, ROOT)
+    from werkzeug.security import generate_password_hash
+    from umiam import create_app
+    from umiam.extensions import db
+    from umiam.migrations import migrate_db
+    from umiam.models import Facility, User
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': database, 'JOB_WORKERS': 0})
+    with app.app_context():
+        migrate_db()
+        db.session.add(User(username='flood', email=EMAIL, password_hash=generate_password_hash('right-password'),
+                            role='Student', name='Flood Target'))
+        db.session.add_all(Facility(name=f'Facility {i}', description='Benchmark facility', location='Block A',
+                                    availability='Open') for i in range(20))
+        db.session.commit()
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    results = {name: run_scenario(create_app, overrides, database, args) for name, overrides in SCENARIOS.items()}
+    print(json.dumps({'attackers': args.attackers, 'path': args.path, **results}))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+"""Drive every route through the Flask test client and report latency percentiles.
+
+Point it at a database produced by benchmarks/seed.py. Each GET route is timed
+for each session that can see it (anonymous, student, admin) and the write
+routes are timed with representative form posts. Results are written as JSON so
+runs before and after a change can be diffed:
+
+    python benchmarks/routes.py --database /tmp/bench.db --iterations 50 --output before.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASSWORD = 'password'
+SKIPPED_ENDPOINTS = {'static', 'public.asset', 'public.media', 'public.notice_stream', 'public.logout'}
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, int(round(p / 100 * len(sorted_values) + 0.5)) - 1))
+    return round(sorted_values[index] * 1000, 3)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database', required=True)
+    parser.add_argument('--iterations', type=int, default=30)
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--output', help='write JSON here instead of stdout')
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    from flask import url_for
+    from sqlalchemy import event as sa_event
+    from umiam import create_app, models
+    from umiam.blueprints.api import API_RESOURCES
+    from umiam.extensions import db
+    from umiam.migrations import migrate_db
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.abspath(args.database),
+                      'WTF_CSRF_ENABLED': False, 'JOB_WORKERS': 0})
+    query_count = [0]
+    with app.app_context():
+        migrate_db()
+        sa_event.listen(db.engine, 'before_cursor_execute', lambda *_: query_count.__setitem__(0, query_count[0] + 1))
+        admin = models.User.query.filter_by(role='HMC Admin').order_by(models.User.id).first()
+        student = models.User.query.filter_by(role='Student').order_by(models.User.id).first()
+        if admin is None or student is None:
+            sys.exit('Seed the database with benchmarks/seed.py first.')
+        busiest_event = (db.session.query(models.EventRegistration.event_id)
+                         .group_by(models.EventRegistration.event_id)
+                         .order_by(db.func.count().desc()).limit(1).scalar())
+        first_id = {model: db.session.query(model.id).order_by(model.id).limit(1).scalar()
+                    for model in (models.Announcement, models.Facility, models.Notice, models.Event,
+                                  models.Achievement, models.Alumni, models.Complaint)}
+        row_counts = {model.__tablename__: db.session.query(model).count()
+                      for model in (models.User, models.Complaint, models.Event, models.EventRegistration,
+                                    models.Notice, models.Alumni)}
+        admin_email, student_email, student_id = admin.email, student.email, student.id
+
+    id_models = {
+        'admin.edit_announcement': models.Announcement, 'admin.edit_facility': models.Facility,
+        'admin.edit_notice': models.Notice, 'admin.edit_event': models.Event,
+        'admin.edit_achievement': models.Achievement, 'admin.edit_alumni': models.Alumni,
+    }
+    url_values = {
+        'event_id': busiest_event or first_id[models.Event],
+        'user_id': student_id,
+        'fmt': 'csv',
+        'color': 0,
+        'initials': 'AB',
+        'name': list(API_RESOURCES),
+    }
+    query_args = {
+        'public.search': {'q': 'water leak'},
+    }
+
+    def client_for(session_name):
+        client = app.test_client()
+        email = {'admin': admin_email, 'student': student_email}.get(session_name)
+        if email:
+            response = client.post('/login', data={'email': email, 'password': PASSWORD})
+            assert response.status_code == 302, f'could not log in as {session_name}'
+        return client
+
+    clients = {name: client_for(name) for name in ('anonymous', 'student', 'admin')}
+
+    def time_request(client, method, url, data=None):
+        before = query_count[0]
+        started = time.perf_counter()
+        response = client.open(url, method=method, data=data)
+        response.get_data()
+        elapsed = time.perf_counter() - started
+        return response.status_code, elapsed, query_count[0] - before
+
+    def run_case(session_name, method, url, data=None, fresh_client=False):
+        statuses, latencies, queries = set(), [], []
+        for iteration in range(args.warmup + args.iterations):
+            client = client_for(session_name) if fresh_client else clients[session_name]
+            status, elapsed, count = time_request(client, method, url, data)
+            if iteration >= args.warmup:
+                statuses.add(status)
+                latencies.append(elapsed)
+                queries.append(count)
+        latencies.sort()
+        return {'session': session_name, 'method': method, 'url': url, 'status': sorted(statuses),
+                'p50_ms': percentile(latencies, 50), 'p95_ms': percentile(latencies, 95),
+                'p99_ms': percentile(latencies, 99), 'queries_per_request': round(sum(queries) / len(queries), 2)}
+
+    # Build URLs up front: requests issued inside a pushed request context would share
+    # its app context, and with it flask-login's cached user, across sessions.
+    with app.test_request_context():
+        pages = []
+        for rule in sorted(app.url_map.iter_rules(), key=lambda r: r.rule):
+            if rule.endpoint in SKIPPED_ENDPOINTS or 'GET' not in rule.methods:
+                continue
+            # A list in url_values times the route once per value.
+            variants = [dict(query_args.get(rule.endpoint, {}))]
+            for argument in rule.arguments:
+                choices = first_id[id_models[rule.endpoint]] if argument == 'id' else url_values[argument]
+                variants = [{**values, argument: choice} for values in variants
+                            for choice in (choices if isinstance(choices, list) else [choices])]
+            pages.extend((rule.endpoint, url_for(rule.endpoint, **values)) for values in variants)
+
+        complaint_id = first_id[models.Complaint]
+        posts = [
+            (endpoint, session_name, url_for(endpoint, **values), data, fresh_client)
+            for endpoint, session_name, values, data, fresh_client in [
+                ('public.login', 'anonymous', {}, {'email': student_email, 'password': PASSWORD}, True),
+                ('complaints.submit_complaint', 'student', {},
+                 {'category': 'Internet', 'details': 'Benchmark complaint text', 'anonymous': 'no'}, False),
+                ('student.register_event', 'student', {'event_id': url_values['event_id']}, {}, False),
+                ('complaints.update_complaint_status', 'admin', {'id': complaint_id}, {'status': 'In Progress'}, False),
+                ('complaints.update_complaint_comment', 'admin', {'id': complaint_id},
+                 {'comment': 'Benchmark comment'}, False),
+                ('admin.add_notice', 'admin', {}, {'message': 'Benchmark notice', 'priority': 'Normal'}, False),
+                ('admin.edit_notice', 'admin', {'id': first_id[models.Notice]},
+                 {'message': 'Edited benchmark notice', 'priority': 'Important'}, False),
+                ('student.profile_settings', 'student', {},
+                 {'name': 'Bench Student', 'roll_number': '1', 'room_number': 'A-1', 'studying_year': '2nd Year',
+                  'Branch': 'CSE'}, False),
+            ]
+        ]
+
+    results = []
+    exercised = set()
+    for endpoint, url in pages:
+        for session_name, client in clients.items():
+            # Only time the sessions that actually get the page, not a login redirect.
+            if time_request(client, 'GET', url)[0] not in (200, 304):
+                continue
+            results.append({'endpoint': endpoint, **run_case(session_name, 'GET', url)})
+            exercised.add(endpoint)
+    for endpoint, session_name, url, data, fresh_client in posts:
+        results.append({'endpoint': endpoint, **run_case(session_name, 'POST', url, data, fresh_client)})
+        exercised.add(endpoint)
+
+    try:
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                  text=True).stdout.strip() or None
+    except OSError:
+        revision = None
+    report = {
+        'revision': revision,
+        'python': platform.python_version(),
+        'iterations': args.iterations,
+        'rows': row_counts,
+        # ru_maxrss is reported in KiB on Linux.
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'routes': results,
+        'unexercised': sorted(rule.endpoint for rule in app.url_map.iter_rules()
+                              if rule.endpoint not in exercised | SKIPPED_ENDPOINTS),
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    for row in results:
+        print(f"{row['method']:4} {row['session']:9} {row['endpoint']:36} p50 {row['p50_ms']:>9} ms  "
+              f"p99 {row['p99_ms']:>9} ms  {row['queries_per_request']:>6} q/req", file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
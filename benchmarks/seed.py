@@ -0,0 +1,203 @@
+"""Seed a fresh database with synthetic hostel data at a configurable scale.
+
+Rows are generated deterministically from --seed and written with chunked
+executemany inserts, then the derived tables (dashboard counters, search index,
+change stamps, complaint analytics and history, event seat counters, alumni facet
+counts) are brought up to date:
+
+    python benchmarks/seed.py --database /tmp/bench.db --users 5000 --complaints 200000 \\
+        --events 500 --registrations 50000 --notices 3000 --alumni 3000
+
+Every seeded account uses the password "password". The first --admins accounts
+are HMC Admins (admin0@iitg.ac.in, ...) and the rest are students, numbered on
+from there (student20@iitg.ac.in with the default of 20 admins).
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHUNK_SIZE = 5000
+PASSWORD = 'password'
+
+WORDS = ('water leaking tap bathroom fan light switch broken room wifi router slow internet mess food '
+         'dinner cold stale breakfast security guard gate night noise corridor heater geyser window '
+         'door lock furniture chair table cleaning garbage washroom pipe electricity power outage').split()
+COMPANIES = ['Google', 'Microsoft', 'Amazon', 'Goldman Sachs', 'ISRO', 'DRDO', 'Flipkart', 'Adobe',
+             'Texas Instruments', 'Qualcomm', 'Intel', 'Tata Motors', 'Infosys', 'Uber', 'Meta', None]
+POSITIONS = ['Software Engineer', 'Research Scientist', 'Product Manager', 'Data Scientist', 'Professor',
+             'Founder', 'Consultant', 'Analyst', 'Hardware Engineer', None]
+BRANCHES = ['CSE', 'ECE', 'ME', 'CE']
+YEARS = ['1st Year', '2nd Year', '3rd Year', '4th Year', 'Ph.D', 'M.Tech']
+STATUS_WEIGHTS = {'Submitted': 15, 'Under Review': 10, 'In Progress': 15, 'Resolved': 50, 'Closed': 10}
+
+def sentence(rng, low, high):
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(low, high))).capitalize() + '.'
+
+def insert_chunked(db, model, rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= CHUNK_SIZE:
+            db.session.execute(db.insert(model), batch)
+            batch = []
+    if batch:
+        db.session.execute(db.insert(model), batch)
+
+def seed(args):
+    sys.path.insert(0, ROOT)
+    from werkzeug.security import generate_password_hash
+    from umiam import create_app, models
+    from umiam.alumni import alumni_facet_statements
+    from umiam.analytics import DONE_STATUSES, complaint_rollup_statements
+    from umiam.cache import touch_change_stamp
+    from umiam.extensions import db
+    from umiam.history import complaint_event_backfill_statements
+    from umiam.migrations import migrate_db
+    from umiam.registrations import EVENT_COUNTERS_SQL
+    from umiam.search import search_backfill_statements, search_index_statements
+    from umiam.stats import rebuild_stats
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.abspath(args.database)})
+
+    rng = random.Random(args.seed)
+    now = datetime.utcnow()
+    timings = {}
+
+    def step(name, model, rows):
+        started = time.perf_counter()
+        insert_chunked(db, model, rows)
+        timings[name] = round(time.perf_counter() - started, 3)
+
+    with app.app_context():
+        migrate_db()
+        if db.session.query(models.User.id).first() is not None:
+            sys.exit(f'{args.database} already has users; seed a fresh database file instead.')
+
+        # Maintaining the search index row by row through its triggers dominates a
+        # bulk load; drop them for the load and rebuild the index in one pass after.
+        for statement in search_index_statements():
+            if statement.startswith('CREATE TRIGGER'):
+                db.session.execute(db.text('DROP TRIGGER IF EXISTS ' + statement.split()[5]))
+
+        password_hash = generate_password_hash(PASSWORD)
+        step('users', models.User, (
+            {'username': f'{"admin" if i < args.admins else "student"}{i}',
+             'email': f'{"admin" if i < args.admins else "student"}{i}@iitg.ac.in',
+             'password_hash': password_hash,
+             'role': 'HMC Admin' if i < args.admins else 'Student',
+             'name': f'Resident {i}',
+             'roll_number': str(200101000 + i),
+             'room_number': f'{rng.choice("ABCD")}-{rng.randint(1, 350)}',
+             'studying_year': rng.choice(YEARS),
+             'Branch': rng.choice(BRANCHES)}
+            for i in range(args.users)
+        ))
+        user_ids = [user_id for (user_id,) in db.session.query(models.User.id)]
+        step('umiam_students', models.UmiamStudent, (
+            {'email': email} for (email,) in db.session.query(models.User.email)
+        ))
+
+        statuses, weights = zip(*STATUS_WEIGHTS.items())
+        step('complaints', models.Complaint, (
+            {'category': rng.choice(models.COMPLAINT_CATEGORIES),
+             'details': sentence(rng, 8, 40),
+             'status': (status := rng.choices(statuses, weights)[0]),
+             'submission_date': (submitted := now - timedelta(minutes=rng.randint(0, 2 * 365 * 24 * 60))),
+             # Finished complaints took anywhere from minutes to a few weeks, skewed short.
+             'resolved_at': min(submitted + timedelta(hours=rng.lognormvariate(3, 1.2)), now)
+             if status in DONE_STATUSES else None,
+             'user_id': None if rng.random() < 0.1 else rng.choice(user_ids),
+             'anonymous': 'no',
+             'comments': sentence(rng, 4, 12) if rng.random() < 0.3 else None}
+            for _ in range(args.complaints)
+        ))
+
+        step('events', models.Event, (
+            {'title': f'Event {i}: {sentence(rng, 2, 4)}',
+             'description': sentence(rng, 10, 30),
+             'location': rng.choice(['Auditorium', 'Sports Complex', 'Common Room', 'Lawn']),
+             'start_datetime': (start := now + timedelta(hours=rng.randint(-24 * 180, 24 * 180))),
+             'end_datetime': start + timedelta(hours=rng.randint(1, 8))}
+            for i in range(args.events)
+        ))
+        event_ids = [event_id for (event_id,) in db.session.query(models.Event.id)]
+        pairs = set()
+        target = min(args.registrations, len(event_ids) * len(user_ids))
+        while len(pairs) < target:
+            pairs.add((rng.choice(event_ids), rng.choice(user_ids)))
+        step('event_registrations', models.EventRegistration, (
+            {'event_id': event_id, 'user_id': user_id,
+             'registration_date': now - timedelta(minutes=rng.randint(0, 60 * 24 * 90))}
+            for event_id, user_id in sorted(pairs)
+        ))
+
+        admin_ids = user_ids[:max(args.admins, 1)]
+        step('announcements', models.Announcement, (
+            {'title': sentence(rng, 3, 6), 'content': sentence(rng, 20, 60),
+             'date_posted': now - timedelta(hours=rng.randint(0, 24 * 365)),
+             'user_id': rng.choice(admin_ids)}
+            for _ in range(args.announcements)
+        ))
+        step('notices', models.Notice, (
+            {'message': sentence(rng, 5, 15)[:200], 'priority': rng.choice(['Normal', 'Normal', 'Important', 'Urgent']),
+             'created_at': now - timedelta(hours=rng.randint(0, 24 * 365))}
+            for _ in range(args.notices)
+        ))
+        step('alumni', models.Alumni, (
+            {'name': f'Alumnus {i}', 'batch_year': str(rng.randint(1995, 2024)),
+             'current_position': rng.choice(POSITIONS), 'company': rng.choice(COMPANIES),
+             'email': f'alumnus{i}@example.com', 'achievements': sentence(rng, 5, 20)}
+            for i in range(args.alumni)
+        ))
+        step('facilities', models.Facility, (
+            {'name': f'Facility {i}', 'description': sentence(rng, 10, 25),
+             'location': f'Block {rng.choice("ABCD")}', 'availability': rng.choice(['24x7', '6 AM - 10 PM'])}
+            for i in range(args.facilities)
+        ))
+        step('achievements', models.Achievement, (
+            {'title': sentence(rng, 3, 6), 'description': sentence(rng, 10, 30),
+             'year': str(rng.randint(2005, 2025)), 'category': rng.choice(['Sports', 'Cultural', 'Technical'])}
+            for _ in range(args.achievements)
+        ))
+        db.session.commit()
+
+        started = time.perf_counter()
+        for statement in (search_index_statements() + search_backfill_statements() + complaint_rollup_statements()
+                          + complaint_event_backfill_statements() + alumni_facet_statements()):
+            db.session.execute(db.text(statement))
+        db.session.execute(db.text(EVENT_COUNTERS_SQL))
+        for name in ('notice', 'announcement', 'event', 'facility', 'achievement', 'alumni'):
+            touch_change_stamp(name)
+        db.session.commit()
+        rebuild_stats()
+        timings['derived'] = round(time.perf_counter() - started, 3)
+
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database', required=True, help='path of the SQLite file to create')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--admins', type=int, default=20)
+    parser.add_argument('--complaints', type=int, default=200000)
+    parser.add_argument('--events', type=int, default=500)
+    parser.add_argument('--registrations', type=int, default=50000)
+    parser.add_argument('--announcements', type=int, default=500)
+    parser.add_argument('--notices', type=int, default=3000)
+    parser.add_argument('--alumni', type=int, default=3000)
+    parser.add_argument('--facilities', type=int, default=40)
+    parser.add_argument('--achievements', type=int, default=300)
+    args = parser.parse_args()
+    started = time.perf_counter()
+    timings = seed(args)
+    print(json.dumps({'database': args.database, 'seconds': round(time.perf_counter() - started, 3),
+                      'steps': timings}))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""Hammer a scratch copy of the database with concurrent readers and writers.
+
+Each worker process imports the app against the same temporary SQLite file and
+loops over a mix of dashboard-style reads and complaint inserts for a fixed
+duration. The run is repeated for the legacy engine settings (rollback journal,
+no tuning pragmas) and the default WAL profile from create_app(), and the results are
+printed as JSON:
+
+    python benchmarks/sqlite_concurrency.py --workers 8 --seconds 10 --write-ratio 0.2
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROFILES = {
+    'legacy': {
+        'FLASK_SQLITE_JOURNAL_MODE': 'DELETE',
+        'FLASK_SQLITE_SYNCHRONOUS': 'FULL',
+        'FLASK_SQLITE_BUSY_TIMEOUT': '',
+        'FLASK_SQLITE_MMAP_SIZE': '',
+        'FLASK_SQLITE_CACHE_SIZE': '',
+    },
+    'tuned': {},
+}
+
+def worker(db_uri, profile, seconds, write_ratio, seed, results):
+    os.environ['FLASK_SQLALCHEMY_DATABASE_URI'] = json.dumps(db_uri)
+    os.environ.update(PROFILES[profile])
+    sys.path.insert(0, ROOT)
+    from sqlalchemy.exc import OperationalError
+    from umiam import create_app
+    from umiam.extensions import db
+    from umiam.models import Complaint, Notice
+
+    app = create_app()
+
+    rng = random.Random(seed)
+    reads = writes = errors = 0
+    latencies = []
+    with app.app_context():
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                if rng.random() < write_ratio:
+                    db.session.add(Complaint(category='Internet', details='benchmark complaint', anonymous='yes'))
+                    db.session.commit()
+                    writes += 1
+                else:
+                    Notice.query.order_by(Notice.created_at.desc()).limit(5).all()
+                    Complaint.query.filter_by(status='Submitted').count()
+                    db.session.rollback()
+                    reads += 1
+            except OperationalError:
+                db.session.rollback()
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+    results.put({'reads': reads, 'writes': writes, 'errors': errors, 'latencies': latencies})
+
+def run_profile(profile, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_uri = 'sqlite:///' + os.path.join(tmp, 'bench.db')
+        setup = multiprocessing.Process(target=create_schema, args=(db_uri, profile))
+        setup.start()
+        setup.join()
+
+        results = multiprocessing.Queue()
+        procs = [
+            multiprocessing.Process(target=worker, args=(db_uri, profile, args.seconds, args.write_ratio, i, results))
+            for i in range(args.workers)
+        ]
+        for proc in procs:
+            proc.start()
+        collected = [results.get() for _ in procs]
+        for proc in procs:
+            proc.join()
+
+    latencies = sorted(l for r in collected for l in r['latencies'])
+    def pct(p):
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000, 3) if latencies else None
+    return {
+        'profile': profile,
+        'workers': args.workers,
+        'seconds': args.seconds,
+        'reads_per_s': round(sum(r['reads'] for r in collected) / args.seconds, 1),
+        'writes_per_s': round(sum(r['writes'] for r in collected) / args.seconds, 1),
+        'locked_errors': sum(r['errors'] for r in collected),
+        'p50_ms': pct(0.50),
+        'p99_ms': pct(0.99),
+    }
+
+def create_schema(db_uri, profile):
+    os.environ['FLASK_SQLALCHEMY_DATABASE_URI'] = json.dumps(db_uri)
+    os.environ.update(PROFILES[profile])
+    sys.path.insert(0, ROOT)
+    from umiam import create_app
+    from umiam.migrations import migrate_db
+    app = create_app()
+    with app.app_context():
+        migrate_db()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    parser.add_argument('--profile', choices=sorted(PROFILES), action='append',
+                        help='profile(s) to run; defaults to all')
+    args = parser.parse_args()
+    multiprocessing.set_start_method('spawn')
+    for profile in args.profile or PROFILES:
+        print(json.dumps(run_profile(profile, args)))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""Load-test the live notice board with many concurrent SSE subscribers.
+
+Serves the app from a threaded WSGI server (comparable to one gunicorn gthread
+worker) against a scratch database, measures plain page latency, opens N
+/notices/stream connections, measures page latency again while they are idle,
+then publishes a notice and times how long it takes to reach every subscriber.
+Results are printed as JSON:
+
+    python benchmarks/sse_fanout.py --subscribers 300
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def page_latencies(port, path, count):
+    latencies = []
+    for _ in range(count):
+        conn = http.client.HTTPConnection('127.0.0.1', port)
+        started = time.perf_counter()
+        conn.request('GET', path)
+        conn.getresponse().read()
+        latencies.append((time.perf_counter() - started) * 1000)
+        conn.close()
+    latencies.sort()
+    return {'p50_ms': round(statistics.median(latencies), 3),
+            'p95_ms': round(latencies[int(len(latencies) * 0.95) - 1], 3)}
+
+def subscriber(port, connected, received, stop):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    conn.request('GET', '/notices/stream')
+    response = conn.getresponse()
+    connected.release()
+    while not stop.is_set():
+        line = response.fp.readline()
+        if not line:
+            break
+        if line.startswith(b'event: notice'):
+            received.append(time.perf_counter())
+            break
+    conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--subscribers', type=int, default=300)
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    os.environ['FLASK_SQLALCHEMY_DATABASE_URI'] = json.dumps('sqlite:///' + os.path.join(tmp, 'bench.db'))
+    sys.path.insert(0, ROOT)
+    from werkzeug.serving import make_server
+    from umiam import create_app
+    from umiam.cache import touch_change_stamp
+    from umiam.extensions import db
+    from umiam.migrations import migrate_db
+    from umiam.models import Facility, Notice
+    from umiam.notices import notice_hub, publish_notice_change
+
+    app = create_app()
+
+    with app.app_context():
+        migrate_db()
+        db.session.add_all(Facility(name=f'Facility {i}', description='Benchmark facility', location='Block A',
+                                    availability='Open') for i in range(20))
+        db.session.commit()
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    port = server.server_port
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    baseline = page_latencies(port, '/facilities', args.requests)
+
+    connected = threading.Semaphore(0)
+    received = []
+    stop = threading.Event()
+    threads = [threading.Thread(target=subscriber, args=(port, connected, received, stop), daemon=True)
+               for _ in range(args.subscribers)]
+    for thread in threads:
+        thread.start()
+    for _ in threads:
+        connected.acquire()
+    while notice_hub.subscriber_count < args.subscribers:
+        time.sleep(0.01)
+
+    with_subscribers = page_latencies(port, '/facilities', args.requests)
+
+    with app.app_context():
+        notice = Notice(message='Benchmark notice', priority='Urgent')
+        db.session.add(notice)
+        touch_change_stamp('notice')
+        db.session.commit()
+        published_at = time.perf_counter()
+        publish_notice_change(notice, 'added')
+    deadline = time.time() + 30
+    while len(received) < args.subscribers and time.time() < deadline:
+        time.sleep(0.005)
+    stop.set()
+    server.shutdown()
+
+    delivery = sorted((t - published_at) * 1000 for t in received)
+    print(json.dumps({
+        'subscribers': args.subscribers,
+        'page_latency_idle': baseline,
+        'page_latency_with_subscribers': with_subscribers,
+        'delivered': len(delivery),
+        'fanout_p50_ms': round(statistics.median(delivery), 3) if delivery else None,
+        'fanout_max_ms': round(delivery[-1], 3) if delivery else None,
+    }))
+
+if __name__ == '__main__':
+    main()
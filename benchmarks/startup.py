@@ -0,0 +1,138 @@
+"""Measure cold start: package import, create_app() and first requests, in fresh interpreters.
+
+Each run starts a new Python process that imports the package, builds the app
+and sends the first request to a few pages through the test client, timing
+each step. That is the cost every gunicorn worker (without --preload) and every
+test process pays before serving anything. Medians over --runs processes are
+written as JSON:
+
+    python benchmarks/startup.py --runs 10 --output startup.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = ['/', '/login', '/facilities', '/search?q=water']
+
+def child(database):
+    """Runs in the measured process; prints one JSON line of timings."""
+    started = time.perf_counter()
+    sys.path.insert(0, ROOT)
+    import umiam
+    imported = time.perf_counter()
+    app = umiam.create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + database})
+    created = time.perf_counter()
+    modules_at_startup = set(sys.modules)
+
+    client = app.test_client()
+    first_requests = {}
+    for path in PAGES:
+        request_started = time.perf_counter()
+        response = client.get(path)
+        response.get_data()
+        first_requests[path] = (time.perf_counter() - request_started) * 1000
+        assert response.status_code == 200, f'{path} returned {response.status_code}'
+    request_started = time.perf_counter()
+    client.get(PAGES[1]).get_data()
+    warm_request = (time.perf_counter() - request_started) * 1000
+
+    print(json.dumps({
+        'import_ms': (imported - started) * 1000,
+        'create_app_ms': (created - imported) * 1000,
+        'first_request_ms': first_requests,
+        'warm_request_ms': warm_request,
+        'modules_at_startup': len(modules_at_startup),
+        'lazy_modules_at_startup': sorted(set(umiam.LAZY_MODULES) & modules_at_startup),
+    }))
+
+def run_child(database, *python_flags):
+    started = time.perf_counter()
+    completed = subprocess.run([sys.executable, *python_flags, os.path.abspath(__file__), '--child', database],
+                               capture_output=True, text=True, check=True, cwd=ROOT)
+    return completed, (time.perf_counter() - started) * 1000
+
+def slowest_imports(stderr, count):
+    # -X importtime lines look like "import time:  self [us] | cumulative | name".
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((int(self_us), int(cumulative_us), name.strip()))
+    rows.sort(reverse=True)
+    return [{'module': name, 'self_ms': round(self_us / 1000, 2), 'cumulative_ms': round(cumulative_us / 1000, 2)}
+            for self_us, cumulative_us, name in rows[:count]]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--database', help='SQLite file to start against (default: a fresh migrated one)')
+    parser.add_argument('--importtime', type=int, default=15, metavar='N',
+                        help='also list the N imports with the highest self time (0 to skip)')
+    parser.add_argument('--output', help='write JSON here instead of stdout')
+    parser.add_argument('--child', metavar='DATABASE', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child)
+        return
+
+    database = args.database and os.path.abspath(args.database)
+    if database is None:
+        database = os.path.join(tempfile.mkdtemp(), 'startup.db')
+        sys.path.insert(0, ROOT)
+        from umiam import create_app
+        from umiam.migrations import migrate_db
+        with create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + database}).app_context():
+            migrate_db()
+
+    run_child(database)  # prime the OS file cache and .pyc files, like any restart after the first
+    runs = []
+    for _ in range(args.runs):
+        completed, process_ms = run_child(database)
+        runs.append({**json.loads(completed.stdout), 'process_ms': process_ms})
+
+    def median(key, path=None):
+        values = [run[key][path] if path else run[key] for run in runs]
+        return round(statistics.median(values), 2)
+
+    try:
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                  text=True).stdout.strip() or None
+    except OSError:
+        revision = None
+    report = {
+        'revision': revision,
+        'python': platform.python_version(),
+        'runs': args.runs,
+        'import_ms': median('import_ms'),
+        'create_app_ms': median('create_app_ms'),
+        'first_request_ms': {path: median('first_request_ms', path) for path in PAGES},
+        'warm_request_ms': median('warm_request_ms'),
+        # Interpreter start to exit, including everything above.
+        'process_ms': median('process_ms'),
+        'modules_at_startup': runs[-1]['modules_at_startup'],
+        'lazy_modules_at_startup': runs[-1]['lazy_modules_at_startup'],
+    }
+    if args.importtime:
+        completed, _ = run_child(database, '-X', 'importtime')
+        report['slowest_imports'] = slowest_imports(completed.stderr, args.importtime)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    print(f"import {report['import_ms']} ms, create_app {report['create_app_ms']} ms, "
+          f"first {PAGES[0]} {report['first_request_ms'][PAGES[0]]} ms, process {report['process_ms']} ms",
+          file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
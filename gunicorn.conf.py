@@ -0,0 +1,33 @@
+# gunicorn.conf.py
+# Read automatically by `gunicorn app:app` when started from this directory.
+# The app is imported once in the master and workers are forked from it, so the
+# interpreter, the imported modules and the compiled templates are shared
+# copy-on-write instead of being rebuilt by every worker. Any setting can still be
+# overridden on the command line or through GUNICORN_CMD_ARGS.
+import gc
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '127.0.0.1:8000')
+workers = int(os.environ.get('WEB_CONCURRENCY', min(multiprocessing.cpu_count() * 2 + 1, 8)))
+# Each open notice board stream parks a thread (see umiam/notices.py).
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 200))
+preload_app = True
+
+# Collections in the master would free objects in between the shared ones and
+# leave holes in pages the workers then copy; nothing is collected until the
+# shared objects are frozen just before the first fork.
+gc.disable()
+
+def when_ready(server):
+    # Runs in the master after the preloaded app is imported and before any worker is forked.
+    from umiam import warm_up
+    from umiam.migrations import migrate_db
+
+    app = server.app.wsgi()
+    with app.app_context():
+        for version, description in migrate_db():
+            server.log.info('Applied migration %s: %s', version, description)
+    warm_up(app)
+    gc.enable()
@@ -0,0 +1,68 @@
+# tests/conftest.py
+# Each test gets an app on a fresh SQLite file, migrated to the current schema,
+# with no background job workers (tests run the queue themselves) and with
+# media and avatars written under the test's temporary directory.
+import pytest
+from flask import g
+from werkzeug.security import generate_password_hash
+
+from umiam import create_app
+from umiam.cache import page_cache
+from umiam.extensions import db
+from umiam.migrations import migrate_db
+from umiam.models import User
+
+PASSWORD = 'secret1'
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'test.db'}",
+        'WTF_CSRF_ENABLED': False,
+        'JOB_WORKERS': 0,
+        'RATE_LIMIT_ENABLED': False,
+        'MEDIA_DIR': str(tmp_path / 'media'),
+        'IMAGE_ORIGINALS_DIR': str(tmp_path / 'originals'),
+        'AVATAR_CACHE_DIR': str(tmp_path / 'avatars'),
+    })
+
+    def forget_cached_user():
+        g.pop('_login_user', None)
+
+    # Requests share the test's app context, and with it the user flask-login
+    # cached on g; dropping it first lets each client be whoever its cookie says.
+    app.before_request_funcs.setdefault(None, []).insert(0, forget_cached_user)
+    # Pages are cached per process, keyed by stamp versions that every fresh database repeats.
+    page_cache.clear()
+    with app.app_context():
+        migrate_db()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def make_user(app):
+    """make_user(username, role='Student', **columns) adds and commits a user who signs in with PASSWORD."""
+    password_hash = generate_password_hash(PASSWORD)
+
+    def make_user(username, role='Student', **columns):
+        user = User(username=username, email=f'{username}@iitg.ac.in', password_hash=password_hash, role=role,
+                    **{'name': username.title(), **columns})
+        db.session.add(user)
+        db.session.commit()
+        return user
+    return make_user
+
+@pytest.fixture
+def login(client):
+    """login(user) signs `client` in as user; pass another test client to sign that one in instead."""
+    def login(user, as_client=client):
+        response = as_client.post('/login', data={'email': user.email, 'password': PASSWORD})
+        assert response.status_code == 302
+        return as_client
+    return login
@@ -0,0 +1,75 @@
+# tests/test_api.py
+import base64
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from umiam.extensions import db
+from umiam.models import Alumni, Notice
+from umiam.pagination import decode_cursor, encode_cursor
+
+def raw_cursor(value):
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip('=')
+
+def walk(client, url):
+    """Every page of a collection, following next links; returns (items, page count)."""
+    items, pages = [], 0
+    while url:
+        body = client.get(url).get_json()
+        items += body['data']
+        pages += 1
+        url = body['next'] and body['next'].replace('http://localhost', '')
+    return items, pages
+
+def test_cursor_round_trip():
+    when = datetime(2030, 4, 1, 9, 30, 15, 250)
+    assert decode_cursor(encode_cursor(when, 7), datetime) == (when, 7)
+    assert decode_cursor(encode_cursor('2019', 42), str) == ('2019', 42)
+    assert decode_cursor(encode_cursor(None, 3), str) == (None, 3)
+    assert decode_cursor('', str) is None
+
+def test_notices_page_newest_first_without_gaps(client):
+    start = datetime(2030, 1, 1)
+    # Pairs share a timestamp, so the id has to break ties across page boundaries.
+    db.session.add_all(Notice(message=f'Notice {index}', priority='Normal',
+                              created_at=start + timedelta(minutes=index // 2)) for index in range(25))
+    db.session.commit()
+
+    items, pages = walk(client, '/api/v1/notices?limit=4&fields=id,created_at')
+
+    assert pages == 7
+    expected = [notice.id for notice in Notice.query.order_by(Notice.created_at.desc(), Notice.id.desc())]
+    assert [item['id'] for item in items] == expected
+    assert set(items[0]) == {'id', 'created_at'}
+
+def test_filtered_alumni_cursor_keeps_the_filter(client):
+    db.session.add_all(Alumni(name=f'Alum {index}', batch_year=str(2010 + index % 3),
+                              company='Acme' if index % 2 else 'Other') for index in range(30))
+    db.session.commit()
+
+    items, _ = walk(client, '/api/v1/alumni?company=Acme&limit=4')
+
+    assert len(items) == 15 and {item['company'] for item in items} == {'Acme'}
+    assert [(item['batch_year'], item['id']) for item in items] == sorted(
+        ((item['batch_year'], item['id']) for item in items), reverse=True)
+
+@pytest.mark.parametrize('cursor', [
+    'not base64 at all!', raw_cursor('just a string'), raw_cursor([[1], 1]), raw_cursor(['2030-01-01', True]),
+    raw_cursor(['2030-01-01', '5']), raw_cursor([1, 2, 3]), raw_cursor(['yesterday', 5]), raw_cursor({'id': 5}),
+])
+def test_bad_cursor_is_400(client, cursor):
+    response = client.get('/api/v1/notices', query_string={'cursor': cursor})
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Invalid cursor.'}
+
+def test_cursor_of_the_wrong_type_for_the_sort_column_is_400(client):
+    # Alumni sort by batch year, which is text.
+    response = client.get('/api/v1/alumni', query_string={'cursor': raw_cursor([2019, 5])})
+    assert response.status_code == 400
+
+@pytest.mark.parametrize('limit', ['0', '101', '-5'])
+def test_limit_out_of_range_is_400(client, limit):
+    response = client.get('/api/v1/notices', query_string={'limit': limit})
+    assert response.status_code == 400
+    assert 'limit' in response.get_json()['error']
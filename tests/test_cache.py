@@ -0,0 +1,80 @@
+# tests/test_cache.py
+from datetime import datetime
+
+import pytest
+
+from umiam import cache
+from umiam.cache import touch_change_stamp
+from umiam.extensions import db
+from umiam.models import Facility
+
+class Clock(datetime):
+    """Stands in for datetime in umiam.cache, so stamps and Last-Modified follow `frozen`."""
+    frozen = None
+
+    @classmethod
+    def utcnow(cls):
+        return cls.frozen
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls.frozen.replace(tzinfo=tz)
+
+@pytest.fixture
+def clock(monkeypatch):
+    monkeypatch.setattr(cache, 'datetime', Clock)
+    return Clock
+
+def add_facility(name):
+    # What the admin views do: the change and its stamp bump in one transaction.
+    db.session.add(Facility(name=name, description='Open to residents', location='Block A', availability='Open'))
+    touch_change_stamp('facility')
+    db.session.commit()
+
+def test_matching_etag_gets_304(client):
+    add_facility('Gym')
+    first = client.get('/facilities')
+    assert first.status_code == 200 and 'Gym' in first.get_data(as_text=True)
+
+    again = client.get('/facilities', headers={'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304
+    assert again.get_data() == b''
+
+def test_admin_edit_invalidates_cached_page(app, client, make_user, login):
+    add_facility('Gym')
+    visitor = app.test_client()
+    first = visitor.get('/facilities')
+
+    login(make_user('warden', role='HMC Admin'))
+    response = client.post('/admin/facility/add', data={'name': 'Pool', 'description': 'Indoor', 'location': 'Block B',
+                                                        'availability': 'Open'})
+    assert response.status_code == 302
+
+    fresh = visitor.get('/facilities', headers={'If-None-Match': first.headers['ETag']})
+    assert fresh.status_code == 200
+    assert 'Pool' in fresh.get_data(as_text=True)
+    assert fresh.headers['ETag'] != first.headers['ETag']
+
+def test_edit_in_the_same_second_is_not_hidden_by_if_modified_since(client, clock):
+    clock.frozen = datetime(2030, 1, 1, 12, 0, 0, 100_000)
+    add_facility('Gym')
+    clock.frozen = datetime(2030, 1, 1, 12, 0, 0, 200_000)
+    first = client.get('/facilities')
+    clock.frozen = datetime(2030, 1, 1, 12, 0, 0, 700_000)
+    add_facility('Pool')
+
+    clock.frozen = datetime(2030, 1, 1, 12, 0, 0, 800_000)
+    fresh = client.get('/facilities', headers={'If-Modified-Since': first.headers['Last-Modified']})
+    assert fresh.status_code == 200
+    assert 'Pool' in fresh.get_data(as_text=True)
+
+    # Once that second is over the page is dated to its end, and revalidates.
+    clock.frozen = datetime(2030, 1, 1, 12, 0, 5)
+    settled = client.get('/facilities')
+    assert settled.headers['Last-Modified'] == 'Tue, 01 Jan 2030 12:00:01 GMT'
+    assert client.get('/facilities', headers={'If-Modified-Since': settled.headers['Last-Modified']}).status_code == 304
+
+    add_facility('Sauna')
+    changed = client.get('/facilities', headers={'If-Modified-Since': settled.headers['Last-Modified']})
+    assert changed.status_code == 200
+    assert 'Sauna' in changed.get_data(as_text=True)
@@ -0,0 +1,58 @@
+# tests/test_events.py
+from datetime import datetime, timedelta
+
+from sqlalchemy import event as sa_event
+from werkzeug.security import generate_password_hash
+
+from umiam.extensions import db
+from umiam.models import Event, EventRegistration, User
+
+def add_events(first, count, viewer_id, other_id):
+    start = datetime(2030, 1, 1, 18, 0)
+    for index in range(first, first + count):
+        event = Event(title=f'Event {index}', description='Benchmark event', location='Hall',
+                      start_datetime=start + timedelta(days=index), end_datetime=start + timedelta(days=index, hours=2),
+                      capacity=1, seats_taken=1, waitlist_size=index % 2)
+        db.session.add(event)
+        db.session.flush()
+        # Alternate between events the viewer holds a seat for, is waitlisted
+        # for and has not joined, so every branch of the card is rendered.
+        if index % 3 == 0:
+            db.session.add(EventRegistration(event_id=event.id, user_id=viewer_id))
+        else:
+            db.session.add(EventRegistration(event_id=event.id, user_id=other_id))
+            if index % 3 == 1:
+                db.session.add(EventRegistration(event_id=event.id, user_id=viewer_id, status='waitlisted'))
+    db.session.commit()
+
+def test_events_page_query_count_does_not_grow_with_events(app, client):
+    viewer = User(username='viewer', email='viewer@iitg.ac.in', password_hash=generate_password_hash('secret1'),
+                  role='Student', name='Viewer')
+    other = User(username='other', email='other@iitg.ac.in', password_hash='x', role='Student', name='Other')
+    db.session.add_all([viewer, other])
+    db.session.commit()
+    viewer_id, other_id = viewer.id, other.id
+    assert client.post('/login', data={'email': 'viewer@iitg.ac.in', 'password': 'secret1'}).status_code == 302
+
+    statements = []
+
+    def count_statement(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    def queries_for_events_page():
+        statements.clear()
+        sa_event.listen(db.engine, 'before_cursor_execute', count_statement)
+        try:
+            response = client.get('/events')
+        finally:
+            sa_event.remove(db.engine, 'before_cursor_execute', count_statement)
+        assert response.status_code == 200
+        return len(statements), response.get_data(as_text=True)
+
+    add_events(0, 10, viewer_id, other_id)
+    with_ten, _ = queries_for_events_page()
+    add_events(10, 10, viewer_id, other_id)
+    with_twenty, body = queries_for_events_page()
+
+    assert 'Event 19' in body
+    assert with_twenty == with_ten
@@ -0,0 +1,26 @@
+# tests/test_exports.py
+import csv
+import io
+from datetime import datetime
+
+from umiam.extensions import db
+from umiam.models import Event, EventRegistration
+
+def test_csv_export_keeps_formulas_as_text(client, make_user, login):
+    event = Event(title='Quiz', description='Trivia night', location='Common room',
+                  start_datetime=datetime(2030, 2, 1, 19, 0), end_datetime=datetime(2030, 2, 1, 21, 0))
+    db.session.add(event)
+    names = ['=HYPERLINK("http://evil.example","x")', '+1+2', '-3', '@SUM(A1)', 'Plain Name']
+    for index, name in enumerate(names):
+        user = make_user(f'student{index}', name=name, roll_number=f'=cmd|{index}')
+        db.session.add(EventRegistration(event_id=event.id, user_id=user.id))
+    db.session.commit()
+    login(make_user('warden', role='HMC Admin'))
+
+    response = client.get(f'/admin/event/registrations/{event.id}/export/csv')
+
+    assert response.status_code == 200
+    header, *rows = csv.reader(io.StringIO(response.get_data(as_text=True)))
+    assert header[:2] == ['Name', 'Roll Number']
+    assert sorted(row[0] for row in rows) == sorted(["'" + name for name in names[:4]] + ['Plain Name'])
+    assert {row[1][:2] for row in rows} == {"'="}
@@ -0,0 +1,70 @@
+# tests/test_history.py
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event as sa_event
+
+from umiam.extensions import db
+from umiam.models import Complaint, ComplaintEvent
+
+@pytest.fixture
+def admin(client, make_user, login):
+    admin = make_user('warden', role='HMC Admin')
+    login(admin)
+    return admin
+
+@pytest.fixture
+def complaint_ids(app, make_user):
+    student = make_user('resident')
+    start = datetime(2030, 1, 1, 9, 0)
+    complaints = [Complaint(category='Internet', details=f'Wi-Fi down {index}', status='Submitted',
+                            user_id=student.id, anonymous='no', submission_date=start + timedelta(hours=index))
+                  for index in range(5)]
+    db.session.add_all(complaints)
+    db.session.commit()
+    return [complaint.id for complaint in complaints]
+
+def bulk_update(client, ids):
+    return client.post('/admin/complaints/bulk', data={'scope': 'ids', 'ids': ids, 'new_status': 'In Progress',
+                                                       'comment': 'Router replaced'})
+
+def test_bulk_update_writes_history_in_its_transaction(client, admin, complaint_ids):
+    transactions = [[]]
+    listeners = [
+        ('before_cursor_execute', lambda conn, cursor, statement, *args: transactions[-1].append(statement)),
+        ('commit', lambda conn: transactions.append([])),
+        ('rollback', lambda conn: transactions.append([])),
+    ]
+    for name, listener in listeners:
+        sa_event.listen(db.engine, name, listener)
+    try:
+        assert bulk_update(client, complaint_ids[:3]).status_code == 302
+    finally:
+        for name, listener in listeners:
+            sa_event.remove(db.engine, name, listener)
+
+    writer = next(statements for statements in transactions if any(s.startswith('UPDATE complaint ') for s in statements))
+    # Six events (a status change and a comment for each complaint) in one INSERT, alongside the UPDATE.
+    assert sum(statement.startswith('INSERT INTO complaint_event') for statement in writer) == 1
+    events = ComplaintEvent.query.order_by(ComplaintEvent.complaint_id, ComplaintEvent.id).all()
+    assert [(event.complaint_id, event.kind, event.old_status, event.new_status, event.comment) for event in events] == [
+        row for complaint_id in complaint_ids[:3] for row in (
+            (complaint_id, 'status', 'Submitted', 'In Progress', None),
+            (complaint_id, 'comment', None, None, 'Router replaced'))]
+    assert {event.actor_id for event in events} == {admin.id}
+
+def test_failed_commit_keeps_neither_change_nor_history(client, admin, complaint_ids):
+    def fail_commit(session):
+        raise RuntimeError('disk full')
+
+    # Runs after the history hook has written its rows, just before COMMIT.
+    sa_event.listen(db.session, 'before_commit', fail_commit)
+    try:
+        with pytest.raises(RuntimeError):
+            bulk_update(client, complaint_ids[:3])
+    finally:
+        sa_event.remove(db.session, 'before_commit', fail_commit)
+    db.session.rollback()
+
+    assert {status for status, in db.session.query(Complaint.status)} == {'Submitted'}
+    assert ComplaintEvent.query.count() == 0
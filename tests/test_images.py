@@ -0,0 +1,27 @@
+# tests/test_images.py
+import io
+import os
+
+from PIL import Image
+
+from umiam.models import Facility
+
+def png(width, height):
+    buffer = io.BytesIO()
+    Image.new('1', (width, height)).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+def test_oversized_upload_is_a_form_error(app, client, make_user, login):
+    login(make_user('warden', role='HMC Admin'))
+    data = png(8000, 6000)
+    assert len(data) < app.config['MAX_CONTENT_LENGTH']
+
+    response = client.post('/admin/facility/add', data={
+        'name': 'Gym', 'description': 'Weights', 'location': 'Block C', 'availability': 'Open',
+        'image_file': (io.BytesIO(data), 'huge.png'),
+    }, content_type='multipart/form-data')
+
+    assert response.status_code == 200
+    assert 'That image is too large; please upload a smaller one.' in response.get_data(as_text=True)
+    assert Facility.query.count() == 0
+    assert not os.path.exists(app.config['IMAGE_ORIGINALS_DIR'])
@@ -0,0 +1,68 @@
+# tests/test_mail.py
+import threading
+from datetime import datetime, timedelta
+from email import message_from_bytes
+
+import pytest
+
+from umiam import jobs
+from umiam.extensions import db
+from umiam.jobs import enqueue, run_due_jobs, work
+from umiam.mail import SMTPSink
+from umiam.models import Event, EventRegistration, Job, User
+
+@pytest.fixture
+def sink(app):
+    server = SMTPSink(('127.0.0.1', 0))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    app.config['MAIL_PORT'] = server.server_address[1]
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def event(app):
+    start = datetime(2030, 1, 10, 18, 0)
+    event = Event(title='Hostel Night', description='Dinner and music', location='Mess',
+                  start_datetime=start, end_datetime=start + timedelta(hours=3))
+    db.session.add(event)
+    for name in ('Asha', 'Bilal', 'Chen'):
+        user = User(username=name.lower(), email=f'{name.lower()}@iitg.ac.in', password_hash='x', role='Student',
+                    name=name)
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(EventRegistration(event_id=event.id, user_id=user.id))
+    db.session.commit()
+    return event
+
+def queue_event_changed(event):
+    enqueue('event_changed', {'event_id': event.id, 'old_start': '2030-01-09 18:00', 'old_end': '2030-01-09 21:00'})
+    db.session.commit()
+
+def test_event_change_emails_every_registrant(app, sink, event):
+    queue_event_changed(event)
+
+    work(app, burst=True)
+
+    received = sorted((recipients, message_from_bytes(data)) for _, recipients, data in sink.messages)
+    assert [recipients for recipients, _ in received] == [
+        ['<asha@iitg.ac.in>'], ['<bilal@iitg.ac.in>'], ['<chen@iitg.ac.in>']]
+    assert {message['Subject'] for _, message in received} == {'Time change: Hostel Night'}
+    assert 'Hello Asha,' in received[0][1].get_payload()
+    assert {job.status for job in Job.query} == {'done'}
+
+def test_fan_out_commits_with_the_job(app, event, monkeypatch):
+    queue_event_changed(event)
+
+    def worker_dies(rows, errors):
+        raise SystemExit('worker killed before recording the outcome')
+
+    monkeypatch.setattr(jobs, 'finish_jobs', worker_dies)
+    with pytest.raises(SystemExit):
+        run_due_jobs()
+    db.session.rollback()
+
+    # The emails went with the lost outcome, so when the lease runs out the job
+    # fans out again from scratch instead of emailing everyone twice.
+    job = Job.query.one()
+    assert (job.kind, job.status) == ('event_changed', 'running')
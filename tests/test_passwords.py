@@ -0,0 +1,31 @@
+# tests/test_passwords.py
+from umiam.extensions import db
+from umiam.passwords import PasswordHasher
+
+def hasher(method='scrypt', salt_length=16):
+    return PasswordHasher(method, salt_length, workers=0, max_pending=1)
+
+def test_current_hash_is_kept():
+    password_hash = hasher().hash('secret1')
+    assert hasher().verify(password_hash, 'secret1') == (True, None)
+    assert hasher().verify(password_hash, 'wrong') == (False, None)
+
+def test_changed_method_or_salt_length_rehashes():
+    old_hash = hasher(method='pbkdf2:sha256:1000', salt_length=8).hash('secret1')
+
+    matches, new_hash = hasher(method='pbkdf2:sha256:1000', salt_length=16).verify(old_hash, 'secret1')
+    assert matches
+    assert new_hash.startswith('pbkdf2:sha256:1000$') and len(new_hash.split('$')[1]) == 16
+
+    matches, new_hash = hasher(salt_length=8).verify(old_hash, 'secret1')
+    assert matches and new_hash.startswith('scrypt:')
+
+def test_sign_in_upgrades_stored_hash(app, client, make_user):
+    user = make_user('resident')
+    app.config['PASSWORD_SALT_LENGTH'] = 24
+    app.extensions['password_hasher'] = hasher(salt_length=24)
+
+    response = client.post('/login', data={'email': user.email, 'password': 'secret1'})
+    assert response.status_code == 302
+    db.session.refresh(user)
+    assert len(user.password_hash.split('$')[1]) == 24
@@ -0,0 +1,89 @@
+# tests/test_registrations.py
+import json
+import threading
+from datetime import datetime
+
+import pytest
+
+from umiam.extensions import db
+from umiam.models import Event, EventRegistration, Job
+from umiam.registrations import REGISTERED, WAITLISTED, register_for_event
+
+@pytest.fixture
+def event(app):
+    event = Event(title='Workshop', description='Hands-on', location='Lab', capacity=2,
+                  start_datetime=datetime(2030, 3, 1, 10, 0), end_datetime=datetime(2030, 3, 1, 12, 0))
+    db.session.add(event)
+    db.session.commit()
+    return event
+
+@pytest.fixture
+def students(app, make_user, login):
+    """Four students, each with a signed-in client of their own, in sign-up order."""
+    return [(user.id, login(user, app.test_client()))
+            for user in map(make_user, ('asha', 'bilal', 'chen', 'dev'))]
+
+def statuses(event_id):
+    rows = (db.session.query(EventRegistration.user_id, EventRegistration.status)
+            .filter_by(event_id=event_id).order_by(EventRegistration.user_id))
+    return dict(rows.all())
+
+def counters(event_id):
+    db.session.expire_all()
+    event = db.session.get(Event, event_id)
+    return event.seats_taken, event.waitlist_size
+
+def test_full_event_waitlists_instead_of_overbooking(event, students):
+    for _, client in students:
+        assert client.post(f'/event/register/{event.id}').status_code == 302
+    # A repeated submission changes nothing.
+    students[0][1].post(f'/event/register/{event.id}')
+
+    ids = [user_id for user_id, _ in students]
+    assert statuses(event.id) == {ids[0]: REGISTERED, ids[1]: REGISTERED, ids[2]: WAITLISTED, ids[3]: WAITLISTED}
+    assert counters(event.id) == (2, 2)
+
+def test_concurrent_sign_ups_never_exceed_capacity(app, event, make_user):
+    user_ids = [make_user(f'student{index}').id for index in range(12)]
+    results, errors = [], []
+
+    def sign_up(user_id):
+        with app.app_context():
+            try:
+                results.append(register_for_event(event.id, user_id))
+                db.session.commit()
+            except Exception as exc:
+                errors.append(exc)
+
+    threads = [threading.Thread(target=sign_up, args=(user_id,)) for user_id in user_ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert sorted(results) == [REGISTERED] * 2 + [WAITLISTED] * 10
+    assert list(statuses(event.id).values()).count(REGISTERED) == 2
+    assert counters(event.id) == (2, 10)
+
+def test_cancelling_promotes_the_next_waitlisted_student(event, students):
+    for _, client in students:
+        client.post(f'/event/register/{event.id}')
+    ids = [user_id for user_id, _ in students]
+
+    students[0][1].post(f'/event/register/{event.id}', data={'action': 'cancel'})
+
+    assert statuses(event.id) == {ids[1]: REGISTERED, ids[2]: REGISTERED, ids[3]: WAITLISTED}
+    assert counters(event.id) == (2, 1)
+    emails = [json.loads(job.payload)['to'] for job in Job.query.filter_by(kind='email')]
+    assert emails == ['chen@iitg.ac.in']
+
+def test_leaving_the_waitlist_promotes_nobody(event, students):
+    for _, client in students:
+        client.post(f'/event/register/{event.id}')
+    ids = [user_id for user_id, _ in students]
+
+    students[2][1].post(f'/event/register/{event.id}', data={'action': 'cancel'})
+
+    assert statuses(event.id) == {ids[0]: REGISTERED, ids[1]: REGISTERED, ids[3]: WAITLISTED}
+    assert counters(event.id) == (2, 1)
@@ -0,0 +1,102 @@
+# umiam/__init__.py
+# create_app() builds a configured application; app.py at the repository root is
+# the entry point for `flask --app app`, `python app.py` and gunicorn. Importing
+# this package defines the models and the per-process caches but opens no
+# database connection and loads no forms, exports, search or image code: views
+# import those on first use, and warm_up() loads them in a pre-forking server's
+# master so every worker shares one copy.
+import gc
+import importlib
+import os
+
+from flask import Flask
+from sqlalchemy import event as sa_event
+
+from . import assets, auth, avatars, cache, cli, history, images, jobs, mail, metrics, notices, passwords, ratelimit
+from .extensions import db, login_manager
+
+basedir = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+
+SQLITE_PRAGMAS = ['journal_mode', 'synchronous', 'busy_timeout', 'mmap_size', 'cache_size']
+
+# Modules the views import on first use.
+LAZY_MODULES = ['umiam.forms', 'umiam.exports', 'umiam.search', 'umiam.roster', 'umiam.migrations',
+                'PIL.Image', 'PIL.ImageOps', 'PIL.ExifTags']
+
+def create_app(config=None):
+    """Build the application.
+
+    `config` is a mapping applied over the defaults below and any FLASK_-prefixed
+    environment variables, e.g. {'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'TESTING': True}.
+    """
+    app = Flask(__name__, root_path=basedir)
+    app.config['SECRET_KEY'] = 'lalalala'
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(basedir, 'app.db')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+    # SQLite engine profile, tuned for several gunicorn workers sharing one database
+    # file. Every value can be overridden from the environment with a FLASK_ prefix,
+    # e.g. FLASK_SQLITE_BUSY_TIMEOUT=10000 or FLASK_SQLALCHEMY_DATABASE_URI=sqlite:////srv/umiam.db.
+    # Set a pragma to an empty string to leave SQLite's own default in place.
+    app.config['SQLITE_JOURNAL_MODE'] = 'WAL'       # readers no longer block the writer
+    app.config['SQLITE_SYNCHRONOUS'] = 'NORMAL'     # safe with WAL, skips an fsync per commit
+    app.config['SQLITE_BUSY_TIMEOUT'] = 5000        # ms to wait for a lock before "database is locked"
+    app.config['SQLITE_MMAP_SIZE'] = 256 * 1024 * 1024
+    app.config['SQLITE_CACHE_SIZE'] = -16000        # negative means KiB, so ~16 MB per connection
+    app.config['DB_POOL_SIZE'] = 5
+    app.config['DB_MAX_OVERFLOW'] = 10
+    app.config['DB_POOL_TIMEOUT'] = 10
+    app.config.from_prefixed_env()
+    if config is not None:
+        app.config.from_mapping(config)
+
+    # In-memory SQLite uses a single-connection pool that takes no sizing options.
+    if app.config['SQLALCHEMY_DATABASE_URI'] not in ('sqlite://', 'sqlite:///:memory:'):
+        app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {
+            'pool_size': app.config['DB_POOL_SIZE'],
+            'max_overflow': app.config['DB_MAX_OVERFLOW'],
+            'pool_timeout': app.config['DB_POOL_TIMEOUT'],
+        })
+
+    db.init_app(app)
+    login_manager.init_app(app)
+    with app.app_context():
+        if db.engine.dialect.name == 'sqlite':
+            sa_event.listen(db.engine, 'connect', sqlite_pragma_setter(app.config))
+
+    for module in (cache, auth, passwords, ratelimit, assets, avatars, images, notices, jobs, history, mail,
+                   metrics, cli):
+        module.init_app(app)
+
+    from .blueprints import admin, api, complaints, public, student
+    for blueprint in (public.bp, student.bp, complaints.bp, admin.bp, api.bp):
+        app.register_blueprint(blueprint)
+    return app
+
+def sqlite_pragma_setter(config):
+    pragmas = [(pragma, config[f'SQLITE_{pragma.upper()}']) for pragma in SQLITE_PRAGMAS]
+
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma, value in pragmas:
+            if value not in (None, ''):
+                cursor.execute(f'PRAGMA {pragma} = {value}')
+        cursor.close()
+    return set_sqlite_pragmas
+
+def warm_up(app):
+    """Load everything a worker would otherwise load on its first requests, then drop DB connections.
+
+    Meant for the master process of a pre-forking server (gunicorn --preload),
+    just before workers are forked: the lazy modules and compiled templates are
+    then shared copy-on-write, and no SQLite connection crosses the fork.
+    """
+    for name in LAZY_MODULES:
+        importlib.import_module(name)
+    for name in app.jinja_env.list_templates():
+        app.jinja_env.get_template(name)
+    with app.app_context():
+        db.engine.dispose()
+    # Parked in the permanent generation, the shared objects are never written to
+    # by a worker's garbage collector, so their pages stay shared.
+    gc.freeze()
@@ -0,0 +1,81 @@
+# umiam/alumni.py
+# Faceted browsing of the alumni directory. The counts shown next to each batch
+# year, company and position live in the small alumni_facet table, which the
+# add/edit/delete views adjust in the same transaction as the change, so drawing
+# the filters never touches the alumni table; the results themselves come a
+# bounded page at a time with a (batch_year, id) cursor.
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from .extensions import db
+from .models import Alumni, AlumniFacet
+from .pagination import keyset_page
+
+ALUMNI_FACETS = ('batch_year', 'company', 'current_position')
+ALUMNI_PER_PAGE = 24
+# Most common values offered per facet; batch years are listed newest first instead.
+ALUMNI_FACET_LIMIT = 50
+
+def alumni_facet_values(alumni):
+    # Blank companies and positions are left out of the counts.
+    return {facet: getattr(alumni, facet) for facet in ALUMNI_FACETS if getattr(alumni, facet)}
+
+def record_alumni_facets(values, delta):
+    """Add `delta` to the count of every (facet, value) in `values`."""
+    for facet, value in values.items():
+        db.session.execute(
+            sqlite_insert(AlumniFacet)
+            .values(facet=facet, value=value, count=delta)
+            .on_conflict_do_update(index_elements=['facet', 'value'],
+                                   set_={'count': AlumniFacet.count + delta})
+        )
+    if delta < 0 and values:
+        db.session.execute(db.delete(AlumniFacet).where(AlumniFacet.count <= 0))
+
+def change_alumni_facets(old_values, alumni):
+    new_values = alumni_facet_values(alumni)
+    if new_values != old_values:
+        record_alumni_facets({f: v for f, v in old_values.items() if new_values.get(f) != v}, -1)
+        record_alumni_facets({f: v for f, v in new_values.items() if old_values.get(f) != v}, 1)
+
+def alumni_facet_statements():
+    # Recomputes alumni_facet from the alumni table (migration backfill, `flask rebuild-stats`).
+    return ['DELETE FROM alumni_facet'] + [
+        f"INSERT INTO alumni_facet (facet, value, count) SELECT '{facet}', {facet}, count(*) FROM alumni "
+        f"WHERE {facet} IS NOT NULL AND {facet} != '' GROUP BY {facet}"
+        for facet in ALUMNI_FACETS
+    ]
+
+def get_alumni_facets(filters=None):
+    """{facet: [(value, count), ...]} from the counts table, selected values always included."""
+    filters = filters or {}
+    rank = db.func.row_number().over(
+        partition_by=AlumniFacet.facet,
+        order_by=[db.case((AlumniFacet.facet == 'batch_year', AlumniFacet.value), else_=None).desc(),
+                  AlumniFacet.count.desc(), AlumniFacet.value],
+    ).label('rank')
+    ranked = db.select(AlumniFacet.facet, AlumniFacet.value, AlumniFacet.count, rank).subquery()
+    rows = db.session.execute(
+        db.select(ranked.c.facet, ranked.c.value, ranked.c.count)
+        .where(db.or_(ranked.c.rank <= ALUMNI_FACET_LIMIT,
+                      *[db.and_(ranked.c.facet == f, ranked.c.value == v) for f, v in filters.items()]))
+        .order_by(ranked.c.facet, ranked.c.rank)
+    )
+    facets = {facet: [] for facet in ALUMNI_FACETS}
+    for facet, value, count in rows:
+        if facet in facets:
+            facets[facet].append((value, count))
+    return facets
+
+def browse_alumni(filters, cursor=None):
+    """One page of alumni matching `filters` (facet -> value), newest batch first.
+
+    Returns (alumni, next cursor or None).
+    """
+    query = Alumni.query.filter(*[getattr(Alumni, facet) == value for facet, value in filters.items()])
+    if cursor is not None:
+        query = query.filter(db.tuple_(Alumni.batch_year, Alumni.id) < cursor)
+    return keyset_page(query.order_by(Alumni.batch_year.desc(), Alumni.id.desc()), ALUMNI_PER_PAGE,
+                       lambda alumni: (alumni.batch_year, alumni.id))
+
+def alumni_filters(args):
+    return {facet: args[facet] for facet in ALUMNI_FACETS if args.get(facet)}
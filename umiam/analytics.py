@@ -0,0 +1,274 @@
+# umiam/analytics.py
+# Complaint SLA figures for the admin analytics page. Submissions and status
+# changes adjust per-day, per-category rollups in the same transaction as the
+# change itself, so the page aggregates a few hundred summary rows instead of the
+# complaint table. `flask --app app rebuild-complaint-stats` recomputes the
+# rollups from the complaints with a handful of set-based statements.
+import bisect
+from datetime import datetime, timedelta
+
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from .extensions import db
+from .models import (COMPLAINT_CATEGORIES, COMPLAINT_STATUSES, Complaint, ComplaintBacklog, ComplaintDailyStat,
+                     ComplaintResolutionBucket)
+
+# Statuses that take a complaint off the open backlog.
+DONE_STATUSES = ('Resolved', 'Closed')
+OPEN_STATUSES = [status for status in COMPLAINT_STATUSES if status not in DONE_STATUSES]
+
+# Upper bounds, in hours, of the time-to-resolve histogram buckets; one more
+# bucket past the last bound holds everything slower.
+RESOLUTION_BUCKET_HOURS = [1, 2, 4, 8, 12, 24, 36, 48, 72, 96, 120, 168, 240, 336, 504, 720]
+
+ANALYTICS_WEEKS = [4, 13, 26, 52]
+
+def ist_now():
+    # Complaint timestamps are stored as IST wall-clock times (see submit_complaint).
+    return datetime.utcnow() + timedelta(hours=5, minutes=30)
+
+def resolution_bucket(seconds):
+    return bisect.bisect_left(RESOLUTION_BUCKET_HOURS, seconds / 3600)
+
+def _bump(model, keys, **deltas):
+    # Upserted increments, so concurrent workers never lose one and a missing row starts at zero.
+    columns = model.__table__.c
+    db.session.execute(
+        sqlite_insert(model)
+        .values(**keys, **deltas)
+        .on_conflict_do_update(
+            index_elements=list(keys),
+            set_={name: columns[name] + delta for name, delta in deltas.items()},
+        )
+    )
+
+def _bump_many(model, rows, delta_names):
+    # _bump() for many keys as one executemany; every row carries all of delta_names.
+    columns = model.__table__.c
+    insert = sqlite_insert(model)
+    db.session.execute(
+        insert.on_conflict_do_update(
+            index_elements=[name for name in rows[0] if name not in delta_names],
+            set_={name: columns[name] + insert.excluded[name] for name in delta_names},
+        ),
+        rows,
+    )
+
+def record_complaint_submitted(complaint):
+    _bump(ComplaintDailyStat, {'day': complaint.submission_date.date(), 'category': complaint.category},
+          submitted=1)
+    _bump(ComplaintBacklog, {'category': complaint.category, 'status': complaint.status}, count=1)
+
+def _status_change_bumps(category, submission_date, old_status, new_status, now):
+    """The rollup increments for one complaint moving between two different statuses.
+
+    Leaving the open backlog counts as resolved or closed on that day, with the
+    time since submission going into the histogram for resolutions; coming back
+    counts as reopened. Moves between two open or two done statuses only shift
+    the backlog.
+    """
+    bumps = [(ComplaintBacklog, {'category': category, 'status': old_status}, {'count': -1}),
+             (ComplaintBacklog, {'category': category, 'status': new_status}, {'count': 1})]
+    day = {'day': now.date(), 'category': category}
+    if old_status not in DONE_STATUSES and new_status in DONE_STATUSES:
+        if new_status == 'Resolved':
+            seconds = max((now - submission_date).total_seconds(), 0)
+            bumps.append((ComplaintDailyStat, day, {'resolved': 1, 'resolve_seconds': seconds}))
+            bumps.append((ComplaintResolutionBucket, {**day, 'bucket': resolution_bucket(seconds)}, {'count': 1}))
+        else:
+            bumps.append((ComplaintDailyStat, day, {'closed': 1}))
+    elif old_status in DONE_STATUSES and new_status not in DONE_STATUSES:
+        bumps.append((ComplaintDailyStat, day, {'reopened': 1}))
+    return bumps
+
+def change_complaint_status(complaint, new_status, now=None):
+    """Set a complaint's status and roll the transition into the analytics tables."""
+    old_status = complaint.status
+    if new_status == old_status:
+        return
+    now = now or ist_now()
+    for model, keys, deltas in _status_change_bumps(complaint.category, complaint.submission_date,
+                                                    old_status, new_status, now):
+        _bump(model, keys, **deltas)
+    if old_status not in DONE_STATUSES and new_status in DONE_STATUSES:
+        complaint.resolved_at = now
+    elif old_status in DONE_STATUSES and new_status not in DONE_STATUSES:
+        complaint.resolved_at = None
+    complaint.status = new_status
+
+def change_complaints_status(conditions, new_status, now=None):
+    """Move every complaint matching `conditions` to new_status with one UPDATE.
+
+    The rollups get the same increments change_complaint_status() would make,
+    summed so each rollup row is upserted once however many complaints moved.
+    Returns the complaints that changed as (id, category, status, submission_date)
+    rows, status being the one they had before.
+    """
+    now = now or ist_now()
+    changed = db.session.execute(
+        db.select(Complaint.id, Complaint.category, Complaint.status, Complaint.submission_date)
+        .where(*conditions, Complaint.status != new_status)
+    ).all()
+    if not changed:
+        return changed
+    if new_status in DONE_STATUSES:
+        # Only complaints leaving the open backlog get a new resolved_at.
+        resolved_at = db.case((Complaint.status.in_(DONE_STATUSES), Complaint.resolved_at), else_=now)
+    else:
+        resolved_at = None
+    db.session.execute(db.update(Complaint)
+                       .where(Complaint.id.in_([row.id for row in changed]))
+                       .values(status=new_status, resolved_at=resolved_at))
+
+    totals = {}
+    for row in changed:
+        for model, keys, deltas in _status_change_bumps(row.category, row.submission_date, row.status,
+                                                        new_status, now):
+            merged = totals.setdefault(model, {}).setdefault(tuple(keys.items()), {})
+            for name, delta in deltas.items():
+                merged[name] = merged.get(name, 0) + delta
+    for model, rows in totals.items():
+        names = sorted({name for deltas in rows.values() for name in deltas})
+        _bump_many(model, [{**dict(keys), **{name: deltas.get(name, 0) for name in names}}
+                           for keys, deltas in rows.items()], names)
+    return changed
+
+def complaint_rollup_statements():
+    """SQL that rebuilds every rollup table from the complaint table.
+
+    Only each complaint's current state is known here, so reopenings are not
+    recovered and a complaint resolved and then closed counts as closed.
+    Complaints finished before resolved_at existed count as closed on the day
+    they were submitted, which keeps the backlog series in step.
+    """
+    hours = '(julianday(resolved_at) - julianday(submission_date)) * 24'
+    bucket = ('CASE ' + ' '.join(f'WHEN {hours} <= {bound} THEN {index}'
+                                 for index, bound in enumerate(RESOLUTION_BUCKET_HOURS))
+              + f' ELSE {len(RESOLUTION_BUCKET_HOURS)} END')
+    return [
+        'DELETE FROM complaint_daily_stat',
+        'DELETE FROM complaint_resolution_bucket',
+        'DELETE FROM complaint_backlog',
+        'INSERT INTO complaint_daily_stat (day, category, submitted, resolved, closed, reopened, resolve_seconds) '
+        'SELECT day, category, sum(submitted), sum(resolved), sum(closed), 0, sum(seconds) FROM ('
+        'SELECT date(submission_date) AS day, category, 1 AS submitted, 0 AS resolved, 0 AS closed, 0 AS seconds '
+        'FROM complaint '
+        'UNION ALL SELECT date(coalesce(resolved_at, submission_date)), category, 0, '
+        "resolved_at IS NOT NULL AND status = 'Resolved', resolved_at IS NULL OR status = 'Closed', "
+        f"CASE WHEN resolved_at IS NOT NULL AND status = 'Resolved' THEN max({hours} * 3600, 0) ELSE 0 END "
+        "FROM complaint WHERE status IN ('Resolved', 'Closed')"
+        ') GROUP BY day, category',
+        'INSERT INTO complaint_resolution_bucket (day, category, bucket, count) '
+        f'SELECT date(resolved_at), category, {bucket}, count(*) FROM complaint '
+        "WHERE resolved_at IS NOT NULL AND status = 'Resolved' GROUP BY 1, 2, 3",
+        'INSERT INTO complaint_backlog (category, status, count) '
+        'SELECT category, status, count(*) FROM complaint GROUP BY category, status',
+    ]
+
+def histogram_quantile(counts, q):
+    """Estimate the q-quantile, in hours, from {bucket: count}; None when empty.
+
+    Interpolates linearly within the bucket holding the rank; in the open-ended
+    last bucket that is its lower bound.
+    """
+    total = sum(counts.values())
+    if not total:
+        return None
+    rank = q * total
+    seen = 0
+    for bucket in range(len(RESOLUTION_BUCKET_HOURS) + 1):
+        count = counts.get(bucket, 0)
+        if count and seen + count >= rank:
+            lower = RESOLUTION_BUCKET_HOURS[bucket - 1] if bucket else 0
+            if bucket == len(RESOLUTION_BUCKET_HOURS):
+                return lower
+            upper = RESOLUTION_BUCKET_HOURS[bucket]
+            return lower + (upper - lower) * (rank - seen) / count
+        seen += count
+    return None
+
+def _summary(row, counts):
+    submitted, resolved, closed, reopened, resolve_seconds = row or (0, 0, 0, 0, 0)
+    return {
+        'submitted': submitted, 'resolved': resolved, 'closed': closed, 'reopened': reopened,
+        'mean_hours': resolve_seconds / resolved / 3600 if resolved else None,
+        'median_hours': histogram_quantile(counts, 0.5),
+        'p90_hours': histogram_quantile(counts, 0.9),
+    }
+
+def build_complaint_analytics(weeks, category=None, today=None):
+    """Everything the analytics page shows for the last `weeks` calendar weeks.
+
+    Reads only the rollup tables: per-category totals with median and p90 time
+    to resolve, the current backlog by category and status, and a weekly series
+    of submissions, completions, resolution times and open backlog.
+    """
+    today = today or ist_now().date()
+    since = today - timedelta(days=today.weekday(), weeks=weeks - 1)
+    stat, histogram = ComplaintDailyStat, ComplaintResolutionBucket
+    totals = (db.func.sum(stat.submitted), db.func.sum(stat.resolved), db.func.sum(stat.closed),
+              db.func.sum(stat.reopened), db.func.sum(stat.resolve_seconds))
+    # Monday of the week each day falls in.
+    stat_week = db.func.date(stat.day, 'weekday 0', '-6 days')
+    histogram_week = db.func.date(histogram.day, 'weekday 0', '-6 days')
+    stat_filters = [stat.day >= since]
+    histogram_filters = [histogram.day >= since]
+    if category:
+        stat_filters.append(stat.category == category)
+        histogram_filters.append(histogram.category == category)
+    rows_read = 0
+
+    by_category = (db.session.query(stat.category, *totals)
+                   .filter(stat.day >= since).group_by(stat.category).all())
+    buckets = (db.session.query(histogram.category, histogram.bucket, db.func.sum(histogram.count))
+               .filter(histogram.day >= since).group_by(histogram.category, histogram.bucket).all())
+    rows_read += len(by_category) + len(buckets)
+    category_counts, overall_counts = {}, {}
+    for name, bucket, count in buckets:
+        category_counts.setdefault(name, {})[bucket] = count
+        overall_counts[bucket] = overall_counts.get(bucket, 0) + count
+    category_rows = {name: row for name, *row in by_category}
+    names = COMPLAINT_CATEGORIES + sorted(set(category_rows) - set(COMPLAINT_CATEGORIES))
+    categories = [{'category': name, **_summary(category_rows.get(name), category_counts.get(name, {}))}
+                  for name in names]
+    overall_row = [sum(row[i] or 0 for row in category_rows.values()) for i in range(5)]
+    overall = _summary(overall_row, overall_counts)
+
+    backlog_rows = ComplaintBacklog.query.all()
+    rows_read += len(backlog_rows)
+    backlog = {name: dict.fromkeys(COMPLAINT_STATUSES, 0) for name in names}
+    for row in backlog_rows:
+        backlog.setdefault(row.category, dict.fromkeys(COMPLAINT_STATUSES, 0))[row.status] = row.count
+    backlog_totals = {status: sum(counts.get(status, 0) for counts in backlog.values())
+                      for status in COMPLAINT_STATUSES}
+
+    weekly = (db.session.query(stat_week, *totals).filter(*stat_filters)
+              .group_by(stat_week).order_by(stat_week).all())
+    weekly_buckets = (db.session.query(histogram_week, histogram.bucket, db.func.sum(histogram.count))
+                      .filter(*histogram_filters).group_by(histogram_week, histogram.bucket).all())
+    # Open backlog as it stood when the window starts, carried forward week by week.
+    open_backlog = (db.session.query(db.func.sum(stat.submitted + stat.reopened - stat.resolved - stat.closed))
+                    .filter(stat.day < since, *stat_filters[1:]).scalar() or 0)
+    rows_read += len(weekly) + len(weekly_buckets) + 1
+    week_counts = {}
+    for week, bucket, count in weekly_buckets:
+        week_counts.setdefault(week, {})[bucket] = count
+    week_rows = {week: row for week, *row in weekly}
+    series = []
+    for offset in range(weeks):
+        week = (since + timedelta(weeks=offset)).isoformat()
+        summary = _summary(week_rows.get(week), week_counts.get(week, {}))
+        open_backlog += summary['submitted'] + summary['reopened'] - summary['resolved'] - summary['closed']
+        series.append({'week': week, 'completed': summary['resolved'] + summary['closed'],
+                       'open_backlog': open_backlog, **summary})
+
+    return {
+        'since': since,
+        'categories': categories,
+        'overall': overall,
+        'backlog': backlog,
+        'backlog_totals': backlog_totals,
+        'open_total': sum(backlog_totals[status] for status in OPEN_STATUSES),
+        'weeks': series,
+        'rows_read': rows_read,
+    }
@@ -0,0 +1,142 @@
+# umiam/assets.py
+# Stylesheets, scripts and fonts live under static/, with pinned copies of Bootstrap
+# and Font Awesome in static/vendor/ (fetched with `flask vendor-assets`). `flask
+# build-assets` copies them to static/dist/ under content-hashed names, next to
+# gzip and brotli variants, and writes the manifest asset_url() reads. A changed
+# file gets a new URL, so /assets/ responses are cached for a year and never
+# revalidated. Without a build, asset_url() falls back to the plain static/ file,
+# or to the CDN for a vendor file that has not been fetched.
+import gzip
+import hashlib
+import json
+import os
+import posixpath
+import re
+import shutil
+import threading
+
+from flask import current_app, url_for
+
+try:
+    import brotli
+except ImportError:  # optional: asset builds then ship gzip variants only
+    brotli = None
+
+ASSET_SOURCE_DIRS = ['css', 'js', 'img', 'vendor']
+COMPRESSIBLE_ASSET_TYPES = {'.css', '.js', '.svg', '.ttf', '.eot', '.json'}
+VENDOR_ASSETS = {
+    'vendor/bootstrap/css/bootstrap.min.css': 'https://cdn.jsdelivr.net/npm/bootstrap@5.3.3/dist/css/bootstrap.min.css',
+    'vendor/bootstrap/js/bootstrap.bundle.min.js': 'https://cdn.jsdelivr.net/npm/bootstrap@5.3.3/dist/js/bootstrap.bundle.min.js',
+    'vendor/fontawesome/css/all.min.css': 'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/5.15.4/css/all.min.css',
+}
+CSS_URL_RE = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+# Source maps are not vendored, so the trailing comment would only produce a 404.
+SOURCE_MAP_RE = re.compile(rb'\s*(/\*# sourceMappingURL=[^*]*\*/|//# sourceMappingURL=\S*)\s*$')
+
+asset_manifest = {}
+
+def init_app(app):
+    app.config.setdefault('ASSET_BUILD_DIR', os.path.join(app.static_folder, 'dist'))
+    app.config.setdefault('ASSET_MAX_AGE', 365 * 24 * 3600)
+    app.add_template_global(asset_url)
+    load_asset_manifest(app.config['ASSET_BUILD_DIR'])
+
+def load_asset_manifest(build_dir):
+    try:
+        with open(os.path.join(build_dir, 'manifest.json')) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        manifest = {}
+    asset_manifest.clear()
+    asset_manifest.update(manifest)
+
+def asset_url(name):
+    hashed = asset_manifest.get(name)
+    if hashed is not None:
+        return url_for('public.asset', filename=hashed)
+    if name in VENDOR_ASSETS and not os.path.isfile(os.path.join(current_app.static_folder, name)):
+        return VENDOR_ASSETS[name]
+    return url_for('static', filename=name)
+
+def css_references(css):
+    """Yield (match, path, suffix) for each relative url() in a stylesheet."""
+    for match in CSS_URL_RE.finditer(css):
+        target = match.group(2).strip()
+        if target.startswith(('data:', 'http:', 'https:', '//', '/', '#')):
+            continue
+        cut = min((i for i in (target.find('?'), target.find('#')) if i != -1), default=len(target))
+        yield match, target[:cut], target[cut:]
+
+def rewrite_css_urls(name, css, manifest):
+    # url() resolves against the stylesheet, and a fingerprinted file keeps its directory.
+    directory = posixpath.dirname(name)
+    pieces, position = [], 0
+    for match, path, suffix in css_references(css):
+        hashed = manifest.get(posixpath.normpath(posixpath.join(directory, path)))
+        if hashed is None:
+            continue
+        quote = match.group(1)
+        pieces.append(css[position:match.start()])
+        pieces.append(f'url({quote}{posixpath.relpath(hashed, directory)}{suffix}{quote})')
+        position = match.end()
+    pieces.append(css[position:])
+    return ''.join(pieces)
+
+def fingerprint(name, data):
+    stem, ext = posixpath.splitext(name)
+    return f'{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}'
+
+def write_file(path, data):
+    # Write then rename, so a concurrent worker never serves a partial file.
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(temporary, 'wb') as f:
+        f.write(data)
+    os.replace(temporary, path)
+
+def build_assets(clean=False):
+    """Fingerprint and precompress static/ into the build directory.
+
+    Returns one (name, size, gzip size, brotli size) tuple per file; a variant
+    is only written, and its size only reported, when it is smaller.
+    """
+    source_root = current_app.static_folder
+    build_dir = current_app.config['ASSET_BUILD_DIR']
+    if clean and os.path.isdir(build_dir):
+        shutil.rmtree(build_dir)
+    names = []
+    for top in ASSET_SOURCE_DIRS:
+        for dirpath, _, filenames in os.walk(os.path.join(source_root, top)):
+            names.extend(os.path.relpath(os.path.join(dirpath, filename), source_root).replace(os.sep, '/')
+                         for filename in filenames)
+    # Stylesheets go last so the fonts and images they reference already have their hashed names.
+    names.sort(key=lambda name: (name.endswith('.css'), name))
+
+    manifest, report = {}, []
+    for name in names:
+        with open(os.path.join(source_root, name), 'rb') as f:
+            data = f.read()
+        ext = posixpath.splitext(name)[1]
+        if ext in ('.css', '.js'):
+            data = SOURCE_MAP_RE.sub(b'', data)
+        if ext == '.css':
+            data = rewrite_css_urls(name, data.decode('utf-8'), manifest).encode('utf-8')
+        manifest[name] = fingerprint(name, data)
+        target = os.path.join(build_dir, manifest[name])
+        write_file(target, data)
+        sizes = {'.gz': None, '.br': None}
+        if ext in COMPRESSIBLE_ASSET_TYPES:
+            variants = {'.gz': gzip.compress(data, 9, mtime=0)}
+            if brotli is not None:
+                variants['.br'] = brotli.compress(data, quality=11)
+            for suffix, compressed in variants.items():
+                if len(compressed) < len(data):
+                    write_file(target + suffix, compressed)
+                    sizes[suffix] = len(compressed)
+        report.append((name, len(data), sizes['.gz'], sizes['.br']))
+
+    # Files from earlier builds stay until --clean, so pages rendered by workers
+    # still on the old manifest keep working.
+    write_file(os.path.join(build_dir, 'manifest.json'), json.dumps(manifest, indent=2, sort_keys=True).encode())
+    load_asset_manifest(build_dir)
+    return report
@@ -0,0 +1,62 @@
+# umiam/auth.py
+# Authenticated requests get current_user from a short-lived per-process cache of
+# read-only snapshots rather than a query per request. Routes that change a user
+# load the ORM row explicitly and call forget_user() so this worker picks up the
+# change at once; other workers see it once their TTL lapses.
+from functools import wraps
+
+from flask import flash, redirect, url_for
+from flask_login import current_user
+
+from .cache import LRUCache
+from .extensions import db, login_manager
+from .models import User
+
+def admin_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not current_user.is_authenticated or current_user.role != 'HMC Admin':
+            flash('You do not have permission to access this page.', 'danger')
+            return redirect(url_for('public.home'))
+        return f(*args, **kwargs)
+    return decorated_function
+
+class CachedUser:
+    """Detached, read-only view of a User row, usable as Flask-Login's current_user."""
+
+    __slots__ = ('id', 'username', 'email', 'role', 'name', 'roll_number', 'room_number',
+                 'studying_year', 'Branch', 'profile_pic_url')
+
+    is_authenticated = True
+    is_active = True
+    is_anonymous = False
+
+    def __init__(self, user):
+        for field in self.__slots__:
+            setattr(self, field, getattr(user, field))
+
+    def get_id(self):
+        return str(self.id)
+
+user_cache = LRUCache(1024, ttl=30)
+
+def init_app(app):
+    app.config.setdefault('USER_CACHE_SIZE', 1024)
+    app.config.setdefault('USER_CACHE_TTL', 30)  # seconds
+    user_cache.max_entries = app.config['USER_CACHE_SIZE']
+    user_cache.ttl = app.config['USER_CACHE_TTL']
+
+def forget_user(user_id):
+    user_cache.pop(user_id)
+
+@login_manager.user_loader
+def load_user(user_id):
+    user_id = int(user_id)
+    snapshot = user_cache.get(user_id)
+    if snapshot is None:
+        user = db.session.get(User, user_id)
+        if user is None:
+            return None
+        snapshot = CachedUser(user)
+        user_cache.set(user_id, snapshot)
+    return snapshot
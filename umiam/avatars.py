@@ -0,0 +1,52 @@
+# umiam/avatars.py
+# Users without a profile picture get an initials badge rendered here rather than
+# fetched from ui-avatars.com. The URL carries everything the SVG depends on (the
+# initials and a palette index derived from the name), so it is content-addressed:
+# responses are cached for a year and the rendered file is kept on disk under a
+# hash of that content. Only one- or two-letter ASCII initials are written to disk,
+# which bounds the cache at about 16,000 small files.
+import hashlib
+import os
+
+from flask import current_app, url_for
+from markupsafe import escape
+
+from .assets import write_file
+
+AVATAR_COLORS = ['#1a237e', '#283593', '#0d47a1', '#00695c', '#2e7d32', '#558b2f',
+                 '#ef6c00', '#d84315', '#c62828', '#ad1457', '#6a1b9a', '#4e342e']
+AVATAR_SVG = ('<svg xmlns="http://www.w3.org/2000/svg" width="128" height="128" viewBox="0 0 128 128">'
+              '<rect width="128" height="128" fill="{color}"/>'
+              '<text x="64" y="64" dy=".35em" fill="#fff" text-anchor="middle" font-size="52" font-weight="600"'
+              ' font-family="-apple-system, \'Segoe UI\', Roboto, Helvetica, Arial, sans-serif">{initials}</text></svg>')
+
+def init_app(app):
+    app.config.setdefault('AVATAR_CACHE_DIR', os.path.join(app.instance_path, 'avatars'))
+    app.config.setdefault('AVATAR_MAX_AGE', 365 * 24 * 3600)
+    app.add_template_global(avatar_url)
+    app.add_template_global(user_avatar_url)
+
+def avatar_initials(name):
+    letters = [next((c for c in word if c.isalnum()), '') for word in (name or '').split()]
+    letters = [letter for letter in letters if letter]
+    if not letters:
+        return '#'
+    return (letters[0] + (letters[-1] if len(letters) > 1 else '')).upper()
+
+def avatar_url(name):
+    color = int(hashlib.sha1((name or '').encode()).hexdigest(), 16) % len(AVATAR_COLORS)
+    return url_for('public.avatar', color=color, initials=avatar_initials(name))
+
+def user_avatar_url(user):
+    # Keyed the same way everywhere, so a user's badge looks alike on every page.
+    return avatar_url(user.name or user.username)
+
+def render_avatar(color, initials):
+    svg = AVATAR_SVG.format(color=AVATAR_COLORS[color], initials=escape(initials)).encode()
+    if not (initials.isascii() and len(initials) <= 2):
+        return svg, None
+    digest = hashlib.sha256(svg).hexdigest()
+    path = os.path.join(current_app.config['AVATAR_CACHE_DIR'], digest[:2], digest + '.svg')
+    if not os.path.isfile(path):
+        write_file(path, svg)
+    return svg, path
@@ -0,0 +1,6 @@
+# umiam/blueprints/__init__.py
+# public: open pages, sign-in and static-style responses
+# student: the signed-in residents' portal
+# complaints: the grievance module, for students and admins
+# admin: HMC content and account management
+# api: read-only JSON for the mobile app under /api/v1
@@ -0,0 +1,508 @@
+# umiam/blueprints/admin.py
+# HMC admin content management: notices, announcements, facilities, events,
+# achievements, alumni, the resident allowlist and user accounts. Every view here
+# is behind login_required and admin_required.
+import io
+from datetime import datetime, timedelta
+
+from flask import Blueprint, Response, flash, jsonify, redirect, render_template, request, stream_with_context, url_for
+from flask_login import current_user, login_required
+from werkzeug.utils import secure_filename
+
+from ..alumni import alumni_facet_values, change_alumni_facets, record_alumni_facets
+from ..auth import admin_required, forget_user, user_cache
+from ..cache import page_cache, touch_change_stamp
+from ..extensions import db
+from ..images import uploaded_image_url
+from ..jobs import JOB_KINDS, enqueue, queue_summary, retry_failed_jobs
+from ..mail import queue_seat_confirmed_emails
+from ..models import (Achievement, Alumni, Announcement, Event, EventRegistration, Facility, Job, Notice, UmiamStudent,
+                      User)
+from ..notices import publish_notice_change
+from ..registrations import fill_event_seats
+from ..stats import bump_stat
+
+bp = Blueprint('admin', __name__)
+
+@bp.route('/admin/announcement/edit/<int:id>', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def edit_announcement(id):
+    from ..forms import AnnouncementForm
+
+    announcement = Announcement.query.get_or_404(id)
+    form = AnnouncementForm(obj=announcement)
+    if form.validate_on_submit():
+        announcement.title = form.title.data
+        announcement.content = form.content.data
+        touch_change_stamp('announcement')
+        db.session.commit()
+        flash('Announcement has been updated!', 'success')
+        return redirect(url_for('student.dashboard'))
+    return render_template('edit_announcement.html', title='Edit Announcement', form=form, announcement=announcement)
+
+@bp.route('/admin/facility/edit/<int:id>', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def edit_facility(id):
+    from ..forms import FacilityForm
+
+    facility = Facility.query.get_or_404(id)
+    form = FacilityForm(obj=facility)
+    if form.validate_on_submit():
+        facility.name = form.name.data
+        facility.description = form.description.data
+        facility.location = form.location.data
+        facility.availability = form.availability.data
+        facility.image_url = uploaded_image_url(form.image_file) or form.image_url.data
+        touch_change_stamp('facility')
+        db.session.commit()
+        flash('Facility has been updated!', 'success')
+        return redirect(url_for('public.facilities'))
+    return render_template('edit_facility.html', title='Edit Facility', form=form, facility=facility)
+
+@bp.route('/admin/notice/edit/<int:id>', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def edit_notice(id):
+    from ..forms import NoticeForm
+
+    notice = Notice.query.get_or_404(id)
+    form = NoticeForm(obj=notice)
+    if form.validate_on_submit():
+        notice.message = form.message.data
+        notice.priority = form.priority.data
+        touch_change_stamp('notice')
+        db.session.commit()
+        publish_notice_change(notice, 'updated')
+        flash('Notice has been updated!', 'success')
+        return redirect(url_for('public.home'))
+    return render_template('edit_notice.html', title='Edit Notice', form=form, notice=notice)
+
+@bp.route('/admin/notice/add', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def add_notice():
+    from ..forms import NoticeForm
+
+    form = NoticeForm()
+    if form.validate_on_submit():
+        notice = Notice(message=form.message.data, priority=form.priority.data)
+        db.session.add(notice)
+        touch_change_stamp('notice')
+        db.session.commit()
+        publish_notice_change(notice, 'added')
+        flash('Notice has been added!', 'success')
+        return redirect(url_for('public.home'))
+    return render_template('add_notice.html', title='Add Notice', form=form)
+
+@bp.route('/admin/announcement/add', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def add_announcement():
+    from ..forms import AnnouncementForm
+
+    form = AnnouncementForm()
+    if form.add.data and form.validate():
+        announcement = Announcement(title=form.title.data, content=form.content.data, user_id=current_user.id)
+        # Adjust time to IST (+5:30)
+        if announcement.date_posted is None:
+            announcement.date_posted = datetime.utcnow()  # Initialize if None
+        announcement.date_posted = announcement.date_posted + timedelta(hours=5, minutes=30)
+        db.session.add(announcement)
+        touch_change_stamp('announcement')
+        db.session.commit()
+        flash('Announcement has been added!', 'success')
+        return redirect(url_for('student.dashboard'))
+    return render_template('add_announcement.html', title='Add Announcement', form=form)
+
+@bp.route('/admin/achievement/add', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def add_achievement():
+    from ..forms import AchievementForm
+
+    form = AchievementForm()
+    if form.validate_on_submit():
+        achievement = Achievement(
+            title=form.title.data,
+            description=form.description.data,
+            year=form.year.data,
+            category=form.category.data,
+            image_url=uploaded_image_url(form.image_file) or form.image_url.data
+        )
+        db.session.add(achievement)
+        touch_change_stamp('achievement')
+        db.session.commit()
+        flash('Achievement has been added!', 'success')
+        return redirect(url_for('public.achievements'))
+    return render_template('add_achievement.html', title='Add Achievement', form=form)
+
+@bp.route('/admin/event/add', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def add_event():
+    from ..forms import EventForm
+
+    form = EventForm()
+    if form.validate_on_submit():
+        event = Event(
+            title=form.title.data,
+            description=form.description.data,
+            location=form.location.data,
+            start_datetime=form.start_datetime.data,
+            end_datetime=form.end_datetime.data,
+            image_url=uploaded_image_url(form.image_file) or form.image_url.data,
+            capacity=form.capacity.data
+        )
+        db.session.add(event)
+        bump_stat('total_events')
+        touch_change_stamp('event')
+        db.session.commit()
+        flash('Event has been added!', 'success')
+        return redirect(url_for('student.events'))
+    return render_template('add_event.html', title='Add Event', form=form)
+
+@bp.route('/admin/students/add', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def add_student():
+    from ..forms import AddStudentForm, ImportStudentsForm
+
+    form = AddStudentForm()
+    if form.validate_on_submit():
+        new_student = UmiamStudent(
+            email=form.email.data.strip().lower()
+        )
+        db.session.add(new_student)
+        db.session.commit()
+        flash('Student email added successfully to the UMIAM database.', 'success')
+        return redirect(url_for('admin.add_student'))  # or redirect to admin dashboard
+    return render_template('add_student.html', title='Add Student', form=form, import_form=ImportStudentsForm())
+
+@bp.route('/admin/students/import', methods=['POST'])
+@login_required
+@admin_required
+def import_students():
+    from ..forms import AddStudentForm, ImportStudentsForm
+    from ..roster import import_umiam_students
+
+    import_form = ImportStudentsForm()
+    if import_form.validate_on_submit():
+        roster = io.TextIOWrapper(import_form.roster.data.stream, encoding='utf-8-sig', newline='')
+        counts = import_umiam_students(roster)
+        flash(f"Roster imported: {counts['inserted']} added, {counts['duplicate']} already present, "
+              f"{counts['invalid']} invalid.", 'success' if not counts['invalid'] else 'warning')
+        return redirect(url_for('admin.add_student'))
+    return render_template('add_student.html', title='Add Student', form=AddStudentForm(), import_form=import_form)
+
+@bp.route('/admin/facility/add', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def add_facility():
+    from ..forms import FacilityForm
+
+    form = FacilityForm()
+    if form.validate_on_submit():
+        facility = Facility(
+            name=form.name.data,
+            description=form.description.data,
+            location=form.location.data,
+            availability=form.availability.data,
+            image_url=uploaded_image_url(form.image_file) or form.image_url.data
+        )
+        db.session.add(facility)
+        bump_stat('total_facilities')
+        touch_change_stamp('facility')
+        db.session.commit()
+        flash('Facility has been added!', 'success')
+        return redirect(url_for('public.facilities'))
+    return render_template('add_facility.html', title='Add Facility', form=form)
+
+@bp.route('/admin/event/edit/<int:id>', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def edit_event(id):
+    from ..forms import EventForm
+
+    event = Event.query.get_or_404(id)
+    form = EventForm(obj=event)
+    if form.validate_on_submit():
+        old_times = (event.start_datetime, event.end_datetime)
+        event.title = form.title.data
+        event.description = form.description.data
+        event.location = form.location.data
+        event.start_datetime = form.start_datetime.data
+        event.end_datetime = form.end_datetime.data
+        event.image_url = uploaded_image_url(form.image_file) or form.image_url.data
+        event.capacity = form.capacity.data
+        db.session.flush()
+        # A raised capacity hands the new seats to the waitlist straight away.
+        promoted = fill_event_seats(event.id)
+        queue_seat_confirmed_emails(event, promoted)
+        if old_times != (event.start_datetime, event.end_datetime):
+            # Registrants are emailed from the job queue; a big event could have thousands.
+            enqueue('event_changed', {'event_id': event.id,
+                                      'old_start': old_times[0].strftime('%Y-%m-%d %H:%M'),
+                                      'old_end': old_times[1].strftime('%Y-%m-%d %H:%M')})
+        touch_change_stamp('event')
+        db.session.commit()
+        flash('Event has been updated!', 'success')
+        if promoted:
+            flash(f'{len(promoted)} waitlisted resident(s) moved into the new seats.', 'info')
+        return redirect(url_for('student.events'))
+    return render_template('edit_event.html', title='Edit Event', form=form, event=event)
+
+@bp.route('/admin/announcement/delete/<int:id>', methods=['POST'])
+@login_required
+@admin_required
+def delete_announcement(id):
+    announcement = Announcement.query.get_or_404(id)
+    db.session.delete(announcement)
+    touch_change_stamp('announcement')
+    db.session.commit()
+    flash('Announcement has been deleted!', 'success')
+    return redirect(url_for('student.dashboard'))
+
+@bp.route('/admin/event/delete/<int:id>', methods=['POST'])
+@login_required
+@admin_required
+def delete_event(id):
+    event = Event.query.get_or_404(id)
+    # Delete associated registrations
+    EventRegistration.query.filter_by(event_id=event.id).delete()
+    db.session.delete(event)
+    bump_stat('total_events', -1)
+    touch_change_stamp('event')
+    db.session.commit()
+    flash('Event has been deleted!', 'success')
+    return redirect(url_for('student.events'))
+
+@bp.route('/admin/event/registrations/<int:event_id>')
+@login_required
+@admin_required
+def view_event_registrations(event_id):
+    from ..exports import event_registration_rows
+
+    event = Event.query.get_or_404(event_id)
+    # The export columns plus username, which the avatar falls back to.
+    registrations = event_registration_rows(event.id).add_columns(User.username).all()
+    return render_template('event_registrations.html', title='Event Registrations', event=event, registrations=registrations)
+
+@bp.route('/admin/event/registrations/<int:event_id>/export/<any(csv, xlsx):fmt>')
+@login_required
+@admin_required
+def export_event_registrations(event_id, fmt):
+    from ..exports import EXPORT_FORMATS, REGISTRATION_EXPORT_COLUMNS, event_registration_rows
+
+    event = Event.query.get_or_404(event_id)
+    generate, mimetype = EXPORT_FORMATS[fmt]
+    headers = [label for label, _ in REGISTRATION_EXPORT_COLUMNS]
+    rows = event_registration_rows(event.id)
+    filename = secure_filename(f'{event.title}-registrations.{fmt}') or f'registrations.{fmt}'
+    return Response(stream_with_context(generate(headers, rows)), mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename="{filename}"'})
+
+@bp.route('/admin/users')
+@login_required
+@admin_required
+def manage_users():
+    from ..directory import USER_FACETS, USER_SORTS, user_directory_page, user_facet_counts
+    from ..pagination import decode_cursor
+
+    filters = {facet: request.args[facet] for facet in USER_FACETS if request.args.get(facet)}
+    search = request.args.get('q', '').strip() or None
+    room = request.args.get('room', '').strip() or None
+    sort = request.args.get('sort')
+    if sort not in USER_SORTS:
+        sort = 'name'
+    descending = request.args.get('order') == 'desc'
+    cursor = decode_cursor(request.args.get('cursor'), str)
+
+    users, next_cursor = user_directory_page(filters, search, room, sort, descending, cursor)
+    facet_counts, total = user_facet_counts(filters, search, room)
+    # Everything but the cursor, for the pagination and sort links.
+    params = dict(filters, q=search, room=room, sort=sort, order='desc' if descending else None)
+    return render_template('manage_users.html', title='Manage Users',
+                           users=users,
+                           facet_counts=facet_counts,
+                           total=total,
+                           filters=filters,
+                           search=search,
+                           room=room,
+                           sort=sort,
+                           descending=descending,
+                           params=params,
+                           is_first_page=cursor is None,
+                           next_cursor=next_cursor)
+
+@bp.route('/admin/user/edit/<int:user_id>', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def edit_user(user_id):
+    from ..forms import AdminEditProfileForm
+
+    user = User.query.get_or_404(user_id)
+    form = AdminEditProfileForm(obj=user)
+    if form.validate_on_submit():
+        user.roll_number = form.roll_number.data
+        user.room_number = form.room_number.data
+        user.studying_year = form.studying_year.data
+        user.Branch = form.Branch.data
+        user.profile_pic_url = uploaded_image_url(form.profile_pic_file) or form.profile_pic_url.data
+        if user.role != form.role.data and 'Student' in (user.role, form.role.data):
+            bump_stat('total_students', 1 if form.role.data == 'Student' else -1)
+        user.role = form.role.data
+        db.session.commit()
+        forget_user(user.id)
+        flash('User information has been updated!', 'success')
+        return redirect(url_for('admin.manage_users'))
+    return render_template('edit_user.html', title='Edit User', form=form, user=user)
+
+@bp.route('/admin/cache-stats')
+@login_required
+@admin_required
+def cache_stats():
+    return jsonify(user_cache=user_cache.stats(), page_cache=page_cache.stats())
+
+@bp.route('/admin/jobs')
+@login_required
+@admin_required
+def job_queue():
+    summary = queue_summary()
+    failed_jobs = Job.query.filter_by(status='failed').order_by(Job.finished_at.desc()).limit(50).all()
+    retrying_jobs = (Job.query.filter(Job.status == 'queued', Job.last_error.isnot(None))
+                     .order_by(Job.run_after).limit(50).all())
+    return render_template('admin_jobs.html', title='Background Jobs',
+                           kinds=sorted(set(JOB_KINDS) | set(summary)),
+                           summary=summary,
+                           failed_jobs=failed_jobs,
+                           retrying_jobs=retrying_jobs,
+                           now=datetime.utcnow())
+
+@bp.route('/admin/jobs/retry', methods=['POST'])
+@bp.route('/admin/jobs/<int:id>/retry', methods=['POST'])
+@login_required
+@admin_required
+def retry_jobs(id=None):
+    retried = retry_failed_jobs(id)
+    db.session.commit()
+    flash(f'{retried} job(s) queued again.', 'success')
+    return redirect(url_for('admin.job_queue'))
+
+@bp.route('/admin/jobs/<int:id>/discard', methods=['POST'])
+@login_required
+@admin_required
+def discard_job(id):
+    Job.query.filter_by(id=id, status='failed').delete()
+    db.session.commit()
+    flash('Job has been discarded.', 'success')
+    return redirect(url_for('admin.job_queue'))
+
+@bp.route('/admin/facility/delete/<int:id>', methods=['POST'])
+@login_required
+@admin_required
+def delete_facility(id):
+    facility = Facility.query.get_or_404(id)
+    db.session.delete(facility)
+    bump_stat('total_facilities', -1)
+    touch_change_stamp('facility')
+    db.session.commit()
+    flash('Facility has been deleted!', 'success')
+    return redirect(url_for('public.facilities'))
+
+@bp.route('/admin/achievement/edit/<int:id>', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def edit_achievement(id):
+    from ..forms import AchievementForm
+
+    achievement = Achievement.query.get_or_404(id)
+    form = AchievementForm(obj=achievement)
+    if form.validate_on_submit():
+        achievement.title = form.title.data
+        achievement.description = form.description.data
+        achievement.year = form.year.data
+        achievement.category = form.category.data
+        achievement.image_url = uploaded_image_url(form.image_file) or form.image_url.data
+        touch_change_stamp('achievement')
+        db.session.commit()
+        flash('Achievement has been updated!', 'success')
+        return redirect(url_for('public.achievements'))
+    return render_template('edit_achievement.html', title='Edit Achievement', form=form, achievement=achievement)
+
+@bp.route('/admin/achievement/delete/<int:id>', methods=['POST'])
+@login_required
+@admin_required
+def delete_achievement(id):
+    achievement = Achievement.query.get_or_404(id)
+    db.session.delete(achievement)
+    touch_change_stamp('achievement')
+    db.session.commit()
+    flash('Achievement has been deleted!', 'success')
+    return redirect(url_for('public.achievements'))
+
+@bp.route('/admin/alumni/add', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def add_alumni():
+    from ..forms import AlumniForm
+
+    form = AlumniForm()
+    if form.validate_on_submit():
+        alumni = Alumni(
+            name=form.name.data,
+            batch_year=form.batch_year.data,
+            current_position=form.current_position.data,
+            company=form.company.data,
+            linkedin=form.linkedin.data,
+            email=form.email.data,
+            achievements=form.achievements.data,
+            image_url=uploaded_image_url(form.image_file) or form.image_url.data
+        )
+        db.session.add(alumni)
+        bump_stat('total_alumni')
+        record_alumni_facets(alumni_facet_values(alumni), 1)
+        touch_change_stamp('alumni')
+        db.session.commit()
+        flash('Alumni has been added successfully!', 'success')
+        return redirect(url_for('public.alumni'))
+    return render_template('add_alumni.html', title='Add Alumni', form=form)
+
+@bp.route('/admin/alumni/edit/<int:id>', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def edit_alumni(id):
+    from ..forms import AlumniForm
+
+    alumni = Alumni.query.get_or_404(id)
+    form = AlumniForm(obj=alumni)
+    if form.validate_on_submit():
+        old_facets = alumni_facet_values(alumni)
+        alumni.name = form.name.data
+        alumni.batch_year = form.batch_year.data
+        alumni.current_position = form.current_position.data
+        alumni.company = form.company.data
+        alumni.linkedin = form.linkedin.data
+        alumni.email = form.email.data
+        alumni.achievements = form.achievements.data
+        alumni.image_url = uploaded_image_url(form.image_file) or form.image_url.data
+        change_alumni_facets(old_facets, alumni)
+        touch_change_stamp('alumni')
+        db.session.commit()
+        flash('Alumni information has been updated!', 'success')
+        return redirect(url_for('public.alumni'))
+    return render_template('add_alumni.html', title='Edit Alumni', form=form, alumni=alumni)
+
+@bp.route('/admin/alumni/delete/<int:id>', methods=['POST'])
+@login_required
+@admin_required
+def delete_alumni(id):
+    alumni = Alumni.query.get_or_404(id)
+    db.session.delete(alumni)
+    bump_stat('total_alumni', -1)
+    record_alumni_facets(alumni_facet_values(alumni), -1)
+    touch_change_stamp('alumni')
+    db.session.commit()
+    flash('Alumni has been deleted!', 'success')
+    return redirect(url_for('public.alumni'))
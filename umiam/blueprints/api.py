@@ -0,0 +1,136 @@
+# umiam/blueprints/api.py
+# Read-only JSON API (/api/v1) for the campus mobile app. Collections are paged
+# with an opaque keyset cursor and can be trimmed with ?fields=. Every response
+# carries an ETag built from the collection's change stamp, so a client that
+# polls with If-None-Match gets a bodiless 304 until an admin edits that table;
+# /api/v1/changes reports all the stamps at once for even cheaper polling.
+# Bodies over a few hundred bytes are gzipped for clients that accept it.
+import gzip
+from datetime import datetime
+
+from flask import Blueprint, jsonify, request, url_for
+from flask_login import current_user
+
+from ..alumni import alumni_filters
+from ..cache import cached_page
+from ..extensions import db
+from ..models import Achievement, Alumni, Announcement, ChangeStamp, Event, Facility, Notice
+from ..pagination import decode_cursor, keyset_page
+
+bp = Blueprint('api', __name__, url_prefix='/api/v1')
+
+API_PAGE_SIZE = 20
+API_MAX_PAGE_SIZE = 100
+API_COMPRESS_MIN_SIZE = 512
+
+# name: (model, change stamp, sort column, newest first, login required, fields).
+# Event seat counters are left out: registrations do not bump the 'event' stamp.
+API_RESOURCES = {
+    'notices': (Notice, 'notice', Notice.created_at, True, False,
+                ('id', 'message', 'priority', 'created_at')),
+    'announcements': (Announcement, 'announcement', Announcement.date_posted, True, True,
+                      ('id', 'title', 'content', 'date_posted')),
+    'events': (Event, 'event', Event.start_datetime, False, True,
+               ('id', 'title', 'description', 'location', 'start_datetime', 'end_datetime', 'capacity',
+                'image_url', 'created_at')),
+    'facilities': (Facility, 'facility', Facility.name, False, False,
+                   ('id', 'name', 'description', 'location', 'availability', 'image_url', 'created_at')),
+    'achievements': (Achievement, 'achievement', Achievement.year, True, False,
+                     ('id', 'title', 'description', 'year', 'category', 'image_url', 'created_at')),
+    'alumni': (Alumni, 'alumni', Alumni.batch_year, True, False,
+               ('id', 'name', 'batch_year', 'current_position', 'company', 'linkedin', 'email',
+                'achievements', 'image_url', 'created_at')),
+}
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+@bp.errorhandler(ApiError)
+def api_error(error):
+    return jsonify(error=error.message), error.status
+
+@bp.after_request
+def compress_response(response):
+    response.vary.add('Accept-Encoding')
+    if (response.status_code != 200 or response.direct_passthrough or response.content_encoding
+            or not request.accept_encodings['gzip']):
+        return response
+    body = response.get_data()
+    if len(body) < API_COMPRESS_MIN_SIZE:
+        return response
+    response.set_data(gzip.compress(body, compresslevel=6))
+    response.content_encoding = 'gzip'
+    # The compressed bytes differ from the identity ones, so the tag can only be weak.
+    etag, _ = response.get_etag()
+    if etag:
+        response.set_etag(etag, weak=True)
+    return response
+
+@bp.route('/')
+def index():
+    return jsonify(version=1, resources={name: url_for('api.collection', name=name, _external=True)
+                                         for name in API_RESOURCES})
+
+@bp.route('/changes')
+@cached_page(*{resource[1] for resource in API_RESOURCES.values()})
+def changes():
+    # One small response per poll; fetch a collection only when its version moves.
+    stamps = {stamp.name: stamp for stamp in ChangeStamp.query}
+    changed = {}
+    for name, resource in API_RESOURCES.items():
+        stamp = stamps.get(resource[1])
+        if stamp is not None:
+            changed[name] = {'version': stamp.version, 'changed_at': _to_json(stamp.changed_at)}
+    return jsonify(changed)
+
+@bp.route('/<name>')
+def collection(name):
+    if name not in API_RESOURCES:
+        raise ApiError(404, f'Unknown resource {name!r}.')
+    if API_RESOURCES[name][4] and not current_user.is_authenticated:
+        raise ApiError(401, 'Sign in to read this resource.')
+    # cached_page needs the stamp name up front, so the view is wrapped per request.
+    return cached_page(API_RESOURCES[name][1])(_collection)(name)
+
+def _collection(name):
+    model, _, sort_column, newest_first, _, allowed = API_RESOURCES[name]
+
+    fields = allowed
+    if request.args.get('fields'):
+        fields = tuple(field.strip() for field in request.args['fields'].split(',') if field.strip())
+        unknown = [field for field in fields if field not in allowed]
+        if unknown:
+            raise ApiError(400, f"Unknown field(s) {', '.join(unknown)}; choose from {', '.join(allowed)}.")
+    limit = request.args.get('limit', API_PAGE_SIZE, type=int)
+    if not 1 <= limit <= API_MAX_PAGE_SIZE:
+        raise ApiError(400, f'limit must be between 1 and {API_MAX_PAGE_SIZE}.')
+
+    # Only the requested columns are read, plus what the cursor needs.
+    columns = [getattr(model, field) for field in fields]
+    query = db.session.query(*columns, sort_column, model.id)
+    if model is Alumni:
+        query = query.filter(*[getattr(Alumni, facet) == value
+                               for facet, value in alumni_filters(request.args).items()])
+    cursor = decode_cursor(request.args.get('cursor'), sort_column.type.python_type)
+    if request.args.get('cursor') and cursor is None:
+        raise ApiError(400, 'Invalid cursor.')
+    if cursor is not None:
+        keyset = db.tuple_(sort_column, model.id)
+        query = query.filter(keyset < cursor if newest_first else keyset > cursor)
+    order = [sort_column, model.id]
+    if newest_first:
+        order = [column.desc() for column in order]
+    rows, next_cursor = keyset_page(query.order_by(*order), limit, lambda row: (row[-2], row[-1]))
+
+    next_url = None
+    if next_cursor:
+        next_url = url_for('api.collection', name=name, _external=True,
+                           **dict(request.args.items(), cursor=next_cursor))
+    return jsonify(data=[{field: _to_json(value) for field, value in zip(fields, row)} for row in rows],
+                   next_cursor=next_cursor, next=next_url)
+
+def _to_json(value):
+    return value.isoformat() if isinstance(value, datetime) else value
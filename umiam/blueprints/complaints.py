@@ -0,0 +1,213 @@
+# umiam/blueprints/complaints.py
+# Submitting and tracking complaints, and the admin queue that works through them.
+from datetime import datetime, timedelta
+
+from flask import Blueprint, flash, redirect, render_template, request, url_for
+from flask_login import current_user, login_required
+from sqlalchemy import tuple_
+from sqlalchemy.orm import joinedload
+
+from ..analytics import (ANALYTICS_WEEKS, build_complaint_analytics, change_complaint_status,
+                         change_complaints_status, ist_now, record_complaint_submitted)
+from ..auth import admin_required
+from ..extensions import db
+from ..history import complaint_timelines, record_complaint_event
+from ..jobs import enqueue_many
+from ..mail import email_payload, queue_email
+from ..models import COMPLAINT_CATEGORIES, COMPLAINT_STATUSES, COMPLAINTS_PER_PAGE, Complaint
+from ..pagination import decode_cursor, keyset_page
+from ..stats import bump_stat
+
+bp = Blueprint('complaints', __name__)
+
+@bp.route('/submit_complaint', methods=['GET', 'POST'])
+@login_required
+def submit_complaint():
+    from ..forms import ComplaintForm
+
+    form = ComplaintForm()
+    if form.validate_on_submit():
+        complaint = Complaint(
+            category=form.category.data,
+            details=form.details.data,
+            status='Submitted',
+            user_id=current_user.id if form.anonymous.data == 'no' else None,
+            anonymous=form.anonymous.data
+        )
+        # Adjust time to IST (+5:30)
+        if complaint.submission_date is None:
+            complaint.submission_date = datetime.utcnow()
+        complaint.submission_date = complaint.submission_date + timedelta(hours=5, minutes=30)
+        db.session.add(complaint)
+        bump_stat('total_complaints')
+        record_complaint_submitted(complaint)
+        record_complaint_event(complaint, 'submitted', actor_id=complaint.user_id, new_status=complaint.status,
+                               at=complaint.submission_date)
+        db.session.commit()
+        flash('Your complaint has been submitted successfully!', 'success')
+        return redirect(url_for('complaints.my_complaints'))
+    return render_template('submit_complaint.html', title='Submit Complaint', form=form)
+
+@bp.route('/my_complaints')
+@login_required
+def my_complaints():
+    user_complaints = Complaint.query.filter_by(user_id=current_user.id).order_by(Complaint.submission_date.desc()).all()
+    return render_template('my_complaints.html', title='My Complaints', complaints=user_complaints,
+                           timelines=complaint_timelines([complaint.id for complaint in user_complaints]))
+
+@bp.route('/admin/complaints')
+@login_required
+@admin_required
+def admin_complaints():
+    category = request.args.get('category')
+    status = request.args.get('status')
+    if category not in COMPLAINT_CATEGORIES:
+        category = None
+    if status not in COMPLAINT_STATUSES:
+        status = None
+
+    filters = []
+    if category:
+        filters.append(Complaint.category == category)
+    if status:
+        filters.append(Complaint.status == status)
+
+    query = (Complaint.query.options(joinedload(Complaint.complainant))
+             .filter(*filters)
+             .order_by(Complaint.submission_date.desc(), Complaint.id.desc()))
+    cursor = decode_cursor(request.args.get('cursor'), datetime)
+    if cursor:
+        query = query.filter(tuple_(Complaint.submission_date, Complaint.id) < cursor)
+    page, next_cursor = keyset_page(query, COMPLAINTS_PER_PAGE,
+                                    lambda complaint: (complaint.submission_date, complaint.id))
+
+    category_counts = dict(
+        db.session.query(Complaint.category, db.func.count(Complaint.id))
+        .filter(*filters)
+        .group_by(Complaint.category)
+        .all()
+    )
+    grouped = {}
+    for complaint in page:
+        grouped.setdefault(complaint.category, []).append(complaint)
+    # Known categories first in their usual order, anything unexpected after.
+    complaint_groups = [(c, grouped.pop(c)) for c in COMPLAINT_CATEGORIES if c in grouped]
+    complaint_groups.extend(grouped.items())
+
+    return render_template('admin_complaints.html', title='Admin - All Complaints',
+                           complaint_groups=complaint_groups,
+                           timelines=complaint_timelines([complaint.id for complaint in page]),
+                           category_counts=category_counts,
+                           categories=COMPLAINT_CATEGORIES,
+                           statuses=COMPLAINT_STATUSES,
+                           selected_category=category,
+                           selected_status=status,
+                           is_first_page=cursor is None,
+                           next_cursor=next_cursor)
+
+@bp.route('/admin/complaints/analytics')
+@login_required
+@admin_required
+def complaint_analytics():
+    weeks = request.args.get('weeks', 13, type=int)
+    if weeks not in ANALYTICS_WEEKS:
+        weeks = 13
+    category = request.args.get('category')
+    if category not in COMPLAINT_CATEGORIES:
+        category = None
+    return render_template('complaint_analytics.html', title='Complaint Analytics',
+                           analytics=build_complaint_analytics(weeks, category),
+                           categories=COMPLAINT_CATEGORIES,
+                           statuses=COMPLAINT_STATUSES,
+                           week_options=ANALYTICS_WEEKS,
+                           selected_weeks=weeks,
+                           selected_category=category)
+
+@bp.route('/admin/complaint/status/<int:id>', methods=['POST'])
+@login_required
+@admin_required
+def update_complaint_status(id):
+    complaint = Complaint.query.get_or_404(id)
+    new_status = request.form.get('status')
+    if new_status in COMPLAINT_STATUSES:
+        if complaint.status != new_status and 'Resolved' in (complaint.status, new_status):
+            bump_stat('resolved_complaints', 1 if new_status == 'Resolved' else -1)
+            if new_status == 'Resolved' and complaint.complainant and complaint.anonymous == 'no':
+                queue_email(complaint.complainant.email, 'complaint_resolved',
+                            complaint=complaint, user=complaint.complainant)
+        if complaint.status != new_status:
+            record_complaint_event(complaint, 'status', actor_id=current_user.id, old_status=complaint.status,
+                                   new_status=new_status)
+        change_complaint_status(complaint, new_status)
+        db.session.commit()
+        flash(f'Complaint status updated to {new_status}', 'success')
+    return redirect(url_for('complaints.admin_complaints'))
+
+@bp.route('/admin/complaint/comment/<int:id>', methods=['POST'])
+@login_required
+@admin_required
+def update_complaint_comment(id):
+    complaint = Complaint.query.get_or_404(id)
+    comment = request.form.get('comment')
+    if (comment or '') != (complaint.comments or ''):
+        record_complaint_event(complaint, 'comment', actor_id=current_user.id, comment=comment)
+    complaint.comments = comment
+    db.session.commit()
+    flash('Comment has been updated!', 'success')
+    return redirect(url_for('complaints.admin_complaints'))
+
+@bp.route('/admin/complaints/bulk', methods=['POST'])
+@login_required
+@admin_required
+def bulk_update_complaints():
+    # Either the ticked complaints or every complaint matching the queue's
+    # current filter, moved with one UPDATE and one batch of history rows.
+    category = request.form.get('category')
+    status = request.form.get('status')
+    category = category if category in COMPLAINT_CATEGORIES else None
+    status = status if status in COMPLAINT_STATUSES else None
+    back = redirect(url_for('complaints.admin_complaints', category=category, status=status))
+    new_status = request.form.get('new_status')
+    comment = (request.form.get('comment') or '').strip() or None
+    if new_status not in COMPLAINT_STATUSES:
+        flash('Choose the status to move the complaints to.', 'danger')
+        return back
+
+    if request.form.get('scope') == 'filter':
+        if not (category or status):
+            flash('Filter the queue by category or status before updating everything in it.', 'danger')
+            return back
+        conditions = [Complaint.category == category] if category else []
+        if status:
+            conditions.append(Complaint.status == status)
+    else:
+        ids = request.form.getlist('ids', type=int)
+        if not ids:
+            flash('Tick the complaints to update first.', 'warning')
+            return back
+        conditions = [Complaint.id.in_(ids)]
+
+    now = ist_now()
+    changed = change_complaints_status(conditions, new_status, now)
+    changed_ids = [row.id for row in changed]
+    if comment and changed_ids:
+        db.session.execute(db.update(Complaint).where(Complaint.id.in_(changed_ids)).values(comments=comment))
+    for row in changed:
+        record_complaint_event(row.id, 'status', actor_id=current_user.id, old_status=row.status,
+                               new_status=new_status, at=now)
+        if comment:
+            record_complaint_event(row.id, 'comment', actor_id=current_user.id, comment=comment, at=now)
+
+    resolved_delta = sum((new_status == 'Resolved') - (row.status == 'Resolved') for row in changed)
+    if resolved_delta:
+        bump_stat('resolved_complaints', resolved_delta)
+    if new_status == 'Resolved' and changed_ids:
+        resolved = (Complaint.query.options(joinedload(Complaint.complainant))
+                    .filter(Complaint.id.in_(changed_ids), Complaint.anonymous == 'no',
+                            Complaint.user_id.isnot(None)))
+        enqueue_many('email', (email_payload(complaint.complainant.email, 'complaint_resolved',
+                                             complaint=complaint, user=complaint.complainant)
+                               for complaint in resolved))
+    db.session.commit()
+    flash(f'{len(changed)} complaint(s) moved to {new_status}.', 'success')
+    return back
@@ -0,0 +1,277 @@
+# umiam/blueprints/public.py
+# Pages anyone can open (home, facilities, achievements, alumni, search), sign-in
+# and sign-up, and the static-style responses: fingerprinted assets, avatars,
+# uploaded media, the live notice stream and the metrics scrape.
+import hmac
+import math
+import mimetypes
+import os
+import queue
+
+from flask import Blueprint, Response, abort, current_app, flash, jsonify, redirect, render_template, request
+from flask import send_file, send_from_directory, url_for
+from flask_login import current_user, login_required, login_user, logout_user
+from werkzeug.security import safe_join
+
+from ..avatars import AVATAR_COLORS, render_avatar
+from ..cache import cached_page
+from ..extensions import db
+from ..images import MEDIA_VARIANT_RE, is_variant, original_path, process_image
+from ..metrics import render_metrics
+from ..models import Achievement, Facility, Notice, User
+from ..notices import (LATEST_NOTICE_COUNT, current_notice_version, ensure_notice_poller, format_sse,
+                       latest_notices_payload, notice_hub)
+from ..passwords import HashingBusy, check_user_password, hash_password
+from ..ratelimit import throttle_login
+from ..stats import bump_stat
+
+bp = Blueprint('public', __name__)
+
+@bp.route('/')
+@bp.route('/home')
+@cached_page('notice')
+def home():
+    notices = Notice.query.order_by(Notice.created_at.desc()).limit(LATEST_NOTICE_COUNT).all()
+    return render_template('home.html', title='Home', notices=notices, notice_version=current_notice_version())
+
+@bp.route('/assets/<path:filename>')
+def asset(filename):
+    build_dir = current_app.config['ASSET_BUILD_DIR']
+    served, encoding = filename, None
+    for candidate, suffix in (('br', '.br'), ('gzip', '.gz')):
+        variant = safe_join(build_dir, filename + suffix)
+        if request.accept_encodings[candidate] and variant is not None and os.path.isfile(variant):
+            served, encoding = filename + suffix, candidate
+            break
+    response = send_from_directory(build_dir, served, max_age=current_app.config['ASSET_MAX_AGE'],
+                                   mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream')
+    response.content_encoding = encoding
+    response.vary.add('Accept-Encoding')
+    response.cache_control.immutable = True
+    return response
+
+@bp.route('/avatar/<int:color>/<initials>.svg')
+def avatar(color, initials):
+    # Only URLs avatar_url() can produce are rendered, so arbitrary text cannot grow the cache.
+    if color >= len(AVATAR_COLORS) or not (initials == '#' or (
+            initials.isalnum() and initials.upper() == initials and len(initials) <= 4)):
+        abort(404)
+    svg, path = render_avatar(color, initials)
+    if path is not None:
+        response = send_file(path, mimetype='image/svg+xml', max_age=current_app.config['AVATAR_MAX_AGE'])
+    else:
+        response = Response(svg, mimetype='image/svg+xml')
+        response.cache_control.public = True
+        response.cache_control.max_age = current_app.config['AVATAR_MAX_AGE']
+    response.cache_control.immutable = True
+    return response
+
+@bp.route('/media/<path:filename>')
+def media(filename):
+    path = safe_join(current_app.config['MEDIA_DIR'], filename)
+    if path is None:
+        abort(404)
+    if not os.path.isfile(path):
+        match = MEDIA_VARIANT_RE.fullmatch('/media/' + filename)
+        if match is None or not os.path.isfile(original_path(match['digest'])):
+            abort(404)
+        # Only regenerate files that should exist; any other width would decode the original for nothing.
+        if not is_variant(match['digest'], int(match['width'])):
+            abort(404)
+        process_image(match['digest'])
+        if not os.path.isfile(path):
+            abort(404)
+    response = send_file(path, mimetype='image/webp', max_age=current_app.config['ASSET_MAX_AGE'])
+    response.cache_control.immutable = True
+    return response
+
+@bp.route('/notices/stream')
+def notice_stream():
+    ensure_notice_poller()
+    # Subscribe before working out the backlog so nothing published in between is lost;
+    # the client applies events idempotently, so an occasional duplicate is harmless.
+    subscription = notice_hub.subscribe()
+    backlog = []
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    if last_event_id and last_event_id.isdigit():
+        backlog = notice_hub.replay_since(int(last_event_id))
+        if backlog is None:
+            version = current_notice_version()
+            backlog = [] if version == int(last_event_id) else [
+                format_sse(version, 'snapshot', latest_notices_payload())
+            ]
+    heartbeat = current_app.config['SSE_HEARTBEAT_INTERVAL']
+
+    # Deliberately not wrapped in stream_with_context: the request context (and its
+    # database connection) is released as soon as this view returns.
+    def generate():
+        try:
+            yield 'retry: 3000\n\n'
+            yield from backlog
+            while not subscription.closed:
+                try:
+                    yield subscription.queue.get(timeout=heartbeat)
+                except queue.Empty:
+                    yield ': keep-alive\n\n'
+        finally:
+            notice_hub.unsubscribe(subscription)
+
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@bp.route('/register', methods=['GET', 'POST'])
+def register():
+    from ..forms import RegistrationForm
+
+    if current_user.is_authenticated:
+        return redirect(url_for('public.home'))
+    form = RegistrationForm()
+    if form.validate_on_submit():
+        refused = _refuse_sign_in('register.html', 'Register', form, throttle_login())
+        if refused:
+            return refused
+        try:
+            hashed_password = hash_password(form.password.data)
+        except HashingBusy:
+            return _refuse_sign_in('register.html', 'Register', form, busy=True)
+        user = User(
+            username=form.username.data,
+            email=form.email.data,
+            password_hash=hashed_password,
+            role=form.role.data,
+            name=form.name.data,
+            roll_number=form.roll_number.data,
+            room_number=form.room_number.data,
+            studying_year=form.studying_year.data,
+            Branch=form.Branch.data
+        )
+        db.session.add(user)
+        if user.role == 'Student':
+            bump_stat('total_students')
+        db.session.commit()
+        flash('Your account has been created! You can now log in.', 'success')
+        return redirect(url_for('public.login'))
+    else:
+        for field, errors in form.errors.items():
+            for error in errors:
+                flash(f"Error in {getattr(form, field).label.text}: {error}", 'danger')
+    return render_template('register.html', title='Register', form=form)
+
+@bp.route('/login', methods=['GET', 'POST'])
+def login():
+    from ..forms import LoginForm
+
+    if current_user.is_authenticated:
+        return redirect(url_for('public.home'))
+    form = LoginForm()
+    if form.validate_on_submit():
+        refused = _refuse_sign_in('login.html', 'Login', form, throttle_login(form.email.data))
+        if refused:
+            return refused
+        user = User.query.filter_by(email=form.email.data).first()
+        try:
+            signed_in = user is not None and check_user_password(user, form.password.data)
+        except HashingBusy:
+            return _refuse_sign_in('login.html', 'Login', form, busy=True)
+        if signed_in:
+            # Saves the upgraded hash if check_user_password() rehashed it.
+            db.session.commit()
+            login_user(user)
+            next_page = request.args.get('next')
+            return redirect(next_page) if next_page else redirect(url_for('public.home'))
+        else:
+            flash('Login Unsuccessful. Please check email and password.', 'danger')
+    elif request.method == 'POST':
+        flash('Invalid email or password.', 'danger')
+    return render_template('login.html', title='Login', form=form)
+
+def _refuse_sign_in(template, title, form, retry_after=0, busy=False):
+    # 429 when this IP or email is out of attempts, 503 when the hashing queue
+    # is full; both say when to come back. None means go ahead.
+    if busy:
+        flash('The server is busy signing other people in. Please try again in a few seconds.', 'warning')
+        return render_template(template, title=title, form=form), 503, {'Retry-After': '5'}
+    if retry_after:
+        seconds = math.ceil(retry_after)
+        flash(f'Too many attempts. Please wait {seconds} seconds and try again.', 'danger')
+        return render_template(template, title=title, form=form), 429, {'Retry-After': str(seconds)}
+    return None
+
+@bp.route('/logout')
+@login_required
+def logout():
+    logout_user()
+    return redirect(url_for('public.home'))
+
+@bp.route('/facilities')
+@cached_page('facility')
+def facilities():
+    facilities = Facility.query.order_by(Facility.name).all()
+    return render_template('facilities.html', title='Hostel Facilities', facilities=facilities)
+
+@bp.route('/achievements')
+@cached_page('achievement')
+def achievements():
+    achievements = Achievement.query.order_by(Achievement.year.desc()).all()
+    return render_template('achievements.html', title='Hostel Achievements', achievements=achievements)
+
+@bp.route('/alumni')
+@cached_page('alumni')
+def alumni():
+    from ..alumni import alumni_filters, browse_alumni, get_alumni_facets
+    from ..pagination import decode_cursor
+
+    filters = alumni_filters(request.args)
+    cursor = decode_cursor(request.args.get('cursor'), str)
+    alumni_list, next_cursor = browse_alumni(filters, cursor)
+    return render_template('alumni.html', title='Alumni Network', alumni=alumni_list,
+                           facets=get_alumni_facets(filters),
+                           filters=filters,
+                           is_first_page=cursor is None,
+                           next_cursor=next_cursor)
+
+@bp.route('/alumni/browse')
+@cached_page('alumni')
+def alumni_browse():
+    # The same page and facet counts as /alumni, as JSON.
+    from ..alumni import alumni_filters, browse_alumni, get_alumni_facets
+    from ..pagination import decode_cursor
+
+    filters = alumni_filters(request.args)
+    alumni_list, next_cursor = browse_alumni(filters, decode_cursor(request.args.get('cursor'), str))
+    return jsonify(
+        results=[{'id': alum.id, 'name': alum.name, 'batch_year': alum.batch_year,
+                  'current_position': alum.current_position, 'company': alum.company,
+                  'linkedin': alum.linkedin, 'email': alum.email, 'achievements': alum.achievements,
+                  'image_url': alum.image_url}
+                 for alum in alumni_list],
+        facets={facet: [{'value': value, 'count': count} for value, count in values]
+                for facet, values in get_alumni_facets(filters).items()},
+        filters=filters,
+        next_cursor=next_cursor,
+    )
+
+@bp.route('/search')
+def search():
+    from ..search import search_documents, searchable_kinds
+
+    query = request.args.get('q', '').strip()
+    kinds = searchable_kinds()
+    kind = request.args.get('kind')
+    if kind in kinds:
+        kinds = [kind]
+    else:
+        kind = None
+    page = max(request.args.get('page', 1, type=int), 1)
+    results, has_next = search_documents(query, kinds, page) if query else ([], False)
+    return render_template('search.html', title='Search', query=query, results=results,
+                           kinds=searchable_kinds(), selected_kind=kind, page=page, has_next=has_next)
+
+@bp.route('/metrics')
+def metrics():
+    token = current_app.config['METRICS_TOKEN']
+    authorized = (current_user.is_authenticated and current_user.role == 'HMC Admin') or (
+        token and hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'))
+    if not authorized:
+        abort(403)
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
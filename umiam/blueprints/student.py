@@ -0,0 +1,87 @@
+# umiam/blueprints/student.py
+# The signed-in residents' portal: dashboard, events and profile.
+from flask import Blueprint, flash, redirect, render_template, request, url_for
+from flask_login import current_user, login_required
+from sqlalchemy.orm import joinedload
+
+from ..auth import forget_user
+from ..extensions import db
+from ..images import uploaded_image_url
+from ..mail import queue_seat_confirmed_emails
+from ..models import Announcement, Event, EventRegistration, User
+from ..registrations import WAITLISTED, cancel_registration, register_for_event
+from ..stats import get_stats
+
+bp = Blueprint('student', __name__)
+
+@bp.route('/dashboard')
+@login_required
+def dashboard():
+    # Read stats first: a rebuild commits, which would expire the announcements.
+    stats = get_stats()
+    announcements = (Announcement.query.options(joinedload(Announcement.author))
+                     .order_by(Announcement.date_posted.desc()).limit(5).all())
+    pending_complaints = stats['total_complaints'] - stats['resolved_complaints']
+
+    return render_template('dashboard.html', title='Dashboard',
+                           announcements=announcements,
+                           pending_complaints=pending_complaints,
+                           **stats)
+
+@bp.route('/events')
+@login_required
+def events():
+    events = Event.query.order_by(Event.start_datetime).all()
+    # The viewer's registration state for every card is loaded up front; seat and
+    # waitlist numbers come from the counters on each event.
+    registration_status = dict(
+        db.session.query(EventRegistration.event_id, EventRegistration.status)
+        .filter_by(user_id=current_user.id)
+    )
+    return render_template('events.html', title='Events', events=events,
+                           registration_status=registration_status)
+
+@bp.route('/event/register/<int:event_id>', methods=['POST'])
+@login_required
+def register_event(event_id):
+    event = Event.query.get_or_404(event_id)
+    # An explicit action keeps a double-click from registering and then unregistering.
+    if request.form.get('action') == 'cancel':
+        status, promoted = cancel_registration(event.id, current_user.id)
+        queue_seat_confirmed_emails(event, promoted)
+        db.session.commit()
+        if status == WAITLISTED:
+            flash('You have left the waitlist.', 'info')
+        elif status:
+            flash('You have unregistered from the event.', 'info')
+    else:
+        status = register_for_event(event.id, current_user.id)
+        db.session.commit()
+        if status == WAITLISTED:
+            flash('This event is full; you have been added to the waitlist.', 'info')
+        elif status:
+            flash('You have registered for the event!', 'success')
+
+    return redirect(url_for('student.events'))
+
+@bp.route('/profile/settings', methods=['GET', 'POST'])
+@login_required
+def profile_settings():
+    from ..forms import ProfileForm
+
+    form = ProfileForm(obj=current_user)
+    if form.validate_on_submit():
+        user = db.session.get(User, current_user.id)
+        user.name = form.name.data
+        user.roll_number = form.roll_number.data
+        user.room_number = form.room_number.data
+        user.studying_year = form.studying_year.data
+        user.Branch = form.Branch.data
+        profile_pic_url = uploaded_image_url(form.profile_pic_file) or form.profile_pic_url.data
+        if profile_pic_url:
+            user.profile_pic_url = profile_pic_url
+        db.session.commit()
+        forget_user(user.id)
+        flash('Your profile has been updated!', 'success')
+        return redirect(url_for('student.profile_settings'))
+    return render_template('profile_settings.html', title='Profile Settings', form=form)
@@ -0,0 +1,146 @@
+# umiam/cache.py
+# Public, read-mostly pages are rendered once per (page, viewer, data version) and
+# served from memory afterwards. The data version comes from ChangeStamp rows that
+# the admin write routes bump in the same transaction as their change, so every
+# worker sees the invalidation, and browsers/proxies revalidate with the derived
+# ETag and Last-Modified to get a 304 without the page being rendered at all.
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from functools import wraps
+
+from flask import Response, make_response, request, session
+from flask_login import current_user
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from .extensions import db
+from .models import ChangeStamp
+
+class LRUCache:
+    """Thread-safe bounded LRU map with an optional per-entry time to live."""
+
+    def __init__(self, max_entries, ttl=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and entry[1] < time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, value):
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'max_entries': self.max_entries,
+                    'hits': self.hits, 'misses': self.misses}
+
+page_cache = LRUCache(256)
+
+def init_app(app):
+    app.config.setdefault('PAGE_CACHE_SIZE', 256)
+    page_cache.max_entries = app.config['PAGE_CACHE_SIZE']
+
+def touch_change_stamp(name):
+    # Upsert so a stamp that was never seeded still starts counting.
+    db.session.execute(
+        sqlite_insert(ChangeStamp)
+        .values(name=name, version=1, changed_at=datetime.utcnow())
+        .on_conflict_do_update(
+            index_elements=[ChangeStamp.name],
+            set_={'version': ChangeStamp.version + 1, 'changed_at': datetime.utcnow()},
+        )
+    )
+
+def viewer_cache_key():
+    # base.html renders the signed-in user's details in the navbar, so their
+    # pages are keyed by those values as well as by who they are.
+    if not current_user.is_authenticated:
+        return 'anonymous'
+    return repr((current_user.id, current_user.role, current_user.username, current_user.name,
+                 current_user.profile_pic_url, current_user.roll_number, current_user.Branch,
+                 current_user.studying_year, current_user.room_number))
+
+def http_last_modified(changed_at):
+    # HTTP dates have whole seconds. Once the stamp's second is over, the page is
+    # dated to its end, so any later edit is strictly newer than what the client
+    # holds; until then it is dated to its start, which never revalidates (a
+    # second edit within that second would look no newer).
+    changed_at = changed_at.replace(tzinfo=timezone.utc)
+    end_of_second = changed_at.replace(microsecond=0) + timedelta(seconds=1)
+    if end_of_second <= datetime.now(timezone.utc):
+        return end_of_second
+    return end_of_second - timedelta(seconds=1)
+
+def cached_page(*tables):
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            # Pending flash messages are rendered (and consumed) by the page itself.
+            if '_flashes' in session:
+                return f(*args, **kwargs)
+
+            stamps = ChangeStamp.query.filter(ChangeStamp.name.in_(tables)).all()
+            versions = sorted((stamp.name, stamp.version) for stamp in stamps)
+            key_source = repr((request.full_path, viewer_cache_key(), versions))
+            etag = hashlib.sha1(key_source.encode()).hexdigest()
+            last_modified = max((stamp.changed_at for stamp in stamps), default=None)
+
+            if request.if_none_match:
+                # Weak comparison, so a compressed response's W/ tag still matches.
+                not_modified = request.if_none_match.contains_weak(etag)
+            else:
+                not_modified = (last_modified is not None and request.if_modified_since is not None
+                                and last_modified.replace(tzinfo=timezone.utc) < request.if_modified_since)
+            if not_modified:
+                response = Response(status=304)
+            else:
+                cached = page_cache.get(etag)
+                if cached is None:
+                    response = make_response(f(*args, **kwargs))
+                    if response.status_code != 200:
+                        return response
+                    page_cache.set(etag, (response.get_data(), response.mimetype))
+                else:
+                    response = Response(cached[0], mimetype=cached[1])
+
+            response.set_etag(etag)
+            if last_modified is not None:
+                response.last_modified = http_last_modified(last_modified)
+            response.cache_control.no_cache = True
+            if current_user.is_authenticated:
+                response.cache_control.private = True
+            else:
+                response.cache_control.public = True
+            response.vary.add('Cookie')
+            return response
+        return decorated_function
+    return decorator
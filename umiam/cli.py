@@ -0,0 +1,224 @@
+# umiam/cli.py
+# `flask --app app <command>` maintenance commands. Each one imports the module
+# it drives when it runs, so registering them costs the web workers nothing.
+import os
+import posixpath
+import time
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from .extensions import db
+
+def init_app(app):
+    for command in (rebuild_stats_command, rebuild_search_command, rebuild_complaint_stats_command,
+                    migrate_db_command, explain_queries_command, build_assets_command, vendor_assets_command,
+                    import_images_command, import_students_command, run_jobs_command, smtp_sink_command):
+        app.cli.add_command(command)
+
+@click.command('rebuild-stats')
+@with_appcontext
+def rebuild_stats_command():
+    """Recompute the dashboard counters and alumni facet counts from the underlying tables."""
+    from .alumni import alumni_facet_statements
+    from .stats import rebuild_stats
+
+    for name, value in rebuild_stats().items():
+        click.echo(f'{name}: {value}')
+    with db.engine.begin() as conn:
+        for statement in alumni_facet_statements():
+            conn.exec_driver_sql(statement)
+        facets = conn.exec_driver_sql('SELECT count(*) FROM alumni_facet').scalar()
+    click.echo(f'alumni facet values: {facets}')
+
+@click.command('rebuild-search')
+@with_appcontext
+def rebuild_search_command():
+    """Recreate the full-text search index from the source tables."""
+    from .search import search_backfill_statements, search_index_statements
+
+    with db.engine.begin() as conn:
+        for statement in search_index_statements() + search_backfill_statements():
+            conn.exec_driver_sql(statement)
+        conn.exec_driver_sql("INSERT INTO search_index (search_index) VALUES ('optimize')")
+        total = conn.exec_driver_sql('SELECT count(*) FROM search_index').scalar()
+    click.echo(f'Indexed {total} documents.')
+
+@click.command('rebuild-complaint-stats')
+@with_appcontext
+def rebuild_complaint_stats_command():
+    """Recompute the complaint analytics rollups from the complaint table."""
+    from .analytics import complaint_rollup_statements
+
+    started = time.perf_counter()
+    with db.engine.begin() as conn:
+        for statement in complaint_rollup_statements():
+            conn.exec_driver_sql(statement)
+        days = conn.exec_driver_sql('SELECT count(*) FROM complaint_daily_stat').scalar()
+    click.echo(f'Rolled up {days} category-day(s) in {time.perf_counter() - started:.3f}s.')
+
+@click.command('migrate-db')
+@with_appcontext
+def migrate_db_command():
+    """Create missing tables and apply pending schema migrations."""
+    from .migrations import get_schema_version, migrate_db
+
+    applied = migrate_db()
+    for version, description in applied:
+        click.echo(f'Applied migration {version}: {description}')
+    with db.engine.connect() as conn:
+        click.echo(f'Schema is at version {get_schema_version(conn)}.')
+
+@click.command('explain-queries')
+@with_appcontext
+def explain_queries_command():
+    """Print SQLite's EXPLAIN QUERY PLAN for each hot route's query."""
+    from .migrations import HOT_QUERIES, explain_query
+
+    for route, build_query in HOT_QUERIES.items():
+        click.echo(f'{route}:')
+        for detail in explain_query(build_query()):
+            click.echo(f'    {detail}')
+
+@click.command('build-assets')
+@click.option('--clean', is_flag=True, help='Remove earlier builds first.')
+@with_appcontext
+def build_assets_command(clean):
+    """Write fingerprinted, precompressed copies of static/ for /assets/."""
+    from .assets import VENDOR_ASSETS, asset_manifest, brotli, build_assets
+
+    if brotli is None:
+        click.echo('brotli is not installed; writing gzip variants only.')
+    report = build_assets(clean=clean)
+    for name, size, gz_size, br_size in report:
+        click.echo(f"{name}: {size} B, gzip {gz_size or '-'}, brotli {br_size or '-'} -> {asset_manifest[name]}")
+    missing = [name for name in VENDOR_ASSETS if name not in asset_manifest]
+    if missing:
+        click.echo(f"Not vendored yet, still served from the CDN: {', '.join(missing)}. Run `flask vendor-assets`.")
+
+@click.command('vendor-assets')
+@with_appcontext
+def vendor_assets_command():
+    """Download the pinned Bootstrap and Font Awesome files into static/vendor/."""
+    import urllib.parse
+    import urllib.request
+
+    from .assets import VENDOR_ASSETS, css_references, write_file
+
+    pending = list(VENDOR_ASSETS.items())
+    fetched = set()
+    while pending:
+        name, url = pending.pop()
+        if name in fetched:
+            continue
+        with urllib.request.urlopen(url, timeout=30) as remote:
+            data = remote.read()
+        write_file(os.path.join(current_app.static_folder, name), data)
+        fetched.add(name)
+        click.echo(f'{name} ({len(data)} B)')
+        if name.endswith('.css'):
+            # Pull in the webfonts and images the stylesheet points at, keeping the layout.
+            directory = posixpath.dirname(name)
+            for _, path, _ in css_references(data.decode('utf-8')):
+                pending.append((posixpath.normpath(posixpath.join(directory, path)), urllib.parse.urljoin(url, path)))
+
+@click.command('import-images')
+@click.argument('source', type=click.Path(exists=True, file_okay=False))
+@click.option('--list', 'list_only', is_flag=True, help='Only print the remote URLs still in use.')
+@with_appcontext
+def import_images_command(source, list_only):
+    """Move remote image URLs onto the upload pipeline from a local copy in SOURCE."""
+    from .auth import forget_user
+    from .cache import touch_change_stamp
+    from .images import IMAGE_COLUMNS, local_image_for, store_image
+    from .models import User
+
+    counts = {'imported': 0, 'missing': 0, 'invalid': 0}
+    for model, column, stamp in IMAGE_COLUMNS:
+        attribute = getattr(model, column)
+        changed = False
+        for row in model.query.filter(db.or_(attribute.like('http://%'), attribute.like('https://%'))):
+            url = getattr(row, column)
+            if list_only:
+                click.echo(url)
+                continue
+            path = local_image_for(url, source)
+            if path is None:
+                counts['missing'] += 1
+                click.echo(f'No local copy of {url}')
+                continue
+            with open(path, 'rb') as f:
+                try:
+                    setattr(row, column, store_image(f.read(), background=False))
+                except ValueError as exc:
+                    counts['invalid'] += 1
+                    click.echo(f'{path}: {exc}')
+                    continue
+            counts['imported'] += 1
+            changed = True
+            if model is User:
+                forget_user(row.id)
+        if changed and stamp is not None:
+            touch_change_stamp(stamp)
+        db.session.commit()
+    if not list_only:
+        click.echo(f"Imported {counts['imported']} image(s); {counts['missing']} without a local copy, "
+                   f"{counts['invalid']} unreadable.")
+
+@click.command('import-students')
+@click.argument('roster', type=click.File('r', encoding='utf-8-sig'))
+@with_appcontext
+def import_students_command(roster):
+    """Bulk-load UMIAM resident emails from a CSV or one-per-line text file."""
+    from .roster import import_umiam_students
+
+    started = time.perf_counter()
+    counts = import_umiam_students(roster)
+    click.echo(f"Inserted {counts['inserted']}, skipped {counts['duplicate']} duplicate(s) "
+               f"and {counts['invalid']} invalid row(s) in {time.perf_counter() - started:.3f}s.")
+
+@click.command('run-jobs')
+@click.option('--workers', default=2, show_default=True, help='Worker threads to run.')
+@click.option('--burst', is_flag=True, help='Exit once nothing is due instead of waiting for new jobs.')
+@with_appcontext
+def run_jobs_command(workers, burst):
+    """Run background jobs (emails and the like) until interrupted."""
+    import threading
+
+    from .jobs import work
+
+    app = current_app._get_current_object()
+    stop = threading.Event()
+    threads = [threading.Thread(target=work, args=(app, stop, burst), name=f'job-worker-{index}', daemon=True)
+               for index in range(workers)]
+    for thread in threads:
+        thread.start()
+    click.echo(f"Running {workers} job worker(s){' until the queue is empty' if burst else ''}.")
+    try:
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(0.5)
+    except KeyboardInterrupt:
+        click.echo('Stopping after the current batch...')
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+@click.command('smtp-sink')
+@click.option('--host', default='127.0.0.1', show_default=True)
+@click.option('--port', default=8025, show_default=True)
+def smtp_sink_command(host, port):
+    """Accept mail on a local port and print it instead of delivering it (set MAIL_PORT to match)."""
+    from .mail import SMTPSink
+
+    def show(sender, recipients, data):
+        click.echo(f"--- from {sender} to {', '.join(recipients)}")
+        click.echo(data.decode('utf-8', 'replace'))
+
+    with SMTPSink((host, port), on_message=show) as server:
+        click.echo(f'Listening for mail on {host}:{port}.')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,107 @@
+# umiam/directory.py
+# The admin user directory. Pages are read with keyset pagination on the chosen
+# sort key plus id, selecting only the columns the table shows, so neither a
+# deep page nor password hashes and other unused text cost anything. The filter
+# dropdown counts come from one GROUP BY over (role, studying_year, Branch).
+#
+# Text sort keys are ifnull(column, '') COLLATE NOCASE so accounts with a blank
+# profile still have a place in the order; the expression indexes on User match
+# that expression exactly, which lets SQLite both walk them for a page and seek
+# into them for a prefix search.
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.expression import UnaryExpression
+
+from .extensions import db
+from .models import User
+from .pagination import keyset_page
+
+USERS_PER_PAGE = 50
+
+# URL value: column to sort by (None sorts by id alone).
+USER_SORTS = {
+    'id': None,
+    'name': User.name,
+    'roll_number': User.roll_number,
+    'room_number': User.room_number,
+}
+
+# Exact-match filters, each offered with a count of matching users.
+USER_FACETS = ('role', 'studying_year', 'Branch')
+
+DIRECTORY_COLUMNS = (User.id, User.username, User.email, User.name, User.roll_number, User.room_number,
+                     User.Branch, User.studying_year, User.role, User.profile_pic_url)
+
+def sort_key(column):
+    # literal_column keeps '' inline; a bound parameter would not match the index expression.
+    return db.func.ifnull(column, db.literal_column("''")).collate('NOCASE')
+
+def prefix_match(column, prefix):
+    # A range on the sort key instead of LIKE, so it can use the same index.
+    key = sort_key(column)
+    return db.and_(key >= prefix, key < prefix + '\U0010ffff')
+
+def user_directory_query(filters, search=None, room=None, sort='name', descending=False, cursor=None):
+    """The query for one directory page; `filters` maps USER_FACETS names to the value to match."""
+    conditions = _search_conditions(search, room)
+    # Unary + keeps SQLite off the role index: with most accounts being students,
+    # sorting every match costs more than walking the sort index to fill a page.
+    conditions.extend(UnaryExpression(getattr(User, facet), operator=operators.custom_op('+')) == value
+                      for facet, value in filters.items())
+
+    column = USER_SORTS[sort]
+    order = [User.id]
+    if column is not None:
+        key = sort_key(column)
+        order.insert(0, key)
+    if cursor is not None:
+        last_key, last_id = cursor
+        if column is None:
+            conditions.append(User.id < last_id if descending else User.id > last_id)
+        elif descending:
+            # Written out rather than as a row-value comparison, which SQLite
+            # cannot turn into a seek on an expression index.
+            conditions.extend([key <= last_key, db.or_(key < last_key, User.id < last_id)])
+        else:
+            conditions.extend([key >= last_key, db.or_(key > last_key, User.id > last_id)])
+    if descending:
+        order = [term.desc() for term in order]
+    return db.session.query(*DIRECTORY_COLUMNS).filter(*conditions).order_by(*order)
+
+def user_directory_page(filters, search=None, room=None, sort='name', descending=False, cursor=None):
+    """One page of the directory: (rows, next cursor or None)."""
+    column = USER_SORTS[sort]
+    # The cursor holds the sort key as compared, so a blank profile field is ''.
+    return keyset_page(user_directory_query(filters, search, room, sort, descending, cursor), USERS_PER_PAGE,
+                       lambda row: (None if column is None else getattr(row, column.key) or '', row.id))
+
+def user_facet_query(search=None, room=None):
+    return (db.session.query(User.role, User.studying_year, User.Branch, db.func.count())
+            .filter(*_search_conditions(search, room))
+            .group_by(User.role, User.studying_year, User.Branch))
+
+def user_facet_counts(filters, search=None, room=None):
+    """Counts for every facet value, and the total matching all filters.
+
+    Each facet is counted with the other facets' filters applied but not its
+    own, so its dropdown shows what choosing another value would give. All of
+    it is folded out of the single GROUP BY in user_facet_query().
+    """
+    counts = {facet: {} for facet in USER_FACETS}
+    total = 0
+    for *values, count in user_facet_query(search, room):
+        matches = [filters.get(facet) in (None, value) for facet, value in zip(USER_FACETS, values)]
+        for index, (facet, value) in enumerate(zip(USER_FACETS, values)):
+            if value is not None and all(matches[:index] + matches[index + 1:]):
+                counts[facet][value] = counts[facet].get(value, 0) + count
+        if all(matches):
+            total += count
+    return {facet: sorted(values.items()) for facet, values in counts.items()}, total
+
+def _search_conditions(search, room):
+    conditions = []
+    if search:
+        # Names and roll numbers both start with what was typed.
+        conditions.append(db.or_(prefix_match(User.name, search), prefix_match(User.roll_number, search)))
+    if room:
+        conditions.append(prefix_match(User.room_number, room))
+    return conditions
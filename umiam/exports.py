@@ -0,0 +1,128 @@
+# umiam/exports.py
+# Registrant lists are read with a single joined query projecting only the
+# columns shown, fetched in yield_per chunks and streamed straight to the client.
+import csv
+import io
+import zipfile
+from xml.sax.saxutils import escape as xml_escape
+
+from .extensions import db
+from .models import EventRegistration, User
+
+EXPORT_CHUNK_SIZE = 500
+
+REGISTRATION_EXPORT_COLUMNS = [
+    ('Name', User.name),
+    ('Roll Number', User.roll_number),
+    ('Branch', User.Branch),
+    ('Year', User.studying_year),
+    ('Email', User.email),
+    ('Registered On', EventRegistration.registration_date),
+    ('Status', EventRegistration.status),
+]
+
+def event_registration_rows(event_id):
+    return (db.session.query(*[column for _, column in REGISTRATION_EXPORT_COLUMNS])
+            .select_from(EventRegistration)
+            .join(User, EventRegistration.user_id == User.id)
+            .filter(EventRegistration.event_id == event_id)
+            # Confirmed registrations first, then the waitlist in the order it will be promoted.
+            .order_by(EventRegistration.status, EventRegistration.registration_date, EventRegistration.id)
+            .execution_options(yield_per=EXPORT_CHUNK_SIZE))
+
+# A cell starting with one of these is run as a formula when the file is opened in a spreadsheet.
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+def spreadsheet_text(value):
+    # Names and roll numbers are typed by users; a leading ' keeps them as text.
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+def generate_csv(headers, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(headers)
+    for row in rows:
+        writer.writerow([spreadsheet_text(value) for value in row])
+        if buffer.tell() >= 64 * 1024:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+class _ChunkSink(io.RawIOBase):
+    """Unseekable write target that hands back whatever was written since the last drain."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+XLSX_PARTS = {
+    '[Content_Types].xml':
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>',
+    '_rels/.rels':
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>',
+    'xl/workbook.xml':
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets></workbook>',
+    'xl/_rels/workbook.xml.rels':
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '</Relationships>',
+}
+
+def _xlsx_row(values):
+    cells = ''.join(
+        '<c t="inlineStr"><is><t>{}</t></is></c>'.format(xml_escape('' if value is None else str(value)))
+        for value in values
+    )
+    return f'<row>{cells}</row>'.encode()
+
+def generate_xlsx(headers, rows):
+    # A minimal single-sheet workbook with inline strings. zipfile writes data
+    # descriptors when the target can't seek, so the archive streams out as the
+    # sheet is written instead of being assembled in memory first.
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED) as workbook:
+        for name, content in XLSX_PARTS.items():
+            workbook.writestr(name, content)
+        with workbook.open('xl/worksheets/sheet1.xml', 'w') as sheet:
+            sheet.write(b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                        b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>')
+            sheet.write(_xlsx_row(headers))
+            for count, row in enumerate(rows, 1):
+                sheet.write(_xlsx_row(row))
+                if count % EXPORT_CHUNK_SIZE == 0:
+                    yield sink.drain()
+            sheet.write(b'</sheetData></worksheet>')
+        yield sink.drain()
+    yield sink.drain()
+
+EXPORT_FORMATS = {
+    'csv': (generate_csv, 'text/csv'),
+    'xlsx': (generate_xlsx, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
@@ -0,0 +1,11 @@
+# umiam/extensions.py
+# Extension objects are created unbound here and attached to an application in
+# create_app(), so models and views can import them without importing the app.
+from flask_login import LoginManager
+from flask_sqlalchemy import SQLAlchemy
+
+db = SQLAlchemy()
+
+login_manager = LoginManager()
+login_manager.login_view = 'public.login'
+login_manager.login_message_category = 'info'
@@ -0,0 +1,176 @@
+# umiam/forms.py
+# Imported by the views that use a form rather than at startup; WTForms and the
+# email validator only load with the first page that renders one.
+from flask_wtf import FlaskForm
+from flask_wtf.file import FileAllowed, FileField, FileRequired
+from wtforms import DateTimeLocalField, IntegerField, PasswordField, SelectField, StringField, SubmitField, TextAreaField
+from wtforms.validators import DataRequired, Email, EqualTo, Length, NumberRange, Optional, ValidationError
+
+from .images import IMAGE_EXTENSIONS, image_upload
+from .models import COMPLAINT_CATEGORIES, UmiamStudent, User
+
+class RegistrationForm(FlaskForm):
+    username = StringField('Username', validators=[DataRequired(), Length(min=4, max=25)])
+    email = StringField('Email', validators=[DataRequired(), Email()])
+    password = PasswordField('Password', validators=[DataRequired(), Length(min=6)])
+    confirm_password = PasswordField('Confirm Password', validators=[DataRequired(), EqualTo('password')])
+    # Updated fields to match schema
+    name = StringField('Full Name', validators=[DataRequired()])
+    roll_number = StringField('Roll Number', validators=[DataRequired()])
+    room_number = StringField('Room Number', validators=[DataRequired()])
+    studying_year = SelectField('Year of Study', choices=[
+        ('1st Year', '1st Year'),
+        ('2nd Year', '2nd Year'),
+        ('3rd Year', '3rd Year'),
+        ('4th Year', '4th Year'),
+        ('Ph.D', 'Ph.D'),
+        ('M.Tech', 'M.Tech')
+    ], validators=[DataRequired()])
+    Branch = SelectField('Branch', choices=[
+        ('CSE', 'Computer Science'),
+        ('ECE', 'Electronics'),
+        ('ME', 'Mechanical'),
+        ('CE', 'Civil')
+    ], validators=[DataRequired()])
+    verification_code = StringField('Verification Code (try:- "UMIAM-HMC)"', validators=[Optional()])
+    role = SelectField('Role', choices=[('Student', 'Student'), ('HMC Admin', 'HMC Admin')], validators=[DataRequired()])
+    submit = SubmitField('Sign Up')
+
+    def validate_username(self, username):
+        if User.query.filter_by(username=username.data).first():
+            raise ValidationError('That username is already taken.')
+    def validate_email(self, email):
+        if User.query.filter_by(email=email.data).first():
+            raise ValidationError('That email is already in use.')
+        if not email.data.lower().endswith('@iitg.ac.in'):
+            raise ValidationError('Please use your official IITG email address.')
+        email_data = email.data.strip().lower()
+        student = UmiamStudent.query.filter_by(email=email_data).first()
+        if not student:
+            raise ValidationError('You are not am UMIAM resident, please contact an HMC member if you think this is an error. ')
+    def validate_verification_code(self, field):
+        if self.role.data == 'HMC Admin' and field.data != 'UMIAM-HMC':
+            raise ValidationError('Invalid verification code.')
+
+class LoginForm(FlaskForm):
+    email = StringField('Email', validators=[DataRequired(), Email()])
+    password = PasswordField('Password', validators=[DataRequired()])
+    submit = SubmitField('Login')
+
+class ComplaintForm(FlaskForm):
+    category = SelectField('Category', choices=[(c, c) for c in COMPLAINT_CATEGORIES], validators=[DataRequired()])
+    details = TextAreaField('Details', validators=[DataRequired(), Length(min=10, max=500)])
+    anonymous = SelectField('Submit as', choices=[
+        ('no', 'Identify myself'), 
+        ('yes', 'Submit anonymously')
+    ], validators=[DataRequired()])
+    submit = SubmitField('Submit Complaint')
+
+class AnnouncementForm(FlaskForm):
+    title = StringField('Title', validators=[DataRequired()])
+    content = TextAreaField('Content', validators=[DataRequired()])
+    submit = SubmitField('Update Announcement')
+    add = SubmitField('Add Announcement')
+
+class FacilityForm(FlaskForm):
+    name = StringField('Name', validators=[DataRequired()])
+    description = TextAreaField('Description', validators=[DataRequired()])
+    location = StringField('Location', validators=[DataRequired()])
+    availability = StringField('Availability', validators=[DataRequired()])
+    image_url = StringField('Image URL')
+    image_file = FileField('Upload Image', validators=[FileAllowed(IMAGE_EXTENSIONS, 'Images only.'), image_upload])
+    submit = SubmitField('Update Facility')
+
+class NoticeForm(FlaskForm):
+    message = StringField('Message', validators=[DataRequired()])
+    priority = SelectField('Priority', choices=[('Normal', 'Normal'), ('Important', 'Important'), ('Urgent', 'Urgent')], validators=[DataRequired()])
+    submit = SubmitField('Update Notice')
+
+class AchievementForm(FlaskForm):
+    title = StringField('Title', validators=[DataRequired()])
+    description = TextAreaField('Description', validators=[DataRequired()])
+    year = StringField('Year', validators=[DataRequired()])
+    category = StringField('Category', validators=[DataRequired()])
+    image_url = StringField('Image URL')
+    image_file = FileField('Upload Image', validators=[FileAllowed(IMAGE_EXTENSIONS, 'Images only.'), image_upload])
+    submit = SubmitField('Add Achievement')
+
+class ProfileForm(FlaskForm):
+    name = StringField('Full Name', validators=[DataRequired()])
+    roll_number = StringField('Roll Number', validators=[DataRequired()])
+    room_number = StringField('Room Number', validators=[DataRequired()])
+    studying_year = SelectField('Year of Study', choices=[
+        ('1st Year', '1st Year'),
+        ('2nd Year', '2nd Year'),
+        ('3rd Year', '3rd Year'),
+        ('4th Year', '4th Year'),
+        ('Ph.D', 'Ph.D'),
+        ('M.Tech', 'M.Tech')
+    ], validators=[DataRequired()])
+    Branch = SelectField('Branch', choices=[
+        ('CSE', 'Computer Science'),
+        ('ECE', 'Electronics'),
+        ('ME', 'Mechanical'),
+        ('CE', 'Civil')
+    ], validators=[DataRequired()])
+    profile_pic_url = StringField('Profile Picture URL')
+    profile_pic_file = FileField('Upload Profile Picture', validators=[FileAllowed(IMAGE_EXTENSIONS, 'Images only.'), image_upload])
+    submit = SubmitField('Update Profile')
+
+class EventForm(FlaskForm):
+    title = StringField('Title', validators=[DataRequired()])
+    description = TextAreaField('Description', validators=[DataRequired()])
+    location = StringField('Location', validators=[DataRequired()])
+    start_datetime = DateTimeLocalField('Start Time', format='%Y-%m-%dT%H:%M', validators=[DataRequired()])
+    end_datetime = DateTimeLocalField('End Time', format='%Y-%m-%dT%H:%M', validators=[DataRequired()])
+    capacity = IntegerField('Capacity (leave empty for unlimited)', validators=[Optional(), NumberRange(min=1)])
+    image_url = StringField('Image URL')
+    image_file = FileField('Upload Image', validators=[FileAllowed(IMAGE_EXTENSIONS, 'Images only.'), image_upload])
+    submit = SubmitField('Create Event')
+
+class AdminEditProfileForm(FlaskForm):
+    roll_number = StringField('Roll Number', validators=[DataRequired()])
+    room_number = StringField('Room Number', validators=[DataRequired()])
+    studying_year = SelectField('Year of Study', choices=[
+        ('1st Year', '1st Year'),
+        ('2nd Year', '2nd Year'),
+        ('3rd Year', '3rd Year'),
+        ('4th Year', '4th Year'),
+        ('Ph.D', 'Ph.D'),
+        ('M.Tech', 'M.Tech')
+    ], validators=[DataRequired()])
+    Branch = SelectField('Branch', choices=[
+        ('CSE', 'Computer Science'),
+        ('ECE', 'Electronics'),
+        ('ME', 'Mechanical'),
+        ('CE', 'Civil')
+    ], validators=[DataRequired()])
+    profile_pic_url = StringField('Profile Picture URL')
+    profile_pic_file = FileField('Upload Profile Picture', validators=[FileAllowed(IMAGE_EXTENSIONS, 'Images only.'), image_upload])
+    role = SelectField('Role', choices=[('Student', 'Student'), ('HMC Admin', 'HMC Admin')], validators=[DataRequired()])
+    submit = SubmitField('Update Profile')
+
+class AlumniForm(FlaskForm):
+    name = StringField('Full Name', validators=[DataRequired()])
+    batch_year = StringField('Batch Year', validators=[DataRequired()])
+    current_position = StringField('Current Position', validators=[DataRequired()])
+    company = StringField('Company')
+    linkedin = StringField('LinkedIn Profile URL')
+    email = StringField('Email', validators=[Optional(), Email()])
+    achievements = TextAreaField('Achievements')
+    image_url = StringField('Profile Image URL')
+    image_file = FileField('Upload Image', validators=[FileAllowed(IMAGE_EXTENSIONS, 'Images only.'), image_upload])
+    submit = SubmitField('Save Alumni')
+
+class AddStudentForm(FlaskForm):
+    email = StringField('Student Email', validators=[DataRequired(), Email()])
+    submit = SubmitField('Add Student')
+
+    def validate_email(self, email):
+        student = UmiamStudent.query.filter_by(email=email.data.strip().lower()).first()
+        if student:
+            raise ValidationError('This email is already in the UMIAM student database.')
+
+class ImportStudentsForm(FlaskForm):
+    roster = FileField('Resident Roster (CSV or one email per line)', validators=[FileRequired()])
+    submit = SubmitField('Import Roster')
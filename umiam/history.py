@@ -0,0 +1,69 @@
+# umiam/history.py
+# The append-only complaint history behind the students' timeline. Views call
+# record_complaint_event() as they change a complaint; the events wait on the
+# session and go out as one multi-row INSERT when it commits, in the same
+# transaction as the change they describe. A bulk action that moves fifty
+# complaints therefore writes its fifty events in one statement, and an event
+# exists exactly when its change does: a rolled-back or crashed request leaves
+# neither behind. (Flushing the events later from a background thread would
+# take SQLite's write lock a second time for every click, and could lose history
+# that the change itself survived.)
+from sqlalchemy import event as sa_event
+from sqlalchemy.orm import joinedload
+
+from .analytics import ist_now
+from .extensions import db
+from .models import ComplaintEvent
+
+def init_app(app):
+    if not sa_event.contains(db.session, 'before_commit', _write_events):
+        sa_event.listen(db.session, 'before_commit', _write_events)
+        sa_event.listen(db.session, 'after_soft_rollback', _discard_events)
+
+def record_complaint_event(complaint, kind, actor_id=None, old_status=None, new_status=None, comment=None, at=None):
+    """Queue a history event for `complaint` (a Complaint, or the id of one) until the session commits."""
+    db.session.info.setdefault('complaint_events', []).append({
+        'complaint': complaint, 'kind': kind, 'actor_id': actor_id, 'old_status': old_status,
+        'new_status': new_status, 'comment': comment, 'created_at': at or ist_now(),
+    })
+
+def _write_events(session):
+    events = session.info.pop('complaint_events', None)
+    if not events:
+        return
+    # Complaints added in this transaction only get their id when flushed.
+    session.flush()
+    rows = []
+    for event in events:
+        complaint = event.pop('complaint')
+        rows.append({**event, 'complaint_id': getattr(complaint, 'id', complaint)})
+    # render_nulls keeps every row the same shape, so they share one INSERT.
+    session.execute(db.insert(ComplaintEvent).execution_options(render_nulls=True), rows)
+
+def _discard_events(session, previous_transaction):
+    if not previous_transaction.nested:
+        session.info.pop('complaint_events', None)
+
+def complaint_timelines(complaint_ids):
+    """{complaint id: [event, ...]} oldest first, with actors loaded, in one query."""
+    timelines = {complaint_id: [] for complaint_id in complaint_ids}
+    if timelines:
+        events = (ComplaintEvent.query.options(joinedload(ComplaintEvent.actor))
+                  .filter(ComplaintEvent.complaint_id.in_(timelines))
+                  .order_by(ComplaintEvent.complaint_id, ComplaintEvent.id))
+        for event in events:
+            timelines[event.complaint_id].append(event)
+    return timelines
+
+def complaint_event_backfill_statements():
+    # History for complaints filed before it was recorded: the submission, and
+    # the status they have now (timed at resolved_at when known). Actors are not
+    # known, and anonymous complaints never get one.
+    return [
+        'INSERT INTO complaint_event (complaint_id, kind, new_status, actor_id, created_at) '
+        "SELECT id, 'submitted', 'Submitted', CASE WHEN anonymous = 'no' THEN user_id END, submission_date "
+        'FROM complaint ORDER BY id',
+        'INSERT INTO complaint_event (complaint_id, kind, new_status, created_at) '
+        "SELECT id, 'status', status, coalesce(resolved_at, submission_date) FROM complaint "
+        "WHERE status != 'Submitted' ORDER BY id",
+    ]
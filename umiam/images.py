@@ -0,0 +1,178 @@
+# umiam/images.py
+# Uploads are kept as content-addressed originals outside the web root and resized
+# on a small thread pool into WebP variants, one per IMAGE_WIDTHS step below the
+# original's width. Only pixels are re-encoded, so EXIF (GPS included), XMP and
+# ICC data never reach the public files. The stored URL names the widest variant;
+# image_attrs() derives the narrower ones from it, so grids can emit srcset
+# without a lookup. A variant requested before the pool has produced it (or after
+# the worker that queued it died) is rendered on demand from the original.
+# Pillow is imported by the functions that decode images, so pages that only
+# link to them never load it.
+import hashlib
+import io
+import os
+import posixpath
+import re
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+from markupsafe import Markup
+
+from .assets import write_file
+from .models import Achievement, Alumni, Event, Facility, User
+
+IMAGE_WIDTHS = [320, 640, 960, 1440]
+IMAGE_EXTENSIONS = ['jpg', 'jpeg', 'png', 'gif', 'webp']
+IMAGE_FORMATS = {'JPEG', 'PNG', 'GIF', 'WEBP', 'MPO'}
+MEDIA_VARIANT_RE = re.compile(r'/media/[0-9a-f]{2}/(?P<digest>[0-9a-f]{20})-(?P<width>\d+)\.webp')
+# Columns that hold an image URL, with the page-cache stamp to bump when one changes.
+IMAGE_COLUMNS = [
+    (Facility, 'image_url', 'facility'),
+    (Event, 'image_url', 'event'),
+    (Achievement, 'image_url', 'achievement'),
+    (Alumni, 'image_url', 'alumni'),
+    (User, 'profile_pic_url', None),
+]
+
+image_executor = None
+
+def init_app(app):
+    global image_executor
+    app.config.setdefault('MEDIA_DIR', os.path.join(app.instance_path, 'media'))
+    app.config.setdefault('IMAGE_ORIGINALS_DIR', os.path.join(app.instance_path, 'originals'))
+    app.config.setdefault('IMAGE_WORKERS', 2)
+    app.config.setdefault('IMAGE_QUALITY', 80)
+    app.config.setdefault('IMAGE_MAX_PIXELS', 40_000_000)
+    if app.config['MAX_CONTENT_LENGTH'] is None:
+        # Flask already defines the key (as None), so setdefault() would never apply.
+        app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024
+    app.add_template_global(image_attrs)
+    if image_executor is None:
+        # The pool starts no threads until the first upload, so it is safe to create before a fork.
+        image_executor = ThreadPoolExecutor(max_workers=app.config['IMAGE_WORKERS'], thread_name_prefix='image')
+
+def variant_widths(width):
+    return [w for w in IMAGE_WIDTHS if w < width] + [min(width, IMAGE_WIDTHS[-1])]
+
+def media_url(digest, width):
+    return f'/media/{digest[:2]}/{digest}-{width}.webp'
+
+def original_path(digest):
+    return os.path.join(current_app.config['IMAGE_ORIGINALS_DIR'], digest[:2], digest)
+
+def oriented_size(image):
+    # Size as displayed: EXIF orientations 5-8 rotate the image a quarter turn.
+    from PIL import ExifTags
+
+    width, height = image.size
+    if image.getexif().get(ExifTags.Base.Orientation) in (5, 6, 7, 8):
+        width, height = height, width
+    return width, height
+
+def is_variant(digest, width):
+    """Whether `width` is one of the variants process_image() makes for this original.
+
+    Reads only the original's header, so a request for a width that will never
+    exist costs no decoding.
+    """
+    from PIL import Image
+
+    with Image.open(original_path(digest)) as image:
+        return width in variant_widths(oriented_size(image)[0])
+
+def process_image(digest):
+    """Write any missing WebP variants of a stored original."""
+    from PIL import Image, ImageOps
+
+    with Image.open(original_path(digest)) as upload:
+        image = ImageOps.exif_transpose(upload)
+        image = image.convert('RGBA' if image.has_transparency_data else 'RGB')
+        for width in variant_widths(image.width):
+            path = os.path.join(current_app.config['MEDIA_DIR'], media_url(digest, width).removeprefix('/media/'))
+            if os.path.isfile(path):
+                continue
+            variant = image if width == image.width else image.resize(
+                (width, max(1, round(image.height * width / image.width))), Image.Resampling.LANCZOS)
+            # Pillow only writes EXIF/XMP/ICC chunks that are passed to save() explicitly.
+            buffer = io.BytesIO()
+            variant.save(buffer, 'WEBP', quality=current_app.config['IMAGE_QUALITY'], method=6)
+            write_file(path, buffer.getvalue())
+
+def process_image_in_background(app, digest):
+    with app.app_context():
+        try:
+            process_image(digest)
+        except Exception:
+            app.logger.exception('Image processing failed')
+
+def check_image(stream):
+    """The displayed (width, height) of an image, read from its header.
+
+    Raises ValueError for anything that is not a reasonably sized JPEG, PNG, GIF
+    or WebP image.
+    """
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        with Image.open(stream) as image:
+            image_format = image.format
+            width, height = oriented_size(image)
+    except (UnidentifiedImageError, Image.DecompressionBombError):
+        raise ValueError('That file is not a supported image.')
+    if image_format not in IMAGE_FORMATS:
+        raise ValueError('That file is not a supported image.')
+    if width * height > current_app.config['IMAGE_MAX_PIXELS']:
+        raise ValueError('That image is too large; please upload a smaller one.')
+    return width, height
+
+def store_image(data, background=True):
+    """Keep an uploaded image and queue its variants; returns the URL to store.
+
+    Raises ValueError as check_image() does.
+    """
+    width, _ = check_image(io.BytesIO(data))
+    digest = hashlib.sha256(data).hexdigest()[:20]
+    if not os.path.isfile(original_path(digest)):
+        write_file(original_path(digest), data)
+    if background:
+        image_executor.submit(process_image_in_background, current_app._get_current_object(), digest)
+    else:
+        process_image(digest)
+    return media_url(digest, variant_widths(width)[-1])
+
+def image_upload(form, field):
+    """WTForms validator: the upload, if any, must be an image store_image() will accept."""
+    if not field.data:
+        return
+    from wtforms.validators import ValidationError
+
+    try:
+        check_image(field.data.stream)
+    except ValueError as exc:
+        raise ValidationError(str(exc))
+    finally:
+        field.data.stream.seek(0)
+
+def uploaded_image_url(field):
+    return store_image(field.data.read()) if field.data else None
+
+def image_attrs(url, sizes='100vw'):
+    """src/srcset/sizes attributes for an image URL; plain src for external ones."""
+    match = MEDIA_VARIANT_RE.fullmatch(url or '')
+    if match is None:
+        return Markup('src="%s"') % (url or '')
+    digest = match['digest']
+    widths = variant_widths(int(match['width']))
+    fallback = next((w for w in widths if w >= 640), widths[-1])
+    srcset = ', '.join(f'{media_url(digest, w)} {w}w' for w in widths)
+    return Markup('src="%s" srcset="%s" sizes="%s"') % (media_url(digest, fallback), srcset, sizes)
+
+def local_image_for(url, source):
+    # Accepts both a `wget --force-directories` mirror (host/path) and a flat folder.
+    parsed = urllib.parse.urlsplit(url)
+    path = urllib.parse.unquote(parsed.path).lstrip('/')
+    for candidate in (os.path.join(source, parsed.netloc, path), os.path.join(source, posixpath.basename(path))):
+        if os.path.isfile(candidate):
+            return candidate
+    return None
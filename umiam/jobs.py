@@ -0,0 +1,206 @@
+# umiam/jobs.py
+# A persistent work queue in the `job` table for anything too slow to do inside
+# a request, such as sending email. enqueue() adds the job to the caller's
+# session, so it exists exactly when the change that asked for it commits.
+# Worker threads claim due jobs of one kind in batches with a single
+# UPDATE ... RETURNING, so any number of them, in any number of processes, can
+# drain the same table: JOB_WORKERS threads start in each web process on its
+# first request, and `flask --app app run-jobs` runs a dedicated pool instead.
+# A failed job is retried with exponential backoff until it runs out of
+# attempts, then stays 'failed' for the admin jobs page.
+import importlib
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import event as sa_event
+
+from .extensions import db
+from .models import Job
+
+# kind: (handler as 'module:function', jobs per batch, attempts before giving up).
+# A handler gets the batch's payloads and returns one error message (or None)
+# per payload; raising fails the whole batch. Whatever a handler adds to the
+# session commits together with the batch's outcome, so handlers never commit.
+JOB_KINDS = {
+    'email': ('umiam.mail:send_email_batch', 50, 5),
+    'event_changed': ('umiam.mail:email_event_registrants', 1, 3),
+}
+
+_wakeup = threading.Event()
+_pool_lock = threading.Lock()
+_pool = []
+
+def init_app(app):
+    app.config.setdefault('JOB_WORKERS', 2)             # threads per web process; 0 leaves jobs to `flask run-jobs`
+    app.config.setdefault('JOB_POLL_INTERVAL', 2)       # seconds an idle worker waits before looking again
+    app.config.setdefault('JOB_LEASE_SECONDS', 300)     # a claimed job still running after this is handed out again
+    app.config.setdefault('JOB_RETRY_DELAY', 30)        # seconds before the first retry, doubling on each one
+    app.config.setdefault('JOB_RETRY_MAX_DELAY', 3600)
+    app.config.setdefault('JOB_RETENTION_DAYS', 7)      # finished jobs are deleted after this
+    if app.config['JOB_WORKERS']:
+        app.before_request(ensure_job_workers)
+    if not sa_event.contains(db.session, 'after_commit', _wake_workers):
+        sa_event.listen(db.session, 'after_commit', _wake_workers)
+
+def enqueue(kind, payload, delay=0):
+    job = Job(kind=kind, payload=json.dumps(payload), max_attempts=JOB_KINDS[kind][2],
+              run_after=datetime.utcnow() + timedelta(seconds=delay))
+    db.session.add(job)
+    db.session.info['jobs_enqueued'] = True
+    return job
+
+def enqueue_many(kind, payloads):
+    # One executemany for fan-outs that queue a job per recipient.
+    now = datetime.utcnow()
+    rows = [{'kind': kind, 'payload': json.dumps(payload), 'max_attempts': JOB_KINDS[kind][2], 'run_after': now}
+            for payload in payloads]
+    if rows:
+        db.session.execute(db.insert(Job), rows)
+        db.session.info['jobs_enqueued'] = True
+    return len(rows)
+
+def _wake_workers(session):
+    # Idle workers in this process pick new jobs up as soon as they are committed.
+    if session.info.pop('jobs_enqueued', False):
+        _wakeup.set()
+
+def resolve_handler(kind):
+    module_name, _, function_name = JOB_KINDS[kind][0].partition(':')
+    return getattr(importlib.import_module(module_name), function_name)
+
+def retry_delay(attempts):
+    delay = min(current_app.config['JOB_RETRY_DELAY'] * 2 ** (attempts - 1), current_app.config['JOB_RETRY_MAX_DELAY'])
+    # Jitter keeps a batch that failed together from retrying in lockstep.
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+def claim_jobs():
+    """Mark the next due batch as running and return (kind, rows), or (None, [])."""
+    now = datetime.utcnow()
+    due = db.select(Job.kind).where(Job.status == 'queued', Job.run_after <= now)
+    # A read first, so an idle poll never takes SQLite's write lock.
+    kind = db.session.execute(due.order_by(Job.run_after, Job.id).limit(1)).scalar()
+    if kind is None:
+        db.session.rollback()
+        return None, []
+    batch_size = JOB_KINDS[kind][1] if kind in JOB_KINDS else 100
+    batch = (db.select(Job.id).where(Job.status == 'queued', Job.kind == kind, Job.run_after <= now)
+             .order_by(Job.run_after, Job.id).limit(batch_size))
+    rows = db.session.execute(
+        db.update(Job)
+        .where(Job.id.in_(batch), Job.status == 'queued')
+        .values(status='running', attempts=Job.attempts + 1, locked_at=now)
+        .returning(Job.id, Job.payload, Job.attempts, Job.max_attempts)
+    ).all()
+    db.session.commit()
+    return kind, sorted(rows)
+
+def finish_jobs(rows, errors):
+    now = datetime.utcnow()
+    done = [row.id for row, error in zip(rows, errors) if error is None]
+    if done:
+        db.session.execute(db.update(Job).where(Job.id.in_(done))
+                           .values(status='done', finished_at=now, locked_at=None, last_error=None))
+    for row, error in zip(rows, errors):
+        if error is None:
+            continue
+        if row.attempts >= row.max_attempts:
+            values = {'status': 'failed', 'finished_at': now}
+        else:
+            values = {'status': 'queued', 'run_after': now + retry_delay(row.attempts)}
+        db.session.execute(db.update(Job).where(Job.id == row.id)
+                           .values(locked_at=None, last_error=str(error)[:2000], **values))
+    db.session.commit()
+
+def run_due_jobs():
+    """Claim and run one batch; returns how many jobs it handled."""
+    kind, rows = claim_jobs()
+    if not rows:
+        return 0
+    try:
+        handler = resolve_handler(kind)
+        errors = handler([json.loads(row.payload) for row in rows]) or [None] * len(rows)
+    except Exception as exc:
+        current_app.logger.exception('%s batch of %d job(s) failed', kind, len(rows))
+        db.session.rollback()
+        errors = [f'{type(exc).__name__}: {exc}'] * len(rows)
+    finish_jobs(rows, errors)
+    return len(rows)
+
+def expire_jobs():
+    # Jobs whose worker died mid-batch go back on the queue (the claim already
+    # counted as an attempt), and old finished jobs are cleared out.
+    now = datetime.utcnow()
+    stale = [Job.status == 'running', Job.locked_at < now - timedelta(seconds=current_app.config['JOB_LEASE_SECONDS'])]
+    error = 'Lease expired before the job finished'
+    db.session.execute(db.update(Job).where(*stale, Job.attempts >= Job.max_attempts)
+                       .values(status='failed', finished_at=now, locked_at=None, last_error=error))
+    db.session.execute(db.update(Job).where(*stale)
+                       .values(status='queued', run_after=now, locked_at=None, last_error=error))
+    db.session.execute(db.delete(Job).where(
+        Job.status == 'done', Job.finished_at < now - timedelta(days=current_app.config['JOB_RETENTION_DAYS'])))
+    db.session.commit()
+
+def work(app, stop=None, burst=False):
+    """Worker loop: run batches until `stop` is set, or until nothing is due when `burst`."""
+    with app.app_context():
+        next_expiry = 0
+        while stop is None or not stop.is_set():
+            try:
+                if time.monotonic() >= next_expiry:
+                    expire_jobs()
+                    next_expiry = time.monotonic() + app.config['JOB_LEASE_SECONDS'] / 2
+                handled = run_due_jobs()
+            except Exception:
+                app.logger.exception('Job worker failed')
+                db.session.rollback()
+                handled = 0
+            if handled:
+                continue
+            if burst:
+                return
+            _wakeup.wait(app.config['JOB_POLL_INTERVAL'])
+            _wakeup.clear()
+
+def ensure_job_workers():
+    # Started from the first request rather than create_app(), so a preloading
+    # server forks its workers before any of these threads exist.
+    if _pool:
+        return
+    with _pool_lock:
+        if not _pool:
+            app = current_app._get_current_object()
+            for index in range(app.config['JOB_WORKERS']):
+                thread = threading.Thread(target=work, args=(app,), name=f'job-worker-{index}', daemon=True)
+                thread.start()
+                _pool.append(thread)
+
+def retry_failed_jobs(job_id=None):
+    # Failed jobs start over with a full set of attempts; returns how many.
+    query = db.update(Job).where(Job.status == 'failed')
+    if job_id is not None:
+        query = query.where(Job.id == job_id)
+    retried = db.session.execute(query.values(status='queued', attempts=0, run_after=datetime.utcnow(),
+                                              finished_at=None)).rowcount
+    db.session.info['jobs_enqueued'] = True
+    return retried
+
+def queue_summary():
+    """Per-kind counts for the admin jobs page."""
+    now = datetime.utcnow()
+    rows = (db.session.query(Job.kind, Job.status, db.func.count(),
+                             db.func.sum(db.case((Job.run_after <= now, 1), else_=0)),
+                             db.func.min(db.case((Job.run_after <= now, Job.run_after))))
+            .group_by(Job.kind, Job.status).all())
+    summary = {}
+    for kind, status, count, due, oldest_due in rows:
+        entry = summary.setdefault(kind, {'queued': 0, 'due': 0, 'running': 0, 'done': 0, 'failed': 0,
+                                          'oldest_due': None})
+        entry[status] = count
+        if status == 'queued':
+            entry['due'] = due or 0
+            entry['oldest_due'] = oldest_due
+    return summary
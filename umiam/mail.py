@@ -0,0 +1,142 @@
+# umiam/mail.py
+# Outgoing email. Views render a message and queue it as an 'email' job (see
+# umiam/jobs.py), so the admin's click never waits on an SMTP server;
+# send_email_batch() then delivers a whole batch over one connection. For local
+# development `flask --app app smtp-sink` runs SMTPSink, a stand-in server that
+# prints whatever it receives, and MAIL_PORT=8025 points the app at it.
+import smtplib
+import socketserver
+import threading
+from email.message import EmailMessage
+
+from flask import current_app, render_template
+
+from .extensions import db
+from .jobs import enqueue, enqueue_many
+from .models import Event, EventRegistration, User
+
+def init_app(app):
+    app.config.setdefault('MAIL_SERVER', 'localhost')
+    app.config.setdefault('MAIL_PORT', 25)
+    app.config.setdefault('MAIL_USE_TLS', False)        # STARTTLS after connecting
+    app.config.setdefault('MAIL_USERNAME', None)
+    app.config.setdefault('MAIL_PASSWORD', None)
+    app.config.setdefault('MAIL_DEFAULT_SENDER', 'UMIAM Hostel <noreply@iitg.ac.in>')
+    app.config.setdefault('MAIL_TIMEOUT', 10)           # seconds per SMTP operation
+
+def email_payload(to, template, **context):
+    # Templates live in templates/email/: the first line is the subject, the rest the body.
+    subject, _, body = render_template(f'email/{template}.txt', **context).lstrip().partition('\n')
+    return {'to': to, 'subject': subject.strip(), 'body': body.strip() + '\n'}
+
+def queue_email(to, template, **context):
+    return enqueue('email', email_payload(to, template, **context))
+
+def send_email_batch(payloads):
+    """'email' job handler: send every message over a single SMTP connection."""
+    config = current_app.config
+    errors = []
+    with smtplib.SMTP(config['MAIL_SERVER'], config['MAIL_PORT'], timeout=config['MAIL_TIMEOUT']) as smtp:
+        if config['MAIL_USE_TLS']:
+            smtp.starttls()
+        if config['MAIL_USERNAME']:
+            smtp.login(config['MAIL_USERNAME'], config['MAIL_PASSWORD'])
+        for index, payload in enumerate(payloads):
+            message = EmailMessage()
+            message['From'] = config['MAIL_DEFAULT_SENDER']
+            message['To'] = payload['to']
+            message['Subject'] = payload['subject']
+            message.set_content(payload['body'])
+            try:
+                smtp.send_message(message)
+            except smtplib.SMTPServerDisconnected as exc:
+                # Everything not yet sent goes back for a retry.
+                errors.extend([f'SMTPServerDisconnected: {exc}'] * (len(payloads) - index))
+                break
+            except smtplib.SMTPException as exc:
+                errors.append(f'{type(exc).__name__}: {exc}')
+            else:
+                errors.append(None)
+    return errors
+
+def queue_seat_confirmed_emails(event, user_ids):
+    # Residents promoted off an event's waitlist.
+    for user in User.query.filter(User.id.in_(user_ids)):
+        queue_email(user.email, 'event_seat_confirmed', user=user, event=event)
+
+def email_event_registrants(payloads):
+    """'event_changed' job handler: queue one email per registrant of each changed event.
+
+    The emails are left uncommitted, to go out with the job's own completion:
+    a run that fails part way queues none of them, so its retry sends no duplicates.
+    """
+    for payload in payloads:
+        event = db.session.get(Event, payload['event_id'])
+        if event is None:
+            continue
+        registrants = (db.session.query(User.email, User.name, EventRegistration.status)
+                       .join(EventRegistration, EventRegistration.user_id == User.id)
+                       .filter(EventRegistration.event_id == event.id))
+        enqueue_many('email', (
+            email_payload(email, 'event_changed', name=name, status=status, event=event,
+                          old_start=payload['old_start'], old_end=payload['old_end'])
+            for email, name, status in registrants
+        ))
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    """Just enough of an SMTP server to accept and keep messages, for development and tests.
+
+    Received messages are appended to `messages` as (sender, recipients, data)
+    and passed to `on_message` when one is given.
+    """
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address=('127.0.0.1', 8025), on_message=None):
+        self.messages = []
+        self.on_message = on_message
+        self.lock = threading.Lock()
+        super().__init__(address, _SMTPSinkHandler)
+
+class _SMTPSinkHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode('ascii') + b'\r\n')
+
+    def handle(self):
+        self.reply('220 umiam smtp sink ready')
+        sender, recipients = None, []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode('utf-8', 'replace').strip()
+            verb = command[:4].upper()
+            if verb in ('HELO', 'EHLO'):
+                self.reply('250 umiam')
+            elif verb == 'MAIL':
+                sender, recipients = command.partition(':')[2].strip(), []
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                recipients.append(command.partition(':')[2].strip())
+                self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                lines = []
+                while (data_line := self.rfile.readline()) not in (b'.\r\n', b'.\n', b''):
+                    lines.append(data_line[1:] if data_line.startswith(b'..') else data_line)
+                message = (sender, recipients, b''.join(lines))
+                with self.server.lock:
+                    self.server.messages.append(message)
+                if self.server.on_message:
+                    self.server.on_message(*message)
+                self.reply('250 OK')
+            elif verb == 'RSET':
+                sender, recipients = None, []
+                self.reply('250 OK')
+            elif verb == 'NOOP':
+                self.reply('250 OK')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
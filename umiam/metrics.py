@@ -0,0 +1,179 @@
+# umiam/metrics.py
+# Engine and template signals feed per-request counters (query count, SQL time,
+# render time) that are folded into per-endpoint histograms after each request and
+# exposed in Prometheus text format at /metrics. A statement executed
+# REPEATED_STATEMENT_THRESHOLD times or more within one request is logged as a
+# likely N+1 and counted. The per-query work is a clock read and a dict
+# increment, so this stays on in production; REQUEST_METRICS_HEADER adds a
+# Server-Timing header to every response for debugging in the browser.
+import bisect
+import copy
+import threading
+import time
+from collections import Counter, defaultdict
+
+from flask import before_render_template, current_app, request, template_rendered
+from sqlalchemy import event as sa_event
+
+from .auth import user_cache
+from .cache import page_cache
+from .extensions import db
+from .ratelimit import throttled
+
+METRIC_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+class Histogram:
+    __slots__ = ('buckets', 'count', 'total')
+
+    def __init__(self):
+        self.buckets = [0] * (len(METRIC_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value):
+        self.buckets[bisect.bisect_left(METRIC_BUCKETS, value)] += 1
+        self.count += 1
+        self.total += value
+
+class EndpointMetrics:
+    __slots__ = ('duration', 'sql', 'render', 'queries', 'repeated_statements')
+
+    def __init__(self):
+        self.duration = Histogram()
+        self.sql = Histogram()
+        self.render = Histogram()
+        self.queries = 0
+        self.repeated_statements = 0
+
+endpoint_metrics = defaultdict(EndpointMetrics)
+_endpoint_metrics_lock = threading.Lock()
+_request_metrics = threading.local()
+
+class RequestMetrics:
+    __slots__ = ('started', 'query_started', 'queries', 'sql_time', 'render_started', 'render_time', 'statements')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.query_started = 0.0
+        self.queries = 0
+        self.sql_time = 0.0
+        self.render_started = 0.0
+        self.render_time = 0.0
+        self.statements = Counter()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    metrics = getattr(_request_metrics, 'current', None)
+    if metrics is not None:
+        metrics.query_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    metrics = getattr(_request_metrics, 'current', None)
+    if metrics is not None:
+        metrics.sql_time += time.perf_counter() - metrics.query_started
+        metrics.queries += 1
+        metrics.statements[statement] += 1
+
+def _before_render_template(sender, template, context, **extra):
+    metrics = getattr(_request_metrics, 'current', None)
+    if metrics is not None:
+        metrics.render_started = time.perf_counter()
+
+def _template_rendered(sender, template, context, **extra):
+    metrics = getattr(_request_metrics, 'current', None)
+    if metrics is not None:
+        metrics.render_time += time.perf_counter() - metrics.render_started
+
+def init_app(app):
+    app.config.setdefault('REQUEST_METRICS_ENABLED', True)
+    app.config.setdefault('REQUEST_METRICS_HEADER', False)
+    app.config.setdefault('REPEATED_STATEMENT_THRESHOLD', 5)
+    app.config.setdefault('METRICS_TOKEN', None)  # bearer token for scrapers; admins can always read /metrics
+    if not app.config['REQUEST_METRICS_ENABLED']:
+        return
+    with app.app_context():
+        sa_event.listen(db.engine, 'before_cursor_execute', _before_cursor_execute)
+        sa_event.listen(db.engine, 'after_cursor_execute', _after_cursor_execute)
+    before_render_template.connect(_before_render_template, app)
+    template_rendered.connect(_template_rendered, app)
+    app.before_request(start_request_metrics)
+    app.after_request(record_request_metrics)
+
+def start_request_metrics():
+    _request_metrics.current = RequestMetrics()
+
+def record_request_metrics(response):
+    metrics = getattr(_request_metrics, 'current', None)
+    if metrics is None:
+        return response
+    _request_metrics.current = None
+    duration = time.perf_counter() - metrics.started
+    endpoint = request.endpoint or 'unmatched'
+    threshold = current_app.config['REPEATED_STATEMENT_THRESHOLD']
+    repeated = [(statement, count) for statement, count in metrics.statements.items() if count >= threshold]
+    for statement, count in repeated:
+        current_app.logger.warning('Possible N+1 in %s: statement ran %d times: %s',
+                                   endpoint, count, ' '.join(statement.split())[:200])
+    with _endpoint_metrics_lock:
+        stats = endpoint_metrics[endpoint]
+        stats.duration.observe(duration)
+        stats.sql.observe(metrics.sql_time)
+        stats.render.observe(metrics.render_time)
+        stats.queries += metrics.queries
+        stats.repeated_statements += len(repeated)
+    if current_app.config['REQUEST_METRICS_HEADER']:
+        response.headers['Server-Timing'] = (
+            f'db;dur={metrics.sql_time * 1000:.2f};desc="{metrics.queries} queries", '
+            f'render;dur={metrics.render_time * 1000:.2f}, total;dur={duration * 1000:.2f}'
+        )
+    return response
+
+def render_metrics():
+    lines = []
+
+    def histogram(name, help_text, attribute):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} histogram')
+        for endpoint, stats in snapshot:
+            observed = getattr(stats, attribute)
+            cumulative = 0
+            for bound, bucket in zip(METRIC_BUCKETS + (float('inf'),), observed.buckets):
+                cumulative += bucket
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{name}_bucket{{endpoint="{endpoint}",le="{le}"}} {cumulative}')
+            lines.append(f'{name}_sum{{endpoint="{endpoint}"}} {observed.total:.6f}')
+            lines.append(f'{name}_count{{endpoint="{endpoint}"}} {observed.count}')
+
+    def counter(name, help_text, values):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} counter')
+        for labels, value in values:
+            lines.append(f'{name}{{{labels}}} {value}' if labels else f'{name} {value}')
+
+    def gauge(name, help_text, value):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} gauge')
+        lines.append(f'{name} {value}')
+
+    with _endpoint_metrics_lock:
+        snapshot = [(endpoint, copy.deepcopy(stats)) for endpoint, stats in sorted(endpoint_metrics.items())]
+    histogram('umiam_request_duration_seconds', 'Time spent handling the request.', 'duration')
+    histogram('umiam_request_sql_seconds', 'Time spent executing SQL per request.', 'sql')
+    histogram('umiam_request_render_seconds', 'Time spent rendering templates per request.', 'render')
+    counter('umiam_sql_queries_total', 'SQL statements executed.',
+            [(f'endpoint="{endpoint}"', stats.queries) for endpoint, stats in snapshot])
+    counter('umiam_repeated_statements_total', 'Statements repeated often enough in one request to suggest an N+1.',
+            [(f'endpoint="{endpoint}"', stats.repeated_statements) for endpoint, stats in snapshot])
+    caches = [('user', user_cache.stats()), ('page', page_cache.stats())]
+    counter('umiam_cache_hits_total', 'In-process cache hits.', [(f'cache="{name}"', s['hits']) for name, s in caches])
+    counter('umiam_cache_misses_total', 'In-process cache misses.', [(f'cache="{name}"', s['misses']) for name, s in caches])
+    hashing = current_app.extensions['password_hasher'].stats()
+    gauge('umiam_password_hash_pending', 'Password hashes queued or running.', hashing['pending'])
+    counter('umiam_password_hashes_total', 'Password hashes by outcome; rejected ones found the queue full.',
+            [('outcome="completed"', hashing['completed']), ('outcome="rejected"', hashing['rejected'])])
+    counter('umiam_password_hash_queue_seconds_total', 'Time password hashes spent waiting for a worker.',
+            [('', f"{hashing['queue_seconds']:.6f}")])
+    counter('umiam_password_hash_seconds_total', 'Time spent computing password hashes.',
+            [('', f"{hashing['hash_seconds']:.6f}")])
+    counter('umiam_login_throttled_total', 'Sign-in attempts refused by the rate limiter.',
+            [(f'scope="{scope}"', throttled[scope]) for scope in ('ip', 'email')])
+    return '\n'.join(lines) + '\n'
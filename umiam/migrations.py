@@ -0,0 +1,129 @@
+# umiam/migrations.py
+# db.create_all() only creates missing tables, so schema changes to existing tables
+# (new indexes, constraints) are applied here as numbered steps. The applied
+# version is stored in SQLite's PRAGMA user_version; run
+# `flask --app app migrate-db` after pulling changes that add a step.
+from .alumni import ALUMNI_PER_PAGE, alumni_facet_statements
+from .analytics import complaint_rollup_statements
+from .directory import USERS_PER_PAGE, user_directory_query, user_facet_query
+from .extensions import db
+from .history import complaint_event_backfill_statements
+from .registrations import EVENT_COUNTERS_SQL
+from .models import (COMPLAINTS_PER_PAGE, Alumni, Announcement, Complaint, ComplaintEvent, Event, EventRegistration,
+                     Notice, User)
+from .search import search_backfill_statements, search_index_statements
+
+def add_column(table, column, definition):
+    # SQLite has no ADD COLUMN IF NOT EXISTS, and db.create_all() already gives a
+    # brand-new table every column, so this step checks first.
+    def apply(conn):
+        columns = {row[1] for row in conn.exec_driver_sql(f'PRAGMA table_info({table})')}
+        if column not in columns:
+            conn.exec_driver_sql(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+    return apply
+
+MIGRATIONS = [
+    (1, 'Indexes for hot lookups and unique event registrations', [
+        'CREATE INDEX IF NOT EXISTS ix_complaint_submission_date_id ON complaint (submission_date, id)',
+        'CREATE INDEX IF NOT EXISTS ix_complaint_category_submission_date_id ON complaint (category, submission_date, id)',
+        'CREATE INDEX IF NOT EXISTS ix_complaint_status_submission_date_id ON complaint (status, submission_date, id)',
+        'CREATE INDEX IF NOT EXISTS ix_complaint_user_id_submission_date ON complaint (user_id, submission_date)',
+        'CREATE INDEX IF NOT EXISTS ix_notice_created_at ON notice (created_at)',
+        'CREATE INDEX IF NOT EXISTS ix_announcement_date_posted ON announcement (date_posted)',
+        'CREATE INDEX IF NOT EXISTS ix_event_start_datetime ON event (start_datetime)',
+        'CREATE INDEX IF NOT EXISTS ix_user_role ON user (role)',
+        'CREATE INDEX IF NOT EXISTS ix_event_registration_user_id ON event_registration (user_id)',
+        # Double submissions left duplicate registrations behind; keep the earliest.
+        'DELETE FROM event_registration WHERE id NOT IN '
+        '(SELECT MIN(id) FROM event_registration GROUP BY event_id, user_id)',
+        'CREATE UNIQUE INDEX IF NOT EXISTS uq_event_registration_event_user ON event_registration (event_id, user_id)',
+    ]),
+    (2, 'Seed change stamps for cached public pages', [
+        "INSERT OR IGNORE INTO change_stamp (name, version, changed_at) VALUES "
+        "('notice', 1, CURRENT_TIMESTAMP), ('facility', 1, CURRENT_TIMESTAMP), "
+        "('achievement', 1, CURRENT_TIMESTAMP), ('alumni', 1, CURRENT_TIMESTAMP)",
+    ]),
+    (3, 'Full-text search index and sync triggers', search_index_statements() + search_backfill_statements()),
+    (4, 'Complaint resolution times and analytics rollups',
+     [add_column('complaint', 'resolved_at', 'DATETIME')] + complaint_rollup_statements()),
+    (5, 'Event capacity, seat counters and waitlists', [
+        add_column('event', 'capacity', 'INTEGER'),
+        add_column('event', 'seats_taken', "INTEGER NOT NULL DEFAULT '0'"),
+        add_column('event', 'waitlist_size', "INTEGER NOT NULL DEFAULT '0'"),
+        add_column('event_registration', 'status', "VARCHAR(20) NOT NULL DEFAULT 'registered'"),
+        'CREATE INDEX IF NOT EXISTS ix_event_registration_event_status_date '
+        'ON event_registration (event_id, status, registration_date, id)',
+        EVENT_COUNTERS_SQL,
+    ]),
+    (6, 'Sort and filter indexes for the admin user directory', [
+        "CREATE INDEX IF NOT EXISTS ix_user_name_sort ON user (ifnull(name, '') COLLATE NOCASE, id)",
+        "CREATE INDEX IF NOT EXISTS ix_user_roll_number_sort ON user (ifnull(roll_number, '') COLLATE NOCASE, id)",
+        "CREATE INDEX IF NOT EXISTS ix_user_room_number_sort ON user (ifnull(room_number, '') COLLATE NOCASE, id)",
+        'CREATE INDEX IF NOT EXISTS ix_user_role_year_branch ON user (role, studying_year, Branch)',
+    ]),
+    (7, 'Alumni browse indexes and facet counts', [
+        'CREATE INDEX IF NOT EXISTS ix_alumni_batch_year_id ON alumni (batch_year, id)',
+        'CREATE INDEX IF NOT EXISTS ix_alumni_company_batch_year_id ON alumni (company, batch_year, id)',
+        'CREATE INDEX IF NOT EXISTS ix_alumni_current_position_batch_year_id '
+        'ON alumni (current_position, batch_year, id)',
+    ] + alumni_facet_statements()),
+    (8, 'Change stamps for announcements and events (JSON API)', [
+        "INSERT OR IGNORE INTO change_stamp (name, version, changed_at) VALUES "
+        "('announcement', 1, CURRENT_TIMESTAMP), ('event', 1, CURRENT_TIMESTAMP)",
+    ]),
+    (9, 'Complaint history', [
+        'CREATE INDEX IF NOT EXISTS ix_complaint_event_complaint_id_id ON complaint_event (complaint_id, id)',
+    ] + complaint_event_backfill_statements()),
+]
+
+def get_schema_version(conn):
+    return conn.exec_driver_sql('PRAGMA user_version').scalar()
+
+def migrate_db():
+    db.create_all()
+    applied = []
+    with db.engine.begin() as conn:
+        current = get_schema_version(conn)
+        for version, description, statements in MIGRATIONS:
+            if version <= current:
+                continue
+            for statement in statements:
+                if callable(statement):
+                    statement(conn)
+                else:
+                    conn.exec_driver_sql(statement)
+            conn.exec_driver_sql(f'PRAGMA user_version = {version}')
+            applied.append((version, description))
+    return applied
+
+# Representative query for each hot route, used to confirm the indexes above are picked up.
+HOT_QUERIES = {
+    'home': lambda: Notice.query.order_by(Notice.created_at.desc()).limit(5),
+    'dashboard': lambda: Announcement.query.order_by(Announcement.date_posted.desc()).limit(5),
+    'events': lambda: Event.query.order_by(Event.start_datetime),
+    'events (registered ids)': lambda: db.session.query(EventRegistration.event_id).filter_by(user_id=1),
+    'my_complaints': lambda: Complaint.query.filter_by(user_id=1).order_by(Complaint.submission_date.desc()),
+    'my_complaints (timeline)': lambda: ComplaintEvent.query.filter_by(complaint_id=1)
+        .order_by(ComplaintEvent.complaint_id, ComplaintEvent.id),
+    'admin_complaints': lambda: Complaint.query.filter_by(category='Internet')
+        .order_by(Complaint.submission_date.desc(), Complaint.id.desc()).limit(COMPLAINTS_PER_PAGE + 1),
+    'register_event': lambda: EventRegistration.query.filter_by(event_id=1, user_id=1),
+    'register_event (waitlist promotion)': lambda: EventRegistration.query.filter_by(event_id=1, status='waitlisted')
+        .order_by(EventRegistration.registration_date, EventRegistration.id).limit(1),
+    'view_event_registrations': lambda: EventRegistration.query.filter_by(event_id=1)
+        .order_by(EventRegistration.status, EventRegistration.registration_date, EventRegistration.id),
+    'rebuild-stats (students)': lambda: User.query.filter_by(role='Student'),
+    'manage_users': lambda: user_directory_query({'role': 'Student'}, sort='name', cursor=('M', 1))
+        .limit(USERS_PER_PAGE + 1),
+    'manage_users (search)': lambda: user_directory_query({}, search='ra', sort='id').limit(USERS_PER_PAGE + 1),
+    'manage_users (filter counts)': lambda: user_facet_query(),
+    'alumni': lambda: Alumni.query.filter_by(company='Google')
+        .filter(db.tuple_(Alumni.batch_year, Alumni.id) < ('2020', 1))
+        .order_by(Alumni.batch_year.desc(), Alumni.id.desc()).limit(ALUMNI_PER_PAGE + 1),
+}
+
+def explain_query(query):
+    compiled = query.statement.compile(dialect=db.engine.dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    rows = db.session.connection().exec_driver_sql('EXPLAIN QUERY PLAN ' + str(compiled), params)
+    return [row[-1] for row in rows]
@@ -0,0 +1,227 @@
+# umiam/models.py
+from datetime import datetime
+
+from flask_login import UserMixin
+
+from .extensions import db
+
+COMPLAINT_CATEGORIES = ['Maintenance', 'Mess/Food', 'Security', 'Internet', 'Other']
+COMPLAINT_STATUSES = ['Submitted', 'Under Review', 'In Progress', 'Resolved', 'Closed']
+COMPLAINTS_PER_PAGE = 25
+
+class User(UserMixin, db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(80), unique=True, nullable=False)
+    email = db.Column(db.String(120), unique=True, nullable=False)
+    password_hash = db.Column(db.String(128), nullable=False)
+    role = db.Column(db.String(50), nullable=False, default='Student', index=True)
+    # Updated columns to match schema
+    name = db.Column(db.Text)
+    roll_number = db.Column(db.Text)
+    room_number = db.Column(db.Text)
+    studying_year = db.Column(db.Text)  # Changed from Numeric to Text
+    Branch = db.Column(db.Text)
+    profile_pic_url = db.Column(db.Text)
+    # ...existing relationships...
+
+    # The admin directory (umiam/directory.py) pages through users by one of these
+    # sort keys plus id and counts its filters over (role, studying_year, Branch).
+    __table_args__ = (
+        db.Index('ix_user_name_sort', db.func.ifnull(name, db.literal_column("''")).collate('NOCASE'), id),
+        db.Index('ix_user_roll_number_sort', db.func.ifnull(roll_number, db.literal_column("''")).collate('NOCASE'), id),
+        db.Index('ix_user_room_number_sort', db.func.ifnull(room_number, db.literal_column("''")).collate('NOCASE'), id),
+        db.Index('ix_user_role_year_branch', 'role', 'studying_year', 'Branch'),
+    )
+
+class UmiamStudent(db.Model):
+    __tablename__ = 'umiam_students'
+    email = db.Column(db.String(120), primary_key=True)
+
+class Announcement(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(150), nullable=False)
+    content = db.Column(db.Text, nullable=False)
+    date_posted = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    author = db.relationship('User', backref='announcements')
+
+class Complaint(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    category = db.Column(db.String(100), nullable=False)
+    details = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(50), nullable=False, default='Submitted')
+    submission_date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    complainant = db.relationship('User', backref='complaints') # Corrected relationship
+    anonymous = db.Column(db.String(3), nullable=False, default='no')  # Add this line
+    comments = db.Column(db.Text, nullable=True)  # Add this line
+    # When the complaint last left the open backlog (Resolved or Closed), IST like
+    # submission_date; cleared again if it is reopened.
+    resolved_at = db.Column(db.DateTime, nullable=True)
+
+    # Keyset pagination of the admin queue walks (submission_date, id) newest first,
+    # optionally narrowed by category or status.
+    __table_args__ = (
+        db.Index('ix_complaint_submission_date_id', 'submission_date', 'id'),
+        db.Index('ix_complaint_category_submission_date_id', 'category', 'submission_date', 'id'),
+        db.Index('ix_complaint_status_submission_date_id', 'status', 'submission_date', 'id'),
+        db.Index('ix_complaint_user_id_submission_date', 'user_id', 'submission_date'),
+    )
+
+class ComplaintEvent(db.Model):
+    # Append-only history of a complaint (see umiam/history.py): its submission,
+    # each status change and each admin comment, in id order.
+    __tablename__ = 'complaint_event'
+    id = db.Column(db.Integer, primary_key=True)
+    complaint_id = db.Column(db.Integer, db.ForeignKey('complaint.id'), nullable=False)
+    kind = db.Column(db.String(20), nullable=False)  # submitted, status or comment
+    old_status = db.Column(db.String(50))
+    new_status = db.Column(db.String(50))
+    comment = db.Column(db.Text)
+    actor_id = db.Column(db.Integer, db.ForeignKey('user.id'))  # None for anonymous submissions
+    actor = db.relationship('User')
+    created_at = db.Column(db.DateTime, nullable=False)  # IST, like Complaint.submission_date
+
+    __table_args__ = (
+        db.Index('ix_complaint_event_complaint_id_id', 'complaint_id', 'id'),
+    )
+
+class Facility(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    description = db.Column(db.Text, nullable=False)
+    location = db.Column(db.String(100), nullable=False)
+    availability = db.Column(db.String(50), nullable=False)
+    image_url = db.Column(db.String(200))
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+class Achievement(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(100), nullable=False)
+    description = db.Column(db.Text, nullable=False)
+    year = db.Column(db.String(4), nullable=False)
+    category = db.Column(db.String(50), nullable=False)
+    image_url = db.Column(db.String(200))
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+class Notice(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    message = db.Column(db.String(200), nullable=False)
+    priority = db.Column(db.String(20), default='Normal')  # Normal, Important, Urgent
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+class Alumni(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    batch_year = db.Column(db.String(4), nullable=False)
+    current_position = db.Column(db.String(100))
+    company = db.Column(db.String(100))
+    linkedin = db.Column(db.String(200))
+    email = db.Column(db.String(120))
+    achievements = db.Column(db.Text)
+    image_url = db.Column(db.String(200))
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    # The alumni browser pages newest batch first, optionally narrowed to one
+    # company or position.
+    __table_args__ = (
+        db.Index('ix_alumni_batch_year_id', 'batch_year', 'id'),
+        db.Index('ix_alumni_company_batch_year_id', 'company', 'batch_year', 'id'),
+        db.Index('ix_alumni_current_position_batch_year_id', 'current_position', 'batch_year', 'id'),
+    )
+
+class Event(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(150), nullable=False)
+    description = db.Column(db.Text, nullable=False)
+    location = db.Column(db.String(100), nullable=False)
+    start_datetime = db.Column(db.DateTime, nullable=False, index=True)
+    end_datetime = db.Column(db.DateTime, nullable=False)
+    image_url = db.Column(db.String(200))
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # Seats on offer (None means unlimited) and counters kept by umiam/registrations.py.
+    capacity = db.Column(db.Integer, nullable=True)
+    seats_taken = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    waitlist_size = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+class EventRegistration(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    event_id = db.Column(db.Integer, db.ForeignKey('event.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    registration_date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    status = db.Column(db.String(20), nullable=False, default='registered', server_default='registered')
+
+    event = db.relationship('Event', backref='registrations')
+    user = db.relationship('User', backref='event_registrations')
+
+    # Declared as a named unique index (not a UniqueConstraint) so fresh databases
+    # and migrated ones end up with exactly the same schema object.
+    __table_args__ = (
+        db.Index('uq_event_registration_event_user', 'event_id', 'user_id', unique=True),
+        # Waitlist promotion and the registrations list walk an event's rows in sign-up order.
+        db.Index('ix_event_registration_event_status_date', 'event_id', 'status', 'registration_date', 'id'),
+    )
+
+class StatCounter(db.Model):
+    __tablename__ = 'stat_counter'
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+class AlumniFacet(db.Model):
+    # How many alumni have each batch year, company and position (see umiam/alumni.py).
+    __tablename__ = 'alumni_facet'
+    facet = db.Column(db.String(20), primary_key=True)
+    value = db.Column(db.String(100), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+class ChangeStamp(db.Model):
+    # One row per table whose changes invalidate cached pages.
+    __tablename__ = 'change_stamp'
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=1)
+    changed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+class Job(db.Model):
+    # Background work queued and run by umiam/jobs.py.
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.Text, nullable=False)  # JSON
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, done or failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    run_after = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    # Workers look for the oldest due job with status = 'queued'.
+    __table_args__ = (
+        db.Index('ix_job_status_run_after_id', 'status', 'run_after', 'id'),
+    )
+
+# Complaint analytics rollups, maintained by umiam/analytics.py.
+class ComplaintDailyStat(db.Model):
+    __tablename__ = 'complaint_daily_stat'
+    day = db.Column(db.Date, primary_key=True)
+    category = db.Column(db.String(100), primary_key=True)
+    submitted = db.Column(db.Integer, nullable=False, default=0)
+    resolved = db.Column(db.Integer, nullable=False, default=0)
+    closed = db.Column(db.Integer, nullable=False, default=0)     # closed without being resolved
+    reopened = db.Column(db.Integer, nullable=False, default=0)
+    resolve_seconds = db.Column(db.Float, nullable=False, default=0)  # summed over `resolved`
+
+class ComplaintResolutionBucket(db.Model):
+    # Time-to-resolve histogram per day and category, for median and p90.
+    __tablename__ = 'complaint_resolution_bucket'
+    day = db.Column(db.Date, primary_key=True)
+    category = db.Column(db.String(100), primary_key=True)
+    bucket = db.Column(db.Integer, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+class ComplaintBacklog(db.Model):
+    # Current number of complaints per category and status.
+    __tablename__ = 'complaint_backlog'
+    category = db.Column(db.String(100), primary_key=True)
+    status = db.Column(db.String(50), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
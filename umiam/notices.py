@@ -0,0 +1,146 @@
+# umiam/notices.py
+# Browsers on the home page hold a Server-Sent Events connection to
+# /notices/stream. add_notice and edit_notice publish the change to an in-process
+# hub which fans it out to every connected client in this worker; a per-process
+# poller watches the 'notice' change stamp so writes made by other workers still
+# reach this worker's clients, as a snapshot of the latest notices. Event ids are
+# the notice stamp version, so they mean the same thing in every worker and a
+# reconnecting browser's Last-Event-ID can be replayed from the buffer.
+# Each open stream parks a thread, so run gunicorn with threaded workers
+# (e.g. `-k gthread --threads 200`) when the notice board is in use.
+import json
+import queue
+import threading
+import time
+from collections import deque
+
+from flask import current_app
+
+from .extensions import db
+from .models import ChangeStamp, Notice
+
+LATEST_NOTICE_COUNT = 5
+
+def format_sse(event_id, event_type, data):
+    return f'id: {event_id}\nevent: {event_type}\ndata: {json.dumps(data)}\n\n'
+
+class Subscription:
+    __slots__ = ('queue', 'closed')
+
+    def __init__(self, maxsize):
+        self.queue = queue.Queue(maxsize)
+        self.closed = False
+
+class EventHub:
+    """In-process publish/subscribe fan-out with a bounded replay buffer.
+
+    Messages are formatted once and the same string is queued for every
+    subscriber. A subscriber whose queue is full is closed rather than allowed to
+    hold up the others; its browser reconnects and catches up via replay.
+    """
+
+    def __init__(self, replay_size, queue_size):
+        self.queue_size = queue_size
+        self.last_id = None
+        self._replay = deque(maxlen=replay_size)
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def configure(self, replay_size, queue_size):
+        with self._lock:
+            self.queue_size = queue_size
+            self._replay = deque(self._replay, maxlen=replay_size)
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def subscribe(self):
+        subscription = Subscription(self.queue_size)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        subscription.closed = True
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, event_id, event_type, data):
+        message = format_sse(event_id, event_type, data)
+        with self._lock:
+            self.last_id = event_id
+            self._replay.append((event_id, message))
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            try:
+                subscription.queue.put_nowait(message)
+            except queue.Full:
+                self.unsubscribe(subscription)
+
+    def replay_since(self, event_id):
+        """Messages published after event_id, or None if the buffer doesn't reach back that far."""
+        with self._lock:
+            if event_id == self.last_id:
+                return []
+            buffered = list(self._replay)
+        for index, (buffered_id, _) in enumerate(buffered):
+            if buffered_id == event_id:
+                return [message for _, message in buffered[index + 1:]]
+        return None
+
+notice_hub = EventHub(100, 32)
+_notice_poller_lock = threading.Lock()
+_notice_poller = None
+
+def init_app(app):
+    app.config.setdefault('SSE_HEARTBEAT_INTERVAL', 15)   # seconds between keep-alive comments
+    app.config.setdefault('SSE_CLIENT_QUEUE_SIZE', 32)    # pending messages before a slow client is dropped
+    app.config.setdefault('SSE_REPLAY_BUFFER_SIZE', 100)  # recent events kept for Last-Event-ID replay
+    app.config.setdefault('NOTICE_POLL_INTERVAL', 2)      # seconds between change stamp checks
+    notice_hub.configure(app.config['SSE_REPLAY_BUFFER_SIZE'], app.config['SSE_CLIENT_QUEUE_SIZE'])
+
+def notice_payload(notice):
+    return {'id': notice.id, 'message': notice.message, 'priority': notice.priority,
+            'created_at': notice.created_at.isoformat()}
+
+def latest_notices_payload():
+    notices = Notice.query.order_by(Notice.created_at.desc()).limit(LATEST_NOTICE_COUNT).all()
+    return {'notices': [notice_payload(notice) for notice in notices]}
+
+def current_notice_version():
+    stamp = db.session.get(ChangeStamp, 'notice')
+    return stamp.version if stamp else 0
+
+def publish_notice_change(notice, action):
+    # Called after the commit that bumped the stamp. If another worker's write
+    # slipped in since our last event, a delta would leave clients with a gap, so
+    # send the full latest list instead.
+    version = current_notice_version()
+    if notice_hub.last_id is None or version == notice_hub.last_id + 1:
+        notice_hub.publish(version, 'notice', {'action': action, **notice_payload(notice)})
+    else:
+        notice_hub.publish(version, 'snapshot', latest_notices_payload())
+
+def poll_notice_changes(app):
+    while True:
+        time.sleep(app.config['NOTICE_POLL_INTERVAL'])
+        if not notice_hub.subscriber_count:
+            continue
+        try:
+            with app.app_context():
+                version = current_notice_version()
+                if notice_hub.last_id is None:
+                    notice_hub.last_id = version
+                elif version > notice_hub.last_id:
+                    notice_hub.publish(version, 'snapshot', latest_notices_payload())
+        except Exception:
+            app.logger.exception('Notice board poll failed')
+
+def ensure_notice_poller():
+    global _notice_poller
+    with _notice_poller_lock:
+        if _notice_poller is None or not _notice_poller.is_alive():
+            _notice_poller = threading.Thread(target=poll_notice_changes, args=(current_app._get_current_object(),),
+                                              name='notice-poller', daemon=True)
+            _notice_poller.start()
@@ -0,0 +1,48 @@
+# umiam/pagination.py
+# Keyset pagination for the long lists: the admin complaint queue, the user
+# directory, alumni and the JSON API. Each is read in (sort key, id) order and
+# a page starts after the last row of the one before, so a deep page costs the
+# same as the first. That position travels as an opaque cursor: the urlsafe
+# base64 of the JSON [sort value, id], with datetimes as ISO strings.
+import base64
+import json
+from datetime import datetime
+
+def encode_cursor(sort_value, id):
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    payload = json.dumps([sort_value, id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(value, sort_type):
+    """(sort value, id) from a cursor, or None when it is missing or malformed.
+
+    `sort_type` is the Python type of the sort column (str, int or datetime);
+    a sort value of any other type is malformed, except None.
+    """
+    if not value:
+        return None
+    try:
+        sort_value, id = json.loads(base64.urlsafe_b64decode(value + '=' * (-len(value) % 4)))
+        # type() rather than isinstance(), which would let True through as an int.
+        if type(id) is not int:
+            return None
+        if sort_value is not None and sort_type is datetime:
+            sort_value = datetime.fromisoformat(sort_value)
+        elif sort_value is not None and type(sort_value) is not sort_type:
+            return None
+    except (ValueError, TypeError):
+        return None
+    return sort_value, id
+
+def keyset_page(query, per_page, position):
+    """One page of `query`, which must already be in keyset order: (rows, next cursor or None).
+
+    `position(row)` gives the (sort value, id) that the next page starts after.
+    """
+    # The row past the page says whether there is another, without a COUNT.
+    rows = query.limit(per_page + 1).all()
+    if len(rows) <= per_page:
+        return rows, None
+    rows = rows[:per_page]
+    return rows, encode_cursor(*position(rows[-1]))
@@ -0,0 +1,120 @@
+# umiam/passwords.py
+# Password hashing runs on a small per-process thread pool instead of the
+# request thread. scrypt and pbkdf2 release the GIL, so the pool size caps how
+# many cores a login storm can take while every other request keeps its thread
+# and its CPU. At most PASSWORD_HASH_MAX_PENDING hashes may be queued or
+# running; past that a sign-in is refused with HashingBusy rather than left
+# waiting, and /metrics shows the queue depth and the time spent queueing.
+#
+# Stored hashes record their method and salt, so after PASSWORD_HASH_METHOD or
+# PASSWORD_SALT_LENGTH changes each user is rehashed the next time they sign in.
+#
+# Both helpers end the request's transaction before waiting on the pool, so a
+# queue of sign-ins never holds database connections the other pages need.
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from .extensions import db
+
+class HashingBusy(Exception):
+    """The hashing queue is full; try again shortly."""
+
+class PasswordHasher:
+    def __init__(self, method, salt_length, workers, max_pending):
+        self.method = method
+        self.salt_length = salt_length
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0             # queued or running
+        self.completed = 0
+        self.rejected = 0
+        self.queue_seconds = 0.0     # summed time between submit and start
+        self.hash_seconds = 0.0
+        self._lock = threading.Lock()
+        self._canonical_method = None
+        # No threads start until the first hash, so this is safe to create before a fork.
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash') if workers else None
+
+    def run(self, fn, *args):
+        """Run fn(*args) on the pool and wait for it; inline when the pool is disabled."""
+        if self._executor is None:
+            return fn(*args)
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise HashingBusy()
+            self.pending += 1
+        submitted = time.perf_counter()
+
+        def task():
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self.pending -= 1
+                    self.completed += 1
+                    self.queue_seconds += started - submitted
+                    self.hash_seconds += time.perf_counter() - started
+        return self._executor.submit(task).result()
+
+    def _hash(self, password):
+        return generate_password_hash(password, self.method, self.salt_length)
+
+    def _needs_rehash(self, password_hash):
+        if self._canonical_method is None:
+            # 'scrypt' is stored as 'scrypt:32768:8:1' and so on; learn the full form once.
+            self._canonical_method = self._hash('').split('$', 1)[0]
+        # Stored as '<method>$<salt>$<hash>', with one character per byte of salt length.
+        method, _, salt = password_hash.partition('$')
+        return method != self._canonical_method or len(salt.partition('$')[0]) != self.salt_length
+
+    def _verify(self, password_hash, password):
+        if not check_password_hash(password_hash, password):
+            return False, None
+        return True, self._hash(password) if self._needs_rehash(password_hash) else None
+
+    def hash(self, password):
+        return self.run(self._hash, password)
+
+    def verify(self, password_hash, password):
+        """(matches, replacement hash or None), in a single trip through the pool."""
+        return self.run(self._verify, password_hash, password)
+
+    def stats(self):
+        with self._lock:
+            return {'workers': self.workers, 'pending': self.pending, 'max_pending': self.max_pending,
+                    'completed': self.completed, 'rejected': self.rejected,
+                    'queue_seconds': self.queue_seconds, 'hash_seconds': self.hash_seconds}
+
+def init_app(app):
+    app.config.setdefault('PASSWORD_HASH_METHOD', 'scrypt')  # any werkzeug method, e.g. 'pbkdf2:sha256:600000'
+    app.config.setdefault('PASSWORD_SALT_LENGTH', 16)
+    app.config.setdefault('PASSWORD_HASH_WORKERS', 1)        # 0 hashes on the request thread
+    app.config.setdefault('PASSWORD_HASH_MAX_PENDING', 16)
+    app.extensions['password_hasher'] = PasswordHasher(
+        app.config['PASSWORD_HASH_METHOD'], app.config['PASSWORD_SALT_LENGTH'],
+        app.config['PASSWORD_HASH_WORKERS'], app.config['PASSWORD_HASH_MAX_PENDING'])
+
+def hash_password(password):
+    """Hash a new password. Commits the session; raises HashingBusy when the queue is full."""
+    db.session.commit()
+    return current_app.extensions['password_hasher'].hash(password)
+
+def check_user_password(user, password):
+    """Check a password, upgrading the stored hash if it was made with older settings.
+
+    Commits the session first (`user` reloads when next used), and leaves the
+    upgraded hash for the caller to commit. Raises HashingBusy when the
+    hashing queue is full.
+    """
+    password_hash = user.password_hash
+    db.session.commit()
+    matches, new_hash = current_app.extensions['password_hasher'].verify(password_hash, password)
+    if new_hash is not None:
+        user.password_hash = new_hash
+    return matches
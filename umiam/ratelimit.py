@@ -0,0 +1,74 @@
+# umiam/ratelimit.py
+# Token-bucket throttling for sign-in and sign-up, so a storm of password
+# guesses is turned away before it reaches the (deliberately slow) password
+# hash. Each client IP and each email address has a bucket that holds up to
+# BURST attempts and refills at PER_MINUTE; an attempt spends one token.
+#
+# Buckets live in a store named by RATE_LIMIT_STORE ('module:factory'). The
+# default MemoryBucketStore is per process, so with several gunicorn workers a
+# client gets up to that many times the budget; a shared store (Redis, say)
+# only has to provide the same take() method. The per-IP allowance is generous
+# because a whole hostel can sign in from behind one NAT address.
+import importlib
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from flask import current_app, request
+
+throttled = Counter()           # refused attempts by scope, for /metrics
+_throttled_lock = threading.Lock()
+
+class MemoryBucketStore:
+    """Token buckets in this process's memory, least recently used dropped past `max_keys`."""
+
+    def __init__(self, max_keys=100_000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, per_second):
+        """Spend a token from `key`'s bucket; returns 0 if there was one, else seconds until there will be."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * per_second)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / per_second
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return wait
+
+def init_app(app):
+    app.config.setdefault('RATE_LIMIT_ENABLED', True)
+    app.config.setdefault('RATE_LIMIT_STORE', 'umiam.ratelimit:MemoryBucketStore')
+    app.config.setdefault('LOGIN_IP_BURST', 60)
+    app.config.setdefault('LOGIN_IP_PER_MINUTE', 30)
+    app.config.setdefault('LOGIN_EMAIL_BURST', 5)
+    app.config.setdefault('LOGIN_EMAIL_PER_MINUTE', 1)
+    module_name, _, factory = app.config['RATE_LIMIT_STORE'].partition(':')
+    app.extensions['rate_limit_store'] = getattr(importlib.import_module(module_name), factory)()
+
+def throttle_login(email=None):
+    """Spend a sign-in attempt for this client IP (and email, if given).
+
+    Returns 0 if the attempt may go ahead, otherwise the seconds to wait.
+    """
+    config = current_app.config
+    if not config['RATE_LIMIT_ENABLED']:
+        return 0
+    store = current_app.extensions['rate_limit_store']
+    buckets = [('ip', request.remote_addr, config['LOGIN_IP_BURST'], config['LOGIN_IP_PER_MINUTE'])]
+    if email:
+        buckets.append(('email', email.strip().lower(), config['LOGIN_EMAIL_BURST'], config['LOGIN_EMAIL_PER_MINUTE']))
+    for scope, value, burst, per_minute in buckets:
+        wait = store.take(f'login:{scope}:{value}', burst, per_minute / 60)
+        if wait:
+            with _throttled_lock:
+                throttled[scope] += 1
+            return wait
+    return 0
@@ -0,0 +1,101 @@
+# umiam/registrations.py
+# Event sign-ups with optional capacity and a first-come waitlist. Seats are
+# claimed with a conditional UPDATE of the event's seat counter, so the check and
+# the increment are one statement and concurrent registrants can never overbook;
+# the unique (event_id, user_id) index turns double submissions into no-ops.
+# Callers commit.
+from datetime import datetime
+
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from .extensions import db
+from .models import Event, EventRegistration
+
+REGISTERED = 'registered'
+WAITLISTED = 'waitlisted'
+
+# Recomputes the seat counters from the registrations (migration backfill, bulk loads).
+EVENT_COUNTERS_SQL = (
+    'UPDATE event SET '
+    "seats_taken = (SELECT count(*) FROM event_registration r WHERE r.event_id = event.id AND r.status = 'registered'), "
+    "waitlist_size = (SELECT count(*) FROM event_registration r WHERE r.event_id = event.id AND r.status = 'waitlisted')"
+)
+
+def _claim_seat(event_id, from_waitlist=False):
+    has_seat = db.or_(Event.capacity.is_(None), Event.seats_taken < Event.capacity)
+    values = {'seats_taken': Event.seats_taken + 1}
+    filters = [Event.id == event_id, has_seat]
+    if from_waitlist:
+        values['waitlist_size'] = Event.waitlist_size - 1
+        filters.append(Event.waitlist_size > 0)
+    return db.session.execute(db.update(Event).where(*filters).values(**values)).rowcount == 1
+
+def register_for_event(event_id, user_id):
+    """Register a user, or waitlist them if the event is full.
+
+    Returns REGISTERED or WAITLISTED, or None if they already had a registration.
+    """
+    inserted = db.session.execute(
+        sqlite_insert(EventRegistration)
+        .values(event_id=event_id, user_id=user_id, status=REGISTERED, registration_date=datetime.utcnow())
+        .on_conflict_do_nothing(index_elements=['event_id', 'user_id'])
+    ).rowcount
+    if not inserted:
+        return None
+    if _claim_seat(event_id):
+        return REGISTERED
+    db.session.execute(
+        db.update(EventRegistration)
+        .where(EventRegistration.event_id == event_id, EventRegistration.user_id == user_id)
+        .values(status=WAITLISTED)
+    )
+    db.session.execute(
+        db.update(Event).where(Event.id == event_id).values(waitlist_size=Event.waitlist_size + 1)
+    )
+    return WAITLISTED
+
+def cancel_registration(event_id, user_id):
+    """Drop a user's registration or waitlist place, promoting from the waitlist into a freed seat.
+
+    Returns (the status they had or None, ids of the users promoted).
+    """
+    status = db.session.execute(
+        db.delete(EventRegistration)
+        .where(EventRegistration.event_id == event_id, EventRegistration.user_id == user_id)
+        .returning(EventRegistration.status)
+    ).scalar()
+    promoted = []
+    if status == REGISTERED:
+        db.session.execute(db.update(Event).where(Event.id == event_id).values(seats_taken=Event.seats_taken - 1))
+        promoted = fill_event_seats(event_id)
+    elif status == WAITLISTED:
+        db.session.execute(db.update(Event).where(Event.id == event_id).values(waitlist_size=Event.waitlist_size - 1))
+    return status, promoted
+
+def fill_event_seats(event_id):
+    """Move waitlisted users into free seats, earliest first; returns their user ids.
+
+    Also called after an admin raises an event's capacity. Lowering it below the
+    seats already taken keeps everyone registered and only sends new sign-ups to
+    the waitlist.
+    """
+    promoted = []
+    while _claim_seat(event_id, from_waitlist=True):
+        next_in_line = (db.select(EventRegistration.id)
+                        .where(EventRegistration.event_id == event_id, EventRegistration.status == WAITLISTED)
+                        .order_by(EventRegistration.registration_date, EventRegistration.id)
+                        .limit(1)
+                        .scalar_subquery())
+        user_id = db.session.execute(
+            db.update(EventRegistration)
+            .where(EventRegistration.id == next_in_line)
+            .values(status=REGISTERED)
+            .returning(EventRegistration.user_id)
+        ).scalar()
+        if user_id is None:
+            # The counter said someone was waiting but nobody was; give the seat back.
+            db.session.execute(db.update(Event).where(Event.id == event_id)
+                               .values(seats_taken=Event.seats_taken - 1, waitlist_size=0))
+            break
+        promoted.append(user_id)
+    return promoted
@@ -0,0 +1,56 @@
+# umiam/roster.py
+# The yearly roster is streamed row by row, normalised like add_student() does,
+# de-duplicated in memory against the existing allowlist and inserted in chunked
+# executemany batches inside one transaction.
+import csv
+
+from email_validator import EmailNotValidError, validate_email
+
+from .extensions import db
+from .models import UmiamStudent
+
+IMPORT_BATCH_SIZE = 500
+
+def iter_roster_emails(lines):
+    """Yield (email, is_valid) for each non-blank row of a CSV or plain-text roster.
+
+    The first cell containing an '@' is taken as the email; a leading row without
+    one is treated as a header and skipped.
+    """
+    for row_number, row in enumerate(csv.reader(lines)):
+        cells = [cell.strip().lower() for cell in row if cell.strip()]
+        if not cells:
+            continue
+        email = next((cell for cell in cells if '@' in cell), None)
+        if email is None:
+            if row_number > 0:
+                yield cells[0], False
+            continue
+        try:
+            validate_email(email, check_deliverability=False)
+        except EmailNotValidError:
+            yield email, False
+        else:
+            yield email, True
+
+def import_umiam_students(lines):
+    counts = {'inserted': 0, 'duplicate': 0, 'invalid': 0}
+    seen = {email for (email,) in db.session.query(UmiamStudent.email)}
+    batch = []
+    for email, is_valid in iter_roster_emails(lines):
+        if not is_valid:
+            counts['invalid'] += 1
+        elif email in seen:
+            counts['duplicate'] += 1
+        else:
+            seen.add(email)
+            batch.append({'email': email})
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                db.session.execute(db.insert(UmiamStudent), batch)
+                counts['inserted'] += len(batch)
+                batch = []
+    if batch:
+        db.session.execute(db.insert(UmiamStudent), batch)
+        counts['inserted'] += len(batch)
+    db.session.commit()
+    return counts
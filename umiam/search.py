@@ -0,0 +1,96 @@
+# umiam/search.py
+# One FTS5 table indexes complaints, announcements, alumni and achievements. Rows
+# are keyed by rowid = source id * 4 + kind code, so the triggers below can
+# replace or drop a document with a rowid lookup rather than a scan. The triggers
+# keep the index in step with every write path; `flask --app app rebuild-search`
+# backfills it from scratch.
+import re
+
+from flask_login import current_user
+from markupsafe import Markup, escape
+
+from .extensions import db
+
+SEARCH_PAGE_SIZE = 20
+
+SEARCH_SOURCES = {
+    # kind: (rowid code, table, columns that trigger a reindex, title SQL, body SQL)
+    'complaint': (0, 'complaint', 'category, details, comments',
+                  "{row}.category", "coalesce({row}.details, '') || ' ' || coalesce({row}.comments, '')"),
+    'announcement': (1, 'announcement', 'title, content',
+                     "{row}.title", "{row}.content"),
+    'alumni': (2, 'alumni', 'name, company, current_position, achievements',
+               "{row}.name",
+               "coalesce({row}.current_position, '') || ' ' || coalesce({row}.company, '') || ' ' "
+               "|| coalesce({row}.achievements, '')"),
+    'achievement': (3, 'achievement', 'title, description',
+                    "{row}.title", "{row}.description"),
+}
+
+def _search_insert_sql(kind, row):
+    code, table, _, title_sql, body_sql = SEARCH_SOURCES[kind]
+    return (f"INSERT INTO search_index (rowid, kind, ref_id, title, body) "
+            f"SELECT {row}.id * 4 + {code}, '{kind}', {row}.id, {title_sql.format(row=row)}, {body_sql.format(row=row)}")
+
+def search_index_statements():
+    statements = [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+        "kind UNINDEXED, ref_id UNINDEXED, title, body, tokenize='porter unicode61', prefix='2 3')",
+    ]
+    for kind, (code, table, columns, _, _) in SEARCH_SOURCES.items():
+        delete_old = f'DELETE FROM search_index WHERE rowid = old.id * 4 + {code};'
+        statements += [
+            f'CREATE TRIGGER IF NOT EXISTS search_{table}_ai AFTER INSERT ON {table} BEGIN '
+            f'{_search_insert_sql(kind, "new")}; END',
+            f'CREATE TRIGGER IF NOT EXISTS search_{table}_au AFTER UPDATE OF {columns} ON {table} BEGIN '
+            f'{delete_old} {_search_insert_sql(kind, "new")}; END',
+            f'CREATE TRIGGER IF NOT EXISTS search_{table}_ad AFTER DELETE ON {table} BEGIN {delete_old} END',
+        ]
+    return statements
+
+def search_backfill_statements():
+    return ['DELETE FROM search_index'] + [
+        f'{_search_insert_sql(kind, table)} FROM {table}'
+        for kind, (_, table, _, _, _) in SEARCH_SOURCES.items()
+    ]
+
+def fts_match_expression(text):
+    # Quote each word so user input can never be parsed as FTS5 syntax, and let
+    # the last word match as a prefix for search-as-you-type.
+    words = re.findall(r'\w+', text)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+def searchable_kinds():
+    kinds = ['alumni', 'achievement']
+    if current_user.is_authenticated:
+        kinds.append('announcement')
+        if current_user.role == 'HMC Admin':
+            kinds.append('complaint')
+    return kinds
+
+def search_documents(text, kinds, page=1):
+    """Return (results, has_next) for one page of bm25-ranked matches."""
+    match = fts_match_expression(text)
+    if match is None or not kinds:
+        return [], False
+    # \x02/\x03 mark hits so the stored text can be escaped before <mark> is added.
+    rows = db.session.execute(
+        db.text(
+            "SELECT kind, ref_id, title, snippet(search_index, 3, char(2), char(3), '…', 16) AS snippet "
+            "FROM search_index WHERE search_index MATCH :match "
+            f"AND kind IN ({', '.join(f':kind{i}' for i in range(len(kinds)))}) "
+            "ORDER BY rank LIMIT :limit OFFSET :offset"
+        ),
+        {'match': match, 'limit': SEARCH_PAGE_SIZE + 1, 'offset': (page - 1) * SEARCH_PAGE_SIZE,
+         **{f'kind{i}': kind for i, kind in enumerate(kinds)}},
+    ).all()
+    results = [
+        {'kind': row.kind, 'id': row.ref_id, 'title': row.title,
+         'snippet': Markup(str(escape(row.snippet)).replace('\x02', '<mark>').replace('\x03', '</mark>'))}
+        for row in rows[:SEARCH_PAGE_SIZE]
+    ]
+    return results, len(rows) > SEARCH_PAGE_SIZE
@@ -0,0 +1,45 @@
+# umiam/stats.py
+# The dashboard reads these pre-computed counters instead of running a COUNT(*)
+# per table on every hit. Write routes adjust them in the same transaction as
+# the change itself; `flask --app app rebuild-stats` recomputes them from scratch.
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from .extensions import db
+from .models import Alumni, Complaint, Event, Facility, StatCounter, User
+
+STAT_QUERIES = {
+    'total_students': lambda: User.query.filter_by(role='Student').count(),
+    'total_complaints': lambda: Complaint.query.count(),
+    'resolved_complaints': lambda: Complaint.query.filter_by(status='Resolved').count(),
+    'total_events': lambda: Event.query.count(),
+    'total_facilities': lambda: Facility.query.count(),
+    'total_alumni': lambda: Alumni.query.count(),
+}
+
+def bump_stat(name, delta=1):
+    # Single-statement increment so concurrent workers never lose an update.
+    # A missing row is left alone; get_stats() rebuilds everything in that case.
+    db.session.execute(
+        db.update(StatCounter)
+        .where(StatCounter.name == name)
+        .values(value=StatCounter.value + delta)
+    )
+
+def rebuild_stats():
+    values = {name: count() for name, count in STAT_QUERIES.items()}
+    # Upserted rather than deleted and re-added, so two requests that both find
+    # the counters missing can rebuild them at once without a duplicate key.
+    insert = sqlite_insert(StatCounter)
+    db.session.execute(
+        insert.on_conflict_do_update(index_elements=['name'], set_={'value': insert.excluded.value}),
+        [{'name': name, 'value': value} for name, value in values.items()],
+    )
+    db.session.execute(db.delete(StatCounter).where(StatCounter.name.not_in(list(STAT_QUERIES))))
+    db.session.commit()
+    return values
+
+def get_stats():
+    stats = {counter.name: counter.value for counter in StatCounter.query.all()}
+    if stats.keys() != STAT_QUERIES.keys():
+        stats = rebuild_stats()
+    return stats